@@ -0,0 +1,22 @@
+// src/api/historias.js
+import api from "./Client";
+
+// Máximo que acepta el backend por página
+const LIMITE_PAGINA = 500;
+
+export const historiasApi = {
+  // 🔹 Timeline completo de un paciente (más reciente primero).
+  // El backend pagina por cursor: se piden páginas hasta que no llega X-Next-Cursor
+  async getTimelinePaciente(pacienteId) {
+    const historias = [];
+    let cursor = null;
+    do {
+      const res = await api.get(`/historias-clinicas/paciente/${pacienteId}`, {
+        params: { limit: LIMITE_PAGINA, ...(cursor ? { cursor } : {}) },
+      });
+      historias.push(...res.data);
+      cursor = res.headers["x-next-cursor"];
+    } while (cursor);
+    return historias;
+  },
+};
@@ -2,6 +2,7 @@ import { useEffect, useState } from "react";
 import { useSearchParams, useNavigate } from "react-router-dom"; 
 import MainLayout from "../../components/layout/MainLayout";
 import api from "../../api/Client";
+import { historiasApi } from "../../api/historias";
 import { 
   FileText, 
   PlusCircle, 
@@ -92,8 +93,7 @@ export default function HistoriasClinicas() {
 
       // Si hay paciente seleccionado, cargar sus historias
       if (pacienteSeleccionado) {
-        const resHistorias = await api.get(`/historias-clinicas/paciente/${pacienteSeleccionado}`);
-        setHistorias(resHistorias.data);
+        setHistorias(await historiasApi.getTimelinePaciente(pacienteSeleccionado));
       } else {
         const resHistorias = await api.get("/historias-clinicas/");
         setHistorias(resHistorias.data);
@@ -113,8 +113,7 @@ export default function HistoriasClinicas() {
     
     if (pacienteId) {
       try {
-        const res = await api.get(`/historias-clinicas/paciente/${pacienteId}`);
-        setHistorias(res.data);
+        setHistorias(await historiasApi.getTimelinePaciente(pacienteId));
       } catch (err) {
         console.error("❌ Error:", err);
       }
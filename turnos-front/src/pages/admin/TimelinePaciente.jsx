@@ -2,6 +2,7 @@ import { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import MainLayout from "../../components/layout/MainLayout";
 import api from "../../api/Client";
+import { historiasApi } from "../../api/historias";
 import {
   ArrowLeft,
   Calendar,
@@ -31,12 +32,12 @@ export default function TimelinePaciente() {
   const fetchDatos = async () => {
     setLoading(true);
     try {
-      const [resHistorias, resPaciente] = await Promise.all([
-        api.get(`/historias-clinicas/paciente/${pacienteId}`),
+      const [historiasPaciente, resPaciente] = await Promise.all([
+        historiasApi.getTimelinePaciente(pacienteId),
         api.get(`/pacientes/${pacienteId}`),
       ]);
 
-      setHistorias(resHistorias.data);
+      setHistorias(historiasPaciente);
       setPaciente(resPaciente.data);
     } catch (err) {
       console.error("❌ Error cargando datos:", err);
@@ -120,21 +120,16 @@ export default function Turnos() {
 
   const fetchData = async () => {
     try {
-      const [resTurnos, resPac, resKine, resServ, resSalas] = await Promise.all([
-        api.get("/turnos/"),
-        api.get("/pacientes/"),
-        api.get("/kinesiologos/"),
-        api.get("/servicios/"),
-        api.get("/salas/"),
-      ]);
-
-      const turnosOrdenados = resTurnos.data.sort((a, b) => b.id - a.id);
+      // Una sola request con la primera página de turnos y los selects (id + nombre)
+      const { data } = await api.get("/bootstrap/turnos");
+
+      const turnosOrdenados = data.turnos.sort((a, b) => b.id - a.id);
       
       setTurnos(turnosOrdenados);
-      setPacientes(resPac.data);
-      setKines(resKine.data);
-      setServicios(resServ.data);
-      setSalas(resSalas.data);
+      setPacientes(data.pacientes);
+      setKines(data.kinesiologos);
+      setServicios(data.servicios);
+      setSalas(data.salas);
     } catch (err) {
       console.error("❌ Error cargando datos:", err);
     } finally {
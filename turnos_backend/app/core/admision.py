@@ -0,0 +1,211 @@
+"""
+Control de admisión para los handlers sync
+Los handlers y dependencias sync esperan un hilo del limitador de AnyIO
+(THREADPOOL_HILOS). Sin control, ante un pico la cola crece sin límite y la
+latencia de todas las rutas sube hasta que los clientes cortan por timeout.
+
+AdmisionMiddleware mide, por request, cuánto esperó un hilo libre, y mira la
+cola actual del limitador. La espera se mide en el limitador mismo
+(LimitadorMedido reemplaza al de AnyIO): cuenta cada pasaje por el threadpool
+de la request (dependencias y handler), tenga o no sesión de base. Cuando la cola o el p95 de la espera superan el
+objetivo, rechaza con 503 + Retry-After primero las rutas de baja prioridad
+(exportaciones, reportes, listados) y, con el doble de carga, las normales.
+Login, reservas y recepción nunca se rechazan.
+"""
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+import threading
+import time
+
+import anyio.to_thread
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import (
+    ADMISION_COLA_MAXIMA, ADMISION_P95_OBJETIVO_MS, ADMISION_RETRY_AFTER,
+    ADMISION_VENTANA_SEGUNDOS, THREADPOOL_HILOS,
+)
+from app.core.metricas import metricas
+
+# AnyIO no expone cómo cambiar el limitador por defecto: se usa el RunVar del
+# backend asyncio (el único que corre uvicorn). Revisar al actualizar anyio
+from anyio._backends._asyncio import CapacityLimiter as _LimitadorAsyncio
+from anyio._backends._asyncio import _default_thread_limiter as _limitador_por_defecto
+
+CRITICA, NORMAL, BAJA = "critica", "normal", "baja"
+
+# Prefijos que nunca se rechazan (reservas y recepción van aparte, por método)
+RUTAS_CRITICAS = ("/auth", "/recepcion", "/debug")
+# Prefijos y fragmentos de ruta de baja prioridad: pesados y tolerantes a reintentos
+RUTAS_BAJA_PRIORIDAD = ("/exportar",)
+FRAGMENTOS_BAJA_PRIORIDAD = ("/estadisticas", "/signos-vitales", "/buscar", "/calendario", "/usuarios-disponibles")
+METODOS_ESCRITURA = ("POST", "PUT", "PATCH", "DELETE")
+MAX_MUESTRAS = 2000
+
+# Medición de la request en curso; los hilos del threadpool heredan el contexto
+_medicion: ContextVar[Optional[dict]] = ContextVar("medicion_admision", default=None)
+
+
+def prioridad_ruta(metodo: str, ruta: str) -> str:
+    """
+    Clasifica la request según su ruta (sin resolver el router)
+
+    Returns:
+        CRITICA: login, recepción, debug y escrituras sobre turnos
+        BAJA: exportaciones, reportes, búsquedas y listados completos (GET /<recurso>/)
+        NORMAL: el resto
+    """
+    if ruta == "/" or ruta.startswith(RUTAS_CRITICAS):
+        return CRITICA
+    if ruta.startswith("/turnos") and metodo in METODOS_ESCRITURA:
+        return CRITICA
+    if ruta.startswith(RUTAS_BAJA_PRIORIDAD) or any(f in ruta for f in FRAGMENTOS_BAJA_PRIORIDAD):
+        return BAJA
+    if metodo == "GET" and ruta.endswith("/") and ruta.count("/") == 2:
+        return BAJA
+    return NORMAL
+
+
+def sumar_espera(espera_ms: float):
+    """Suma a la request en curso lo que esperó un hilo del threadpool"""
+    medicion = _medicion.get()
+    if medicion is not None:
+        medicion["espera_ms"] = (medicion["espera_ms"] or 0.0) + espera_ms
+
+
+class LimitadorMedido(_LimitadorAsyncio):
+    """
+    CapacityLimiter de AnyIO (backend asyncio) que mide cuánto espera cada
+    adquisición: run_in_threadpool lo adquiere antes de pasarle la función a
+    un hilo, así que la espera es exactamente la cola del threadpool
+    """
+
+    async def acquire_on_behalf_of(self, borrower) -> None:
+        inicio = time.perf_counter()
+        await super().acquire_on_behalf_of(borrower)
+        sumar_espera((time.perf_counter() - inicio) * 1000)
+
+
+def limitador_hilos():
+    """Limitador por defecto de AnyIO (solo desde el event loop)"""
+    return anyio.to_thread.current_default_thread_limiter()
+
+
+def instalar_limitador(hilos: int):
+    """
+    Reemplaza el limitador por defecto del event loop actual por un
+    LimitadorMedido de `hilos` hilos (si ya está instalado no hace nada)
+    """
+    if not isinstance(limitador_hilos(), LimitadorMedido):
+        _limitador_por_defecto.set(LimitadorMedido(hilos))
+
+
+class ControlAdmision:
+    """Ventana de esperas recientes por un hilo y decisión de admitir o rechazar"""
+
+    def __init__(
+        self,
+        cola_maxima: int = ADMISION_COLA_MAXIMA,
+        p95_objetivo_ms: float = ADMISION_P95_OBJETIVO_MS,
+        ventana_segundos: float = ADMISION_VENTANA_SEGUNDOS,
+    ):
+        self.cola_maxima = cola_maxima
+        self.p95_objetivo_ms = p95_objetivo_ms
+        self.ventana_segundos = ventana_segundos
+        self._lock = threading.Lock()
+        self._esperas = deque(maxlen=MAX_MUESTRAS)
+        self._p95_cache = (0.0, 0.0)
+
+    def registrar_espera(self, espera_ms: float):
+        with self._lock:
+            self._esperas.append((time.monotonic(), espera_ms))
+        metricas.observar("admision.espera_hilo_ms", espera_ms)
+
+    def p95_espera(self) -> float:
+        """p95 de las esperas de la ventana; se recalcula como mucho cada 250 ms"""
+        ahora = time.monotonic()
+        calculado, valor = self._p95_cache
+        if ahora - calculado < 0.25:
+            return valor
+        with self._lock:
+            limite = ahora - self.ventana_segundos
+            while self._esperas and self._esperas[0][0] < limite:
+                self._esperas.popleft()
+            esperas = sorted(ms for _, ms in self._esperas)
+        # Con pocas muestras el p95 no es representativo
+        valor = esperas[int(len(esperas) * 0.95)] if len(esperas) >= 20 else 0.0
+        self._p95_cache = (ahora, valor)
+        return valor
+
+    def motivo_rechazo(self, prioridad: str, en_cola: int) -> Optional[str]:
+        """
+        Returns:
+            "cola" o "p95" si la request debe rechazarse, None si se admite.
+            Las rutas normales toleran el doble que las de baja prioridad
+        """
+        if prioridad == CRITICA:
+            return None
+        factor = 1 if prioridad == BAJA else 2
+        if en_cola >= self.cola_maxima * factor:
+            return "cola"
+        if self.p95_espera() >= self.p95_objetivo_ms * factor:
+            return "p95"
+        return None
+
+    def estado(self) -> dict:
+        estadisticas = limitador_hilos().statistics()
+        return {
+            "hilos": estadisticas.total_tokens,
+            "hilos_ocupados": estadisticas.borrowed_tokens,
+            "en_cola": estadisticas.tasks_waiting,
+            "p95_espera_ms": round(self.p95_espera(), 2),
+            "muestras": len(self._esperas),
+            "cola_maxima": self.cola_maxima,
+            "p95_objetivo_ms": self.p95_objetivo_ms,
+        }
+
+
+control = ControlAdmision()
+
+
+class AdmisionMiddleware:
+    """
+    Middleware ASGI que fija el tamaño del threadpool, mide la espera por un
+    hilo de cada request y rechaza con 503 según prioridad cuando hay saturación
+    """
+
+    def __init__(self, app: ASGIApp, hilos: int = THREADPOOL_HILOS, retry_after: int = ADMISION_RETRY_AFTER):
+        self.app = app
+        self.hilos = hilos
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # El limitador vive en el event loop: se instala con la primera request de cada loop
+        instalar_limitador(self.hilos)
+
+        prioridad = prioridad_ruta(scope["method"], scope["path"])
+        motivo = control.motivo_rechazo(prioridad, limitador_hilos().statistics().tasks_waiting)
+        if motivo:
+            metricas.incrementar(f"admision.rechazadas.{prioridad}")
+            metricas.incrementar(f"admision.rechazadas.por_{motivo}")
+            respuesta = JSONResponse(
+                status_code=503,
+                content={"error": "Servidor saturado, reintentá en unos segundos"},
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await respuesta(scope, receive, send)
+            return
+
+        medicion = {"espera_ms": None}
+        token = _medicion.set(medicion)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _medicion.reset(token)
+            if medicion["espera_ms"] is not None:
+                control.registrar_espera(medicion["espera_ms"])
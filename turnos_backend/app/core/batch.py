@@ -0,0 +1,68 @@
+"""
+Estado compartido por las sub-requests de POST /batch
+Mientras corre un batch, las dependencias de sesión (get_db, get_async_db y
+las de lectura) y de usuario actual devuelven lo del batch en lugar de crear
+sesiones nuevas o volver a validar el token: todas las sub-requests ven las
+escrituras de las anteriores y la autenticación se resuelve una sola vez.
+
+El estado viaja en un ContextVar: las sub-requests se despachan en la misma
+tarea y los hilos del threadpool heredan el contexto.
+"""
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:  # app.database importa este módulo antes de definir Base
+    from app.models.user import User
+
+
+class EstadoBatch:
+    """
+    Sesiones y usuario del batch en curso
+
+    Args:
+        sesion_async: AsyncSession compartida por las rutas async
+        usuario: Usuario autenticado en la request del batch
+        atomico: Si es True la sesión async está unida a una transacción externa
+            (sus commit no confirman) y las rutas con sesión sync no se admiten.
+            Las rutas async que reutilizan código sync lo hacen con
+            AsyncSession.run_sync, que sí corre sobre esa conexión
+    """
+
+    def __init__(self, sesion_async: AsyncSession, usuario: "User", atomico: bool = False):
+        self.sesion_async = sesion_async
+        self.usuario = usuario
+        self.atomico = atomico
+        self.sesion_sync: Optional[Session] = None
+
+    def obtener_sesion_sync(self, fabrica: Callable[[], Session]) -> Session:
+        """Sesión sync compartida, creada con la primera ruta sync del batch"""
+        if self.atomico:
+            # Una Session sync corre en el threadpool con otra conexión: no puede entrar
+            # en la transacción del batch (la conexión async solo se usa desde el event loop)
+            raise HTTPException(
+                status_code=400,
+                detail="Esta ruta usa una sesión sync y no puede ejecutarse dentro de un batch atómico",
+            )
+        if self.sesion_sync is None:
+            self.sesion_sync = fabrica()
+        return self.sesion_sync
+
+
+_estado_batch: ContextVar[Optional[EstadoBatch]] = ContextVar("estado_batch", default=None)
+
+
+def estado_batch() -> Optional[EstadoBatch]:
+    return _estado_batch.get()
+
+
+def iniciar_batch(estado: EstadoBatch):
+    """Returns: token para restaurar el contexto con terminar_batch"""
+    return _estado_batch.set(estado)
+
+
+def terminar_batch(token):
+    _estado_batch.reset(token)
@@ -0,0 +1,245 @@
+"""
+Búsqueda de texto en historias clínicas
+Índice invertido propio (tabla historia_terminos) con normalización para español:
+minúsculas, sin acentos, sin stopwords y con un stemming liviano por sufijos.
+Funciona igual en MySQL y en SQLite y se actualiza al crear / editar historias.
+
+El costo de una consulta está acotado por BUSQUEDA_MAX_CANDIDATOS_TERMINO, no
+por el tamaño del corpus: cada término aporta como mucho esa cantidad de
+historias candidatas y solo esas se agregan y rankean.
+"""
+from collections import Counter
+from math import log
+from typing import Optional
+import re
+import unicodedata
+
+from sqlalchemy import case, func, insert, select, union
+from sqlalchemy.orm import Session
+
+from app.core.config import BUSQUEDA_MAX_CANDIDATOS_TERMINO, BUSQUEDA_MAX_TERMINOS
+from app.models.historia_clinica import HistoriaClinica
+from app.models.historia_termino import HistoriaTermino
+
+
+CAMPOS_INDEXADOS = ("motivo_consulta", "diagnostico", "tratamiento", "evolucion", "observaciones")
+
+_PALABRA = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes con contra cual cuando de del desde donde
+durante e el ella ellas ellos en entre era es esa esas ese eso esos esta estaba estan estas este
+esto estos fue ha hace hacia hasta hay la las le les lo los mas me mi muy nada ni no nos o otra
+otro para pero poco por porque que se segun ser si sin sobre su sus tambien tiene toda todo tras
+un una uno unos y ya
+""".split())
+
+# Sufijos ordenados de más largo a más corto; se quita el primero que coincida
+SUFIJOS = (
+    "amientos", "imientos", "aciones", "uciones", "amiento", "imiento", "mente", "acion", "ucion",
+    "idades", "idad", "ismos", "ismo", "istas", "ista", "ancias", "ancia", "encias", "encia",
+    "ables", "able", "ibles", "ible", "osos", "osas", "oso", "osa", "ivos", "ivas", "ivo", "iva",
+    "ados", "adas", "ado", "ada", "idos", "idas", "ido", "ida", "ales", "al",
+    "es", "as", "os", "s", "a", "o",
+)
+LARGO_MINIMO_RAIZ = 4
+
+
+def quitar_acentos(texto: str) -> str:
+    """Elimina tildes y diéresis (la ñ queda como n)"""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def stem(palabra: str) -> str:
+    """Stemming liviano: quita un sufijo si la raíz resultante no queda demasiado corta"""
+    for sufijo in SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= LARGO_MINIMO_RAIZ:
+            return palabra[: -len(sufijo)]
+    return palabra
+
+
+def normalizar_terminos(texto: Optional[str]) -> list:
+    """
+    Convierte un texto libre en la lista de términos indexables
+
+    Args:
+        texto: Texto a normalizar (ej: "Lumbalgias crónicas")
+
+    Returns:
+        Lista de términos (ej: ["lumbalgi", "cronic"])
+    """
+    if not texto:
+        return []
+    palabras = _PALABRA.findall(quitar_acentos(texto.lower()))
+    return [stem(p)[:64] for p in palabras if p not in STOPWORDS and len(p) > 1]
+
+
+def terminos_historia(historia: HistoriaClinica) -> Counter:
+    """Cuenta los términos de todos los campos de texto de una historia"""
+    contador = Counter()
+    for campo in CAMPOS_INDEXADOS:
+        contador.update(normalizar_terminos(getattr(historia, campo)))
+    return contador
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# MANTENIMIENTO DEL ÍNDICE
+# ══════════════════════════════════════════════════════════════════════════
+
+def eliminar_indice(db: Session, historia_id: int):
+    """Borra los términos indexados de una historia (no hace commit)"""
+    db.query(HistoriaTermino).filter(HistoriaTermino.historia_id == historia_id).delete(synchronize_session=False)
+
+
+def indexar_historia(db: Session, historia: HistoriaClinica):
+    """
+    (Re)indexa una historia dentro de la transacción actual (no hace commit).
+    La historia debe tener id (usar después de db.flush()).
+    """
+    eliminar_indice(db, historia.id)
+    filas = [
+        {"historia_id": historia.id, "termino": termino, "frecuencia": frecuencia}
+        for termino, frecuencia in terminos_historia(historia).items()
+    ]
+    if filas:
+        db.bulk_insert_mappings(HistoriaTermino, filas)
+
+
+def reindexar_todo(db: Session, lote: int = 1000) -> int:
+    """Reconstruye el índice completo, confirmando cada `lote` historias"""
+    db.query(HistoriaTermino).delete(synchronize_session=False)
+    db.commit()
+
+    total = 0
+    ultimo_id = 0
+    while True:
+        historias = (
+            db.query(HistoriaClinica)
+            .filter(HistoriaClinica.id > ultimo_id)
+            .order_by(HistoriaClinica.id)
+            .limit(lote)
+            .all()
+        )
+        if not historias:
+            return total
+        ultimo_id = historias[-1].id
+        # El índice ya está vacío: se inserta todo el lote de una vez, sin borrar por historia
+        filas = [
+            {"historia_id": historia.id, "termino": termino, "frecuencia": frecuencia}
+            for historia in historias
+            for termino, frecuencia in terminos_historia(historia).items()
+        ]
+        if filas:
+            db.execute(insert(HistoriaTermino), filas)
+        db.commit()
+        db.expunge_all()
+        total += len(historias)
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# CONSULTA
+# ══════════════════════════════════════════════════════════════════════════
+
+def frecuencia_documental(db: Session, termino: str, tope: int) -> int:
+    """Historias que contienen el término, contando como mucho hasta tope + 1 (rango del índice)"""
+    postings = (
+        select(HistoriaTermino.historia_id)
+        .where(HistoriaTermino.termino == termino)
+        .limit(tope + 1)
+        .subquery()
+    )
+    return db.scalar(select(func.count()).select_from(postings))
+
+
+def _postings_recientes(termino: str, tope: int, filtros: list):
+    """
+    Las `tope` historias más recientes (id más alto) que contienen el término,
+    entre las que cumplen `filtros` (condiciones sobre HistoriaClinica)
+    """
+    postings = select(HistoriaTermino.historia_id).where(HistoriaTermino.termino == termino)
+    if filtros:
+        postings = postings.join(HistoriaClinica, HistoriaClinica.id == HistoriaTermino.historia_id).where(*filtros)
+    postings = postings.order_by(HistoriaTermino.historia_id.desc()).limit(tope).subquery()
+    return select(postings.c.historia_id)
+
+
+def buscar_historias(
+    db: Session,
+    texto: str,
+    paciente_id: Optional[int] = None,
+    kinesiologo_id: Optional[int] = None,
+    limit: int = 20,
+) -> list:
+    """
+    Busca historias por relevancia.
+    Primero las que contienen más términos distintos de la consulta; a igual
+    cantidad, mayor puntaje TF-IDF (frecuencia del término ponderada por rareza).
+
+    Candidatos: si la consulta tiene términos "raros" (en hasta
+    BUSQUEDA_MAX_CANDIDATOS_TERMINO historias), los candidatos son las historias
+    que contienen alguno de ellos; los términos comunes solo suman puntaje. Si
+    todos son comunes, se toman las BUSQUEDA_MAX_CANDIDATOS_TERMINO historias
+    más recientes de cada término. Así la agregación nunca recorre todos los
+    postings de un término común. Con filtro de paciente / kinesiólogo los
+    candidatos salen de sus historias, con todos los términos de la consulta.
+
+    Args:
+        db: Sesión de base de datos
+        texto: Consulta libre (ej: "lumbalgia LCA")
+        paciente_id: Restringe a un paciente (usado para pacientes)
+        kinesiologo_id: Restringe a un kinesiólogo
+        limit: Máximo de resultados
+
+    Returns:
+        Lista de tuplas (historia_id, relevancia) ordenadas
+    """
+    terminos = list(dict.fromkeys(normalizar_terminos(texto)))[:BUSQUEDA_MAX_TERMINOS]
+    if not terminos:
+        return []
+
+    # Frecuencia documental por término, acotada: los comunes quedan en tope + 1
+    tope = BUSQUEDA_MAX_CANDIDATOS_TERMINO
+    documentos = {}
+    for termino in terminos:
+        cantidad = frecuencia_documental(db, termino, tope)
+        if cantidad:
+            documentos[termino] = cantidad
+    if not documentos:
+        return []
+
+    filtros = []
+    if paciente_id is not None:
+        filtros.append(HistoriaClinica.paciente_id == paciente_id)
+    if kinesiologo_id is not None:
+        filtros.append(HistoriaClinica.kinesiologo_id == kinesiologo_id)
+
+    # Sin filtro, los términos raros definen los candidatos (los comunes solo puntúan)
+    raros = [termino for termino, cantidad in documentos.items() if cantidad <= tope]
+    generadores = documentos if filtros else (raros or documentos)
+    candidatos = union(*[_postings_recientes(termino, tope, filtros) for termino in generadores]).subquery()
+
+    pesos = {termino: 1.0 / log(2 + cantidad) for termino, cantidad in documentos.items()}
+    peso_termino = case(
+        *[(HistoriaTermino.termino == termino, peso) for termino, peso in pesos.items()],
+        else_=0.0
+    )
+    coincidencias = func.count(func.distinct(HistoriaTermino.termino))
+    relevancia = func.sum(HistoriaTermino.frecuencia * peso_termino)
+
+    # Los candidatos ya respetan los filtros: no hace falta otro JOIN con historias
+    query = (
+        db.query(HistoriaTermino.historia_id, coincidencias.label("coincidencias"), relevancia.label("relevancia"))
+        .filter(
+            HistoriaTermino.termino.in_(list(pesos)),
+            HistoriaTermino.historia_id.in_(select(candidatos.c.historia_id)),
+        )
+    )
+
+    filas = (
+        query.group_by(HistoriaTermino.historia_id)
+        .order_by(coincidencias.desc(), relevancia.desc(), HistoriaTermino.historia_id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [(fila.historia_id, round(float(fila.relevancia), 4)) for fila in filas]
@@ -0,0 +1,190 @@
+"""
+Sparse fieldsets: ?fields=id,fecha,paciente.user.nombre
+Traduce la lista de campos pedidos a loader options de la consulta:
+- load_only con las columnas pedidas de cada entidad (más la PK)
+- joinedload (muchos a uno) / selectinload (colecciones) solo para las
+  relaciones pedidas, con su propio load_only
+
+Las columnas y relaciones que no se piden nunca se leen de la base. Los campos
+válidos son los del schema de salida del endpoint (ej: TurnoOut) que existen
+como columna o relación del modelo: nunca se expone algo que el endpoint no
+devolvería completo (ej: password_hash).
+
+La respuesta se arma con los valores tal como vienen de la base, sin pasar por
+el schema de salida (igual que las filas proyectadas con respuesta_datos).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type, Union, get_args, get_origin
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+DESCRIPCION_FIELDS = "Campos separados por coma; los anidados con punto (ej: id,fecha,paciente.user.nombre)"
+
+
+def _schema_anidado(anotacion: Any) -> Optional[Type[BaseModel]]:
+    """Schema Pydantic dentro de Optional[...] / List[...], o None si el campo es escalar"""
+    if isinstance(anotacion, type) and issubclass(anotacion, BaseModel):
+        return anotacion
+    if get_origin(anotacion) in (Union, list, List):
+        for argumento in get_args(anotacion):
+            schema = _schema_anidado(argumento)
+            if schema is not None:
+                return schema
+    return None
+
+
+class Proyeccion:
+    """
+    Campos pedidos de una entidad y de sus relaciones
+
+    Args:
+        modelo: Modelo SQLAlchemy
+        columnas: Columnas a devolver, en el orden pedido
+        relaciones: Proyección de cada relación pedida
+        colecciones: Nombres de las relaciones que son colecciones (uselist)
+    """
+
+    def __init__(self, modelo, columnas: List[str], relaciones: Dict[str, "Proyeccion"], colecciones: set):
+        self.modelo = modelo
+        self.columnas = columnas
+        self.relaciones = relaciones
+        self.colecciones = colecciones
+
+    def _columnas_a_cargar(self) -> list:
+        claves_primarias = [columna.key for columna in inspect(self.modelo).primary_key]
+        nombres = dict.fromkeys(claves_primarias + self.columnas)
+        return [getattr(self.modelo, nombre) for nombre in nombres]
+
+    def opciones(self) -> list:
+        """Loader options para select(modelo) / db.query(modelo)"""
+        return [load_only(*self._columnas_a_cargar())] + self._opciones_relaciones(None)
+
+    def _opciones_relaciones(self, cargador) -> list:
+        opciones = []
+        for nombre, proyeccion in self.relaciones.items():
+            atributo = getattr(self.modelo, nombre)
+            if cargador is None:
+                sub = selectinload(atributo) if nombre in self.colecciones else joinedload(atributo)
+            else:
+                sub = cargador.selectinload(atributo) if nombre in self.colecciones else cargador.joinedload(atributo)
+            opciones.append(sub.load_only(*proyeccion._columnas_a_cargar()))
+            opciones.extend(proyeccion._opciones_relaciones(sub))
+        return opciones
+
+    def a_dict(self, obj) -> Optional[dict]:
+        if obj is None:
+            return None
+        datos = {columna: getattr(obj, columna) for columna in self.columnas}
+        for nombre, proyeccion in self.relaciones.items():
+            valor = getattr(obj, nombre)
+            if nombre in self.colecciones:
+                datos[nombre] = [proyeccion.a_dict(item) for item in valor]
+            else:
+                datos[nombre] = proyeccion.a_dict(valor)
+        return datos
+
+    def a_dicts(self, objs: Iterable) -> List[dict]:
+        return [self.a_dict(obj) for obj in objs]
+
+
+def _arbol_completo(schema: Type[BaseModel]) -> dict:
+    """Todos los campos de un schema, con sus schemas anidados completos"""
+    arbol = {}
+    for nombre, campo in schema.model_fields.items():
+        anidado = _schema_anidado(campo.annotation)
+        arbol[nombre] = _arbol_completo(anidado) if anidado else None
+    return arbol
+
+
+def _construir(arbol: dict, schema: Optional[Type[BaseModel]], modelo, prefijo: str, invalidos: list) -> Proyeccion:
+    mapper = inspect(modelo)
+    columnas, relaciones, colecciones = [], {}, set()
+
+    for nombre, subcampos in arbol.items():
+        ruta = f"{prefijo}{nombre}"
+        if schema is None:
+            # Sin schema: cualquier columna del modelo, sin relaciones
+            if nombre in mapper.column_attrs and subcampos is None:
+                columnas.append(nombre)
+            else:
+                invalidos.append(ruta)
+            continue
+
+        campo = schema.model_fields.get(nombre)
+        if campo is None:
+            invalidos.append(ruta)
+        elif nombre in mapper.relationships:
+            relacion = mapper.relationships[nombre]
+            sub_schema = _schema_anidado(campo.annotation)
+            if sub_schema is None:
+                invalidos.append(ruta)
+                continue
+            if subcampos is None:
+                subcampos = _arbol_completo(sub_schema)
+            relaciones[nombre] = _construir(subcampos, sub_schema, relacion.mapper.class_, f"{ruta}.", invalidos)
+            if relacion.uselist:
+                colecciones.add(nombre)
+        elif nombre in mapper.column_attrs and subcampos is None:
+            columnas.append(nombre)
+        else:
+            # Campo calculado del schema o subcampos de una columna escalar
+            invalidos.append(ruta)
+
+    return Proyeccion(modelo, columnas, relaciones, colecciones)
+
+
+def parsear_campos(
+    fields: Optional[str],
+    schema: Optional[Type[BaseModel]],
+    modelo,
+    obligatorios: Sequence[str] = ("id",),
+    atajos: Optional[Dict[str, Iterable[str]]] = None,
+) -> Optional[Proyeccion]:
+    """
+    Convierte ?fields=a,b,rel.c en una Proyeccion
+
+    Args:
+        fields: Campos separados por coma; los anidados con punto (paciente.user.nombre).
+            Una relación sin subcampos (ej: "sala") trae todos los campos de su schema
+        schema: Schema de salida del endpoint (define qué campos son válidos);
+            None para aceptar cualquier columna del modelo
+        modelo: Modelo SQLAlchemy consultado
+        obligatorios: Campos de la raíz que siempre se devuelven (ej: id, columnas del cursor)
+        atajos: Nombres que se expanden a varios campos (ej: {"resumen": [...]})
+
+    Returns:
+        Proyeccion, o None si no se pidió fields (respuesta completa)
+
+    Raises:
+        HTTPException 400: Si se pide un campo inexistente en el schema o el modelo
+    """
+    if not fields:
+        return None
+
+    pedidos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+    expandidos = []
+    for campo in pedidos:
+        expandidos.extend((atajos or {}).get(campo, [campo]))
+
+    arbol: dict = {}
+    for campo in list(obligatorios) + expandidos:
+        nodo = arbol
+        *padres, hoja = campo.split(".")
+        for padre in padres:
+            # "paciente" y "paciente.user.nombre" juntos: gana la relación completa
+            if padre in nodo and nodo[padre] is None:
+                break
+            nodo = nodo.setdefault(padre, {})
+        else:
+            nodo[hoja] = None
+
+    invalidos: list = []
+    proyeccion = _construir(arbol, schema, modelo, "", invalidos)
+    if invalidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos inválidos: {', '.join(sorted(invalidos))}"
+        )
+    return proyeccion
@@ -0,0 +1,177 @@
+"""
+Captura de tráfico para planificación de capacidad
+Middleware opcional que escribe una línea NDJSON por request con método, ruta
+plantilla (ej: /turnos/{turno_id}), query params y forma del body ya anonimizados,
+código de respuesta y tiempos. No guarda nombres, emails, DNIs, teléfonos,
+contraseñas ni tokens. El archivo se reproduce con scripts/reproducir_trafico.py
+"""
+from typing import Optional
+import json
+import queue
+import random
+import re
+import threading
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import CAPTURA_ARCHIVO, CAPTURA_MUESTREO
+
+# Query params cuyo valor nunca se guarda (texto libre o datos personales)
+PARAMETROS_SENSIBLES = frozenset({
+    "q", "query", "nombre", "email", "dni", "telefono", "password", "token", "direccion", "obra_social"
+})
+# Campos del body con valores categóricos (no personales) que se conservan tal cual
+CAMPOS_CATEGORICOS = frozenset({"estado", "formato", "metodo", "tipo", "dia_semana"})
+# Valores "seguros": números, fechas, horas, booleanos y códigos cortos (estado, formato, cursor...)
+_VALOR_SEGURO = re.compile(r"^[\w\-:.=]{1,64}$")
+_FECHA = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_HORA = re.compile(r"^\d{2}:\d{2}(:\d{2})?$")
+
+RUTAS_EXCLUIDAS = ("/docs", "/redoc", "/openapi.json", "/debug")
+MAX_BYTES_BODY = 64 * 1024
+
+
+def anonimizar_query(query_string: bytes) -> dict:
+    """Conserva los valores no sensibles; el resto se reemplaza por su tipo y largo"""
+    from urllib.parse import parse_qsl
+
+    resultado = {}
+    for clave, valor in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+        if clave.lower() in PARAMETROS_SENSIBLES or not _VALOR_SEGURO.match(valor) or "@" in valor:
+            resultado[clave] = f"<texto:{len(valor)}>"
+        else:
+            resultado[clave] = valor
+    return resultado
+
+
+def forma_json(valor):
+    """
+    Describe la estructura de un JSON sin sus datos
+
+    Returns:
+        Mismo anidamiento con los escalares reemplazados por su tipo
+        (int, float, bool, null, date, time, texto:N); las listas guardan
+        la forma del primer elemento y el largo. Los CAMPOS_CATEGORICOS
+        (estado, formato...) conservan su valor
+    """
+    if isinstance(valor, dict):
+        return {
+            clave: v if clave in CAMPOS_CATEGORICOS and isinstance(v, str) and len(v) <= 32 else forma_json(v)
+            for clave, v in valor.items()
+        }
+    if isinstance(valor, list):
+        return {"_lista": len(valor), "_item": forma_json(valor[0]) if valor else None}
+    if isinstance(valor, bool):
+        return "bool"
+    if isinstance(valor, int):
+        return "int"
+    if isinstance(valor, float):
+        return "float"
+    if valor is None:
+        return "null"
+    if _FECHA.match(valor):
+        return "date"
+    if _HORA.match(valor):
+        return "time"
+    return f"texto:{len(valor)}"
+
+
+def forma_body(cuerpo: bytes, content_type: str) -> Optional[object]:
+    if not cuerpo:
+        return None
+    if "json" in content_type:
+        try:
+            return forma_json(json.loads(cuerpo))
+        except ValueError:
+            pass
+    return {"_bytes": len(cuerpo), "_tipo": content_type.split(";")[0] or "desconocido"}
+
+
+class EscritorCaptura:
+    """Escribe las líneas en un hilo aparte para no bloquear el event loop con I/O de disco"""
+
+    def __init__(self, archivo: str):
+        self.archivo = archivo
+        self.cola = queue.SimpleQueue()
+        self.hilo = threading.Thread(target=self._escribir, name="captura-trafico", daemon=True)
+        self.hilo.start()
+
+    def registrar(self, evento: dict):
+        self.cola.put(evento)
+
+    def _escribir(self):
+        with open(self.archivo, "a", encoding="utf-8") as f:
+            while True:
+                evento = self.cola.get()
+                f.write(json.dumps(evento, ensure_ascii=False, separators=(",", ":")) + "\n")
+                if self.cola.empty():
+                    f.flush()
+
+
+class CapturaMiddleware:
+    """
+    Middleware ASGI que registra cada request (según CAPTURA_MUESTREO) en
+    CAPTURA_ARCHIVO. El body se observa a medida que la app lo lee, sin
+    consumirlo ni copiarlo más allá de MAX_BYTES_BODY.
+    """
+
+    def __init__(self, app: ASGIApp, archivo: str = CAPTURA_ARCHIVO, muestreo: float = CAPTURA_MUESTREO):
+        self.app = app
+        self.muestreo = muestreo
+        self.escritor = EscritorCaptura(archivo)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(RUTAS_EXCLUIDAS)
+            or random.random() >= self.muestreo
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        inicio_epoch = time.time()
+        inicio = time.perf_counter()
+        partes_body = []
+        tamano_body = 0
+        estado = {"codigo": None, "bytes": 0, "primer_byte_ms": None}
+
+        async def recibir() -> Message:
+            nonlocal tamano_body
+            message = await receive()
+            if message["type"] == "http.request" and tamano_body < MAX_BYTES_BODY:
+                parte = message.get("body", b"")
+                partes_body.append(parte)
+                tamano_body += len(parte)
+            return message
+
+        async def enviar(message: Message):
+            if message["type"] == "http.response.start":
+                estado["codigo"] = message["status"]
+                estado["primer_byte_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+            elif message["type"] == "http.response.body":
+                estado["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, recibir, enviar)
+        finally:
+            ruta = scope.get("route")
+            headers = dict(scope.get("headers") or [])
+            self.escritor.registrar({
+                "ts": round(inicio_epoch, 6),
+                "metodo": scope["method"],
+                "ruta": getattr(ruta, "path", None) or "<sin_ruta>",
+                # Los path params son ids numéricos: se conservan para poder reproducir
+                "path_params": {
+                    clave: valor for clave, valor in (scope.get("path_params") or {}).items()
+                    if isinstance(valor, int) or str(valor).isdigit()
+                },
+                "query": anonimizar_query(scope.get("query_string", b"")),
+                "body": forma_body(b"".join(partes_body), headers.get(b"content-type", b"").decode("latin-1")),
+                "autenticado": b"authorization" in headers,
+                "codigo": estado["codigo"] or 500,
+                "duracion_ms": round((time.perf_counter() - inicio) * 1000, 3),
+                "primer_byte_ms": estado["primer_byte_ms"],
+                "bytes_respuesta": estado["bytes"],
+            })
@@ -0,0 +1,145 @@
+"""
+Compresión negociada de respuestas (gzip, y brotli si está instalado)
+Se omite para respuestas chicas y para rutas con streaming / SSE
+"""
+import gzip
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import COMPRESION_MIN_BYTES, COMPRESION_NIVEL_GZIP, COMPRESION_CALIDAD_BROTLI
+from app.core.metricas import metricas
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+
+def parsear_calidades(header: str) -> dict:
+    """
+    Parsea un header tipo Accept / Accept-Encoding con sus valores q
+
+    Args:
+        header: Valor del header (ej: "gzip;q=0.8, br")
+
+    Returns:
+        Dict {valor: calidad}
+    """
+    calidades = {}
+    for parte in header.split(","):
+        valor, _, params = parte.strip().partition(";")
+        valor = valor.strip().lower()
+        if not valor:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            clave, _, numero = param.strip().partition("=")
+            if clave == "q":
+                try:
+                    q = float(numero)
+                except ValueError:
+                    q = 0.0
+        calidades[valor] = q
+    return calidades
+
+
+def elegir_codificacion(accept_encoding: str):
+    """
+    Elige la mejor codificación soportada según Accept-Encoding
+
+    Returns:
+        "br", "gzip" o None si el cliente no acepta ninguna
+    """
+    calidades = parsear_calidades(accept_encoding)
+    comodin = calidades.get("*", 0.0)
+    soportadas = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    mejor, mejor_q = None, 0.0
+    for codificacion in soportadas:
+        q = calidades.get(codificacion, comodin)
+        if q > mejor_q:
+            mejor, mejor_q = codificacion, q
+    return mejor
+
+
+def comprimir(cuerpo: bytes, codificacion: str) -> bytes:
+    if codificacion == "br":
+        return brotli.compress(cuerpo, quality=COMPRESION_CALIDAD_BROTLI)
+    return gzip.compress(cuerpo, compresslevel=COMPRESION_NIVEL_GZIP)
+
+
+class CompresionMiddleware:
+    """
+    Middleware ASGI que comprime la respuesta completa cuando:
+    - El cliente acepta gzip o br
+    - El cuerpo supera `minimo_bytes`
+    - La respuesta no es streaming (un solo mensaje de body) ni text/event-stream
+    - La respuesta no trae ya un Content-Encoding
+    """
+
+    def __init__(self, app: ASGIApp, minimo_bytes: int = COMPRESION_MIN_BYTES):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        mensaje_inicio = None
+        directo = False
+
+        async def enviar(message: Message):
+            nonlocal mensaje_inicio, directo
+
+            if message["type"] == "http.response.start":
+                mensaje_inicio = message
+                return
+
+            if directo or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            directo = True
+            headers = MutableHeaders(raw=mensaje_inicio["headers"])
+            cuerpo = message.get("body", b"")
+
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+            ):
+                await send(mensaje_inicio)
+                await send(message)
+                return
+
+            if len(cuerpo) < self.minimo_bytes:
+                metricas.incrementar("compresion.omitidas_por_tamano")
+                await send(mensaje_inicio)
+                await send(message)
+                return
+
+            inicio_cpu = time.thread_time()
+            comprimido = comprimir(cuerpo, codificacion)
+            cpu_ms = (time.thread_time() - inicio_cpu) * 1000
+
+            metricas.incrementar(f"compresion.respuestas.{codificacion}")
+            metricas.observar("compresion.bytes_originales", len(cuerpo))
+            metricas.observar("compresion.bytes_comprimidos", len(comprimido))
+            metricas.observar("compresion.ratio", len(cuerpo) / max(len(comprimido), 1))
+            metricas.observar("compresion.cpu_ms", cpu_ms)
+
+            headers["Content-Encoding"] = codificacion
+            headers["Content-Length"] = str(len(comprimido))
+            headers.add_vary_header("Accept-Encoding")
+            await send(mensaje_inicio)
+            await send({"type": "http.response.body", "body": comprimido})
+
+        await self.app(scope, receive, enviar)
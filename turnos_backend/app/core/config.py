@@ -0,0 +1,145 @@
+"""
+Configuración del backend leída desde variables de entorno (.env)
+"""
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# ══════════════════════════════════════════════════════════════════════════
+# COMPRESIÓN DE RESPUESTAS
+# ══════════════════════════════════════════════════════════════════════════
+
+COMPRESION_HABILITADA = os.getenv("COMPRESION_HABILITADA", "true").lower() == "true"
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", 1024))
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", 6))
+COMPRESION_CALIDAD_BROTLI = int(os.getenv("COMPRESION_CALIDAD_BROTLI", 4))
+
+# ══════════════════════════════════════════════════════════════════════════
+# CAPTURA DE TRÁFICO (planificación de capacidad)
+# ══════════════════════════════════════════════════════════════════════════
+
+CAPTURA_HABILITADA = os.getenv("CAPTURA_HABILITADA", "false").lower() == "true"
+CAPTURA_ARCHIVO = os.getenv("CAPTURA_ARCHIVO", "captura_trafico.ndjson")
+# Fracción de requests a registrar (1.0 = todas)
+CAPTURA_MUESTREO = float(os.getenv("CAPTURA_MUESTREO", 1.0))
+
+# ══════════════════════════════════════════════════════════════════════════
+# POOL DE CONEXIONES A LA BASE
+# ══════════════════════════════════════════════════════════════════════════
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+# Segundos que una request espera por una conexión libre antes de fallar
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+# Las conexiones se reemplazan al superar esta edad (segundos), antes de que
+# MySQL las corte por wait_timeout; reemplaza al pre-ping en cada checkout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+
+# Pools separados por tipo de carga: un export largo no puede quedarse con las
+# conexiones de login / reservas. DB_POOL_SIZE y DB_MAX_OVERFLOW son los del
+# pool interactivo. Timeout de sentencia en ms (MySQL, 0 = sin límite): es el
+# SET SESSION MAX_EXECUTION_TIME de cada conexión, el valor por defecto del pool.
+# Si la ruta declara una clase (TIMEOUTS_SENTENCIA_MS, más abajo) manda la ruta:
+# el hint por sentencia reemplaza al de la sesión, sea mayor o menor
+POOLS_POR_CARGA = {
+    "interactivo": {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout_sentencia_ms": int(os.getenv("DB_TIMEOUT_SENTENCIA_INTERACTIVO_MS", 5000)),
+    },
+    "reportes": {
+        "pool_size": int(os.getenv("DB_POOL_REPORTES_SIZE", 4)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW_REPORTES", 2)),
+        "timeout_sentencia_ms": int(os.getenv("DB_TIMEOUT_SENTENCIA_REPORTES_MS", 120000)),
+    },
+    "background": {
+        "pool_size": int(os.getenv("DB_POOL_BACKGROUND_SIZE", 2)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW_BACKGROUND", 1)),
+        "timeout_sentencia_ms": int(os.getenv("DB_TIMEOUT_SENTENCIA_BACKGROUND_MS", 0)),
+    },
+}
+
+# ══════════════════════════════════════════════════════════════════════════
+# RÉPLICA DE LECTURA (DATABASE_URL_LECTURA, ver app/database.py)
+# ══════════════════════════════════════════════════════════════════════════
+
+# Después de una escritura propia, las lecturas de ese cliente van al primario
+# durante esta ventana (read-your-writes mientras la réplica se pone al día)
+LECTURA_VENTANA_PRIMARIO = float(os.getenv("LECTURA_VENTANA_PRIMARIO", 5))
+# Si la réplica no responde, se lee del primario durante estos segundos antes de reintentar
+LECTURA_REINTENTO_REPLICA = float(os.getenv("LECTURA_REINTENTO_REPLICA", 30))
+
+# ══════════════════════════════════════════════════════════════════════════
+# LÍMITE DE TIEMPO POR SENTENCIA SEGÚN CLASE DE RUTA (ms)
+# ══════════════════════════════════════════════════════════════════════════
+
+# Se aplica a cada SELECT de la request (hint MAX_EXECUTION_TIME en MySQL);
+# al excederse la consulta se cancela y la request responde 503.
+# Precedencia: clase de la ruta > timeout_sentencia_ms del pool (POOLS_POR_CARGA).
+# El del pool solo rige para rutas sin clase, middlewares y trabajos en segundo plano
+TIMEOUTS_SENTENCIA_MS = {
+    "reserva": int(os.getenv("TIMEOUT_SENTENCIA_RESERVA_MS", 500)),
+    "consulta": int(os.getenv("TIMEOUT_SENTENCIA_CONSULTA_MS", 2000)),
+    "busqueda": int(os.getenv("TIMEOUT_SENTENCIA_BUSQUEDA_MS", 3000)),
+    "exportacion": int(os.getenv("TIMEOUT_SENTENCIA_EXPORTACION_MS", 60000)),
+}
+
+# ══════════════════════════════════════════════════════════════════════════
+# THREADPOOL Y CONTROL DE ADMISIÓN (ver app/core/admision.py)
+# ══════════════════════════════════════════════════════════════════════════
+
+# Hilos de AnyIO para handlers y dependencias sync (el default de AnyIO es 40)
+THREADPOOL_HILOS = int(os.getenv("THREADPOOL_HILOS", 40))
+ADMISION_HABILITADA = os.getenv("ADMISION_HABILITADA", "true").lower() == "true"
+# Requests esperando un hilo libre a partir de las cuales se rechazan las rutas
+# de baja prioridad (las normales se rechazan con el doble)
+ADMISION_COLA_MAXIMA = int(os.getenv("ADMISION_COLA_MAXIMA", 20))
+# p95 de la espera por un hilo (ms) a partir del cual se rechazan las rutas de baja prioridad
+ADMISION_P95_OBJETIVO_MS = float(os.getenv("ADMISION_P95_OBJETIVO_MS", 250))
+# Las esperas más viejas que esto (segundos) no cuentan para el p95
+ADMISION_VENTANA_SEGUNDOS = float(os.getenv("ADMISION_VENTANA_SEGUNDOS", 10))
+ADMISION_RETRY_AFTER = int(os.getenv("ADMISION_RETRY_AFTER", 2))
+
+# ══════════════════════════════════════════════════════════════════════════
+# IMPORTACIÓN DE PACIENTES (app/core/importacion.py)
+# ══════════════════════════════════════════════════════════════════════════
+
+# Procesos para hashear contraseñas: acotado para no ocupar todos los núcleos del servidor
+IMPORTACION_PROCESOS = int(os.getenv("IMPORTACION_PROCESOS", min(4, os.cpu_count() or 1)))
+
+# ══════════════════════════════════════════════════════════════════════════
+# BÚSQUEDA DE TEXTO EN HISTORIAS (app/core/busqueda.py)
+# ══════════════════════════════════════════════════════════════════════════
+
+# Historias candidatas que aporta cada término: acota el costo de los términos comunes
+BUSQUEDA_MAX_CANDIDATOS_TERMINO = int(os.getenv("BUSQUEDA_MAX_CANDIDATOS_TERMINO", 2000))
+# Términos de la consulta que se tienen en cuenta (el resto se ignora)
+BUSQUEDA_MAX_TERMINOS = int(os.getenv("BUSQUEDA_MAX_TERMINOS", 8))
+
+# ══════════════════════════════════════════════════════════════════════════
+# IDEMPOTENCY-KEY (reintentos de reservas y cambios de estado)
+# ══════════════════════════════════════════════════════════════════════════
+
+# Horas durante las que se guarda la respuesta de cada clave
+IDEMPOTENCIA_TTL_HORAS = float(os.getenv("IDEMPOTENCIA_TTL_HORAS", 24))
+# Lease de una clave "en curso": pasado este tiempo sin respuesta (ej: el proceso
+# murió) un reintento la toma. Debe superar la duración máxima de una request
+IDEMPOTENCIA_LEASE_SEGUNDOS = float(os.getenv("IDEMPOTENCIA_LEASE_SEGUNDOS", 60))
+
+# ══════════════════════════════════════════════════════════════════════════
+# POST /batch
+# ══════════════════════════════════════════════════════════════════════════
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 20))
+
+# ══════════════════════════════════════════════════════════════════════════
+# OPERACIONES EN LOTE (/lote de usuarios, salas y servicios)
+# ══════════════════════════════════════════════════════════════════════════
+
+LOTE_MAX_ITEMS = int(os.getenv("LOTE_MAX_ITEMS", 500))
+# Alta masiva de usuarios: cada item paga un hash bcrypt (~0.25 s), el lote es más chico
+LOTE_MAX_USUARIOS = int(os.getenv("LOTE_MAX_USUARIOS", 50))
+# Hilos para hashear esos lotes (bcrypt libera el GIL): acotado como IMPORTACION_PROCESOS
+LOTE_HASH_HILOS = int(os.getenv("LOTE_HASH_HILOS", min(4, os.cpu_count() or 1)))
@@ -1,4 +1,6 @@
+from sqlalchemy.orm import joinedload, selectinload
 from app.core.crud_base import CRUDBase
+from app.core.security import get_password_hash
 from app.models.paciente import Paciente
 from app.models.kinesiologo import Kinesiologo
 from app.models.sala import Sala
@@ -12,10 +14,47 @@ from app.schemas.servicio_schema import ServicioCreate, ServicioUpdate
 from app.schemas.user_schema import UserCreate, UserUpdate
 from app.schemas.role_schema import RoleCreate, RoleUpdate
 
+# Loader options compartidas: PacienteOut / KinesiologoOut embeben UserOut, que embebe roles.
+# joinedload para el usuario (muchos a uno) y selectinload para roles (colección),
+# así un listado cuesta siempre 2 queries sin importar la cantidad de filas.
+def _perfil_con_usuario(modelo):
+    return [joinedload(modelo.user).selectinload(User.roles)]
+
+_usuario_con_roles = [selectinload(User.roles)]
+
+
+class CRUDUsuario(CRUDBase[User, UserCreate, UserUpdate]):
+    """CRUD de usuarios: la contraseña del schema se guarda hasheada en password_hash"""
+
+    def datos_creacion(self, obj_in: UserCreate) -> dict:
+        datos = obj_in.dict()
+        datos["password_hash"] = get_password_hash(datos.pop("password"))
+        return datos
+
+    def datos_actualizacion(self, obj_in: UserUpdate) -> dict:
+        datos = obj_in.dict(exclude_unset=True)
+        password = datos.pop("password", None)
+        if password:
+            datos["password_hash"] = get_password_hash(password)
+        return datos
+
+
 # Instancias CRUD para cada modelo
-paciente_crud = CRUDBase[Paciente, PacienteCreate, PacienteUpdate](Paciente)
-kinesiologo_crud = CRUDBase[Kinesiologo, KinesiologoCreate, KinesiologoUpdate](Kinesiologo)
+paciente_crud = CRUDBase[Paciente, PacienteCreate, PacienteUpdate](
+    Paciente,
+    opciones_lista=_perfil_con_usuario(Paciente),
+    opciones_detalle=_perfil_con_usuario(Paciente),
+)
+kinesiologo_crud = CRUDBase[Kinesiologo, KinesiologoCreate, KinesiologoUpdate](
+    Kinesiologo,
+    opciones_lista=_perfil_con_usuario(Kinesiologo),
+    opciones_detalle=_perfil_con_usuario(Kinesiologo),
+)
 sala_crud = CRUDBase[Sala, SalaCreate, SalaUpdate](Sala)
 servicio_crud = CRUDBase[Servicio, ServicioCreate, ServicioUpdate](Servicio)
-user_crud = CRUDBase[User, UserCreate, UserUpdate](User)
+user_crud = CRUDUsuario(
+    User,
+    opciones_lista=_usuario_con_roles,
+    opciones_detalle=_usuario_con_roles,
+)
 role_crud = CRUDBase[Role, RoleCreate, RoleUpdate](Role)
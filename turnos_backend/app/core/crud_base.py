@@ -1,6 +1,10 @@
-from typing import Generic, TypeVar, Type, Optional, List
+from contextlib import contextmanager
+from typing import Generic, TypeVar, Type, Optional, List, Sequence
 from fastapi import HTTPException
+from sqlalchemy import delete, insert, inspect, select, update, func, exists as sql_exists
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import MANYTOMANY, MANYTOONE
 from pydantic import BaseModel
 from app.database import Base
 
@@ -10,24 +14,59 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    """Clase base genérica para operaciones CRUD"""
+    """
+    Clase base genérica para operaciones CRUD
+
+    Cada instancia puede declarar loader options (joinedload / selectinload)
+    que se aplican automáticamente según la operación:
+    - opciones_lista: get_multi y get_many
+    - opciones_detalle: get y get_or_404
+    Las tres aceptan `opciones` para reemplazarlas en una llamada (ej: ?fields=)
+
+    datos_creacion / datos_actualizacion convierten el schema en columnas del
+    modelo; las subclases los redefinen cuando no coinciden (ej: password -> password_hash)
+    """
     
-    def __init__(self, model: Type[ModelType]):
+    def __init__(
+        self,
+        model: Type[ModelType],
+        opciones_lista: Sequence = (),
+        opciones_detalle: Sequence = (),
+    ):
         self.model = model
+        self.opciones_lista = tuple(opciones_lista)
+        self.opciones_detalle = tuple(opciones_detalle)
+
+    def _query(self, db: Session, opciones: Sequence = ()):
+        """Query base del modelo con las loader options indicadas"""
+        query = db.query(self.model)
+        if opciones:
+            query = query.options(*opciones)
+        return query
 
-    def get(self, db: Session, id: int) -> Optional[ModelType]:
+    def datos_creacion(self, obj_in: CreateSchemaType) -> dict:
+        """Columnas a insertar a partir del schema de creación"""
+        return obj_in.dict()
+
+    def datos_actualizacion(self, obj_in: UpdateSchemaType) -> dict:
+        """Columnas a modificar a partir del schema de actualización (solo las enviadas)"""
+        return obj_in.dict(exclude_unset=True)
+
+    def get(self, db: Session, id: int, opciones: Optional[Sequence] = None) -> Optional[ModelType]:
         """Obtener un registro por ID"""
-        return db.query(self.model).filter(self.model.id == id).first()
+        opciones = self.opciones_detalle if opciones is None else opciones
+        return self._query(db, opciones).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, opciones: Optional[Sequence] = None
     ) -> List[ModelType]:
         """Obtener múltiples registros con paginación"""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        opciones = self.opciones_lista if opciones is None else opciones
+        return self._query(db, opciones).offset(skip).limit(limit).all()
 
     def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
         """Crear un nuevo registro"""
-        obj_data = obj_in.dict()
+        obj_data = self.datos_creacion(obj_in)
         db_obj = self.model(**obj_data)
         db.add(db_obj)
         db.commit()
@@ -38,11 +77,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self, db: Session, id: int, obj_in: UpdateSchemaType
     ) -> Optional[ModelType]:
         """Actualizar un registro existente"""
-        db_obj = self.get(db, id)
+        db_obj = db.get(self.model, id)
         if not db_obj:
             return None
         
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = self.datos_actualizacion(obj_in)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
         
@@ -52,19 +91,132 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     def delete(self, db: Session, id: int) -> Optional[ModelType]:
         """Eliminar un registro"""
-        obj = self.get(db, id)
+        obj = db.get(self.model, id)
         if not obj:
             return None
         db.delete(obj)
         db.commit()
         return obj
 
-    def get_or_404(self, db: Session, id: int) -> ModelType:
+    def get_or_404(self, db: Session, id: int, opciones: Optional[Sequence] = None) -> ModelType:
         """Obtener un registro o lanzar error 404"""
-        obj = self.get(db, id)
+        obj = self.get(db, id, opciones)
         if not obj:
             raise HTTPException(
                 status_code=404,
                 detail=f"{self.model.__name__} no encontrado"
             )
         return obj
+
+    # ─────────────────────────────────────────────
+    # Operaciones en lote / consultas livianas
+    # ─────────────────────────────────────────────
+
+    @contextmanager
+    def _transaccion_lote(self, db: Session):
+        """Commit al final del lote; una violación de unicidad / FK revierte todo y responde 409"""
+        try:
+            yield
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"El lote de {self.model.__name__} viola una restricción de unicidad o de clave foránea"
+            )
+
+    def get_many(self, db: Session, ids: Sequence[int]) -> List[ModelType]:
+        """Obtener varios registros con una sola consulta IN, respetando el orden de `ids`"""
+        if not ids:
+            return []
+        encontrados = self._query(db, self.opciones_lista).filter(self.model.id.in_(set(ids))).all()
+        por_id = {obj.id: obj for obj in encontrados}
+        return [por_id[id] for id in ids if id in por_id]
+
+    def exists(self, db: Session, id: int) -> bool:
+        """Verificar si existe un registro sin cargar la fila"""
+        return db.query(sql_exists().where(self.model.id == id)).scalar()
+
+    def count(self, db: Session, **filtros) -> int:
+        """Contar registros, opcionalmente filtrando por igualdad (ej: activo=True)"""
+        query = select(func.count()).select_from(self.model).filter_by(**filtros)
+        return db.scalar(query)
+
+    def create_many(self, db: Session, objs_in: List[CreateSchemaType]) -> int:
+        """
+        Crear muchos registros con un único INSERT ejecutado en lote y un solo commit.
+        No hidrata objetos ORM; devuelve la cantidad de filas insertadas.
+
+        Raises:
+            HTTPException 409: Si alguna fila viola una restricción (no se inserta ninguna)
+        """
+        return self.insertar_filas(db, [self.datos_creacion(obj_in) for obj_in in objs_in])
+
+    def insertar_filas(self, db: Session, filas: List[dict]) -> int:
+        """Como create_many, pero con filas ya armadas (ej: contraseñas hasheadas de antemano)"""
+        if not filas:
+            return 0
+        with self._transaccion_lote(db):
+            db.execute(insert(self.model), filas)
+        return len(filas)
+
+    def update_many(
+        self, db: Session, ids: Sequence[int], obj_in: UpdateSchemaType
+    ) -> int:
+        """Aplicar los mismos cambios a varios registros con un solo UPDATE ... WHERE id IN"""
+        update_data = self.datos_actualizacion(obj_in)
+        if not ids or not update_data:
+            return 0
+        with self._transaccion_lote(db):
+            actualizados = (
+                db.query(self.model)
+                .filter(self.model.id.in_(ids))
+                .update(update_data, synchronize_session=False)
+            )
+        return actualizados
+
+    def delete_many(self, db: Session, ids: Sequence[int]) -> int:
+        """
+        Eliminar varios registros con DELETE ... WHERE id IN, resolviendo antes
+        las relaciones igual que delete() (una sentencia por relación, no por fila)
+        """
+        if not ids:
+            return 0
+        with self._transaccion_lote(db):
+            eliminados = _borrar_en_cascada(db, self.model, self.model.id.in_(ids))
+        return eliminados
+
+
+def _borrar_en_cascada(db: Session, modelo, filtro) -> int:
+    """
+    DELETE set-based de `modelo` WHERE filtro. Un DELETE masivo saltea las
+    cascadas del ORM, así que antes se replica lo que haría session.delete()
+    con cada relación:
+    - muchos a muchos: se borran las filas de la tabla intermedia (ej: user_roles)
+    - uno a muchos con cascade delete: se borran los hijos (recursivo)
+    - uno a muchos sin cascade: la FK de los hijos queda en NULL (ej: User.paciente)
+
+    Returns:
+        Cantidad de filas de `modelo` eliminadas
+    """
+    for relacion in inspect(modelo).relationships:
+        if relacion.viewonly or relacion.direction is MANYTOONE:
+            continue
+        if relacion.direction is MANYTOMANY:
+            for local, intermedia in relacion.synchronize_pairs:
+                db.execute(delete(relacion.secondary).where(intermedia.in_(select(local).where(filtro))))
+            continue
+        if relacion.passive_deletes:
+            # La base resuelve el ON DELETE
+            continue
+        hijo = relacion.mapper.class_
+        for local, remota in relacion.local_remote_pairs:
+            filtro_hijo = remota.in_(select(local).where(filtro))
+            if "delete" in relacion.cascade:
+                _borrar_en_cascada(db, hijo, filtro_hijo)
+            else:
+                db.execute(
+                    update(hijo).where(filtro_hijo).values({remota: None})
+                    .execution_options(synchronize_session=False)
+                )
+    return db.execute(delete(modelo).where(filtro).execution_options(synchronize_session=False)).rowcount
@@ -0,0 +1,61 @@
+"""
+Tablas e índices agregados al esquema existente
+El esquema original se administra fuera de la app (no hay migraciones); las
+tablas nuevas que usan las rutas (ej: el índice de búsqueda) y los índices
+nuevos sobre tablas existentes se crean al iniciar si no existen, así una base
+existente no falla ni queda con scans hasta que alguien corra un script.
+"""
+import logging
+
+from sqlalchemy import exists, select
+from sqlalchemy.engine import Engine
+
+from app.database import Base, SessionLocal, engine
+from app.models.clave_idempotencia import ClaveIdempotencia
+from app.models.historia_clinica import HistoriaClinica
+from app.models.historia_termino import HistoriaTermino
+
+logger = logging.getLogger(__name__)
+
+TABLAS_AGREGADAS = (
+    HistoriaTermino.__table__,
+    ClaveIdempotencia.__table__,
+)
+
+# Índices declarados en modelos de tablas que ya existían: create_all no los
+# agrega porque la tabla ya está. Sin ellos el timeline por cursor y las
+# estadísticas por paciente recorren la tabla entera
+INDICES_AGREGADOS = tuple(
+    indice for indice in HistoriaClinica.__table__.indexes
+    if indice.name in ("ix_historias_paciente_fecha",)
+)
+
+
+def crear_tablas_agregadas(bind: Engine = engine):
+    """CREATE TABLE de TABLAS_AGREGADAS que falten (checkfirst: no toca las existentes)"""
+    Base.metadata.create_all(bind=bind, tables=list(TABLAS_AGREGADAS), checkfirst=True)
+
+
+def crear_indices_agregados(bind: Engine = engine):
+    """CREATE INDEX de INDICES_AGREGADOS que falten (en MySQL, sobre una tabla grande puede tardar)"""
+    for indice in INDICES_AGREGADOS:
+        indice.create(bind=bind, checkfirst=True)
+
+
+def indice_busqueda_pendiente() -> bool:
+    """True si hay historias pero el índice de búsqueda está vacío (base anterior al índice)"""
+    with SessionLocal() as db:
+        hay_historias = db.scalar(select(exists().where(HistoriaClinica.id.isnot(None))))
+        hay_terminos = db.scalar(select(exists().where(HistoriaTermino.id.isnot(None))))
+    return bool(hay_historias and not hay_terminos)
+
+
+def preparar_esquema():
+    """Se ejecuta al iniciar la app"""
+    crear_tablas_agregadas()
+    crear_indices_agregados()
+    if indice_busqueda_pendiente():
+        logger.warning(
+            "El índice de búsqueda de historias está vacío: las historias existentes no aparecen "
+            "en /historias-clinicas/buscar hasta correr python -m scripts.reindexar_historias"
+        )
@@ -0,0 +1,235 @@
+"""
+Idempotency-Key para reservas y cambios de estado
+El front reintenta POST /turnos/ y PATCH /turnos/{id}/estado ante timeouts. Con
+el header Idempotency-Key, la primera request se ejecuta y su respuesta se
+guarda (tabla claves_idempotencia, IDEMPOTENCIA_TTL_HORAS); los reintentos con
+la misma clave se contestan con esa respuesta en una sola consulta por índice,
+sin volver a validar FKs ni superposición.
+
+Las claves son por cliente: se guardan junto al usuario del token (o al header
+Authorization si no es válido), así dos clientes con la misma clave no se cruzan.
+
+- Misma clave con otra request (método, ruta o body distintos): 422
+- Misma clave mientras la original sigue en curso: 409 con Retry-After
+- Clave en curso por más de IDEMPOTENCIA_LEASE_SEGUNDOS (el proceso murió sin
+  responder): el reintento la toma y se ejecuta
+- Respuestas 5xx o excepciones no se guardan: el reintento vuelve a ejecutar
+"""
+from datetime import datetime, timedelta
+import hashlib
+import random
+import re
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import IDEMPOTENCIA_LEASE_SEGUNDOS, IDEMPOTENCIA_TTL_HORAS
+from app.core.metricas import metricas
+from app.core.security import email_desde_token
+from app.database import AsyncSessionLocal
+from app.models.clave_idempotencia import MAX_BYTES_CUERPO, ClaveIdempotencia
+
+RUTAS_IDEMPOTENTES = (
+    ("POST", re.compile(r"^/turnos/?$")),
+    ("PATCH", re.compile(r"^/turnos/\d+/estado$")),
+)
+MAX_LARGO_CLAVE = 128
+# Respuestas más grandes no se guardan (las de turnos rondan 1-2 KB)
+MAX_BYTES_RESPUESTA = MAX_BYTES_CUERPO
+PROBABILIDAD_PURGA = 0.01
+
+
+def ruta_idempotente(metodo: str, ruta: str) -> bool:
+    return any(metodo == m and patron.match(ruta) for m, patron in RUTAS_IDEMPOTENTES)
+
+
+def hash_request(scope: Scope, cuerpo: bytes) -> str:
+    h = hashlib.sha256()
+    for parte in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), cuerpo):
+        h.update(parte)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def alcance_request(scope: Scope) -> str:
+    """
+    Quién hace la request, para separar las claves de cada cliente: el usuario
+    del token (un reintento con el token renovado sigue siendo el mismo) o, si
+    el token no es válido, el header Authorization tal cual
+    """
+    autorizacion = dict(scope.get("headers") or []).get(b"authorization", b"").decode("latin-1")
+    esquema, _, token = autorizacion.partition(" ")
+    identidad = f"auth:{autorizacion}"
+    if esquema.lower() == "bearer" and token:
+        try:
+            identidad = f"usuario:{email_desde_token(token)}"
+        except HTTPException:
+            pass
+    return hashlib.sha256(identidad.encode()).hexdigest()
+
+
+def _error(codigo: int, mensaje: str, **headers) -> JSONResponse:
+    return JSONResponse(status_code=codigo, content={"error": mensaje}, headers=headers or None)
+
+
+class IdempotenciaMiddleware:
+    """
+    Middleware ASGI que aplica Idempotency-Key en RUTAS_IDEMPOTENTES.
+    No retiene conexiones durante la request: una sesión corta para buscar /
+    reservar la clave y otra para guardar la respuesta
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        ttl_horas: float = IDEMPOTENCIA_TTL_HORAS,
+        lease_segundos: float = IDEMPOTENCIA_LEASE_SEGUNDOS,
+    ):
+        # La tabla se crea al iniciar la app (app/core/esquema.py)
+        self.app = app
+        self.ttl = timedelta(hours=ttl_horas)
+        self.lease = timedelta(seconds=lease_segundos)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not ruta_idempotente(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        clave = dict(scope.get("headers") or []).get(b"idempotency-key", b"").decode("latin-1").strip()
+        if not clave:
+            await self.app(scope, receive, send)
+            return
+        if len(clave) > MAX_LARGO_CLAVE:
+            await _error(400, f"Idempotency-Key no puede superar {MAX_LARGO_CLAVE} caracteres")(scope, receive, send)
+            return
+
+        # El body se lee completo para el hash y se le vuelve a entregar a la app
+        partes, mas_body = [], True
+        while mas_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            partes.append(message.get("body", b""))
+            mas_body = message.get("more_body", False)
+        cuerpo = b"".join(partes)
+        firma = hash_request(scope, cuerpo)
+        alcance = alcance_request(scope)
+
+        respuesta = await self._reservar_clave(alcance, clave, firma)
+        if respuesta is not None:
+            await respuesta(scope, receive, send)
+            return
+
+        body_entregado = False
+
+        async def recibir() -> Message:
+            nonlocal body_entregado
+            if not body_entregado:
+                body_entregado = True
+                return {"type": "http.request", "body": cuerpo, "more_body": False}
+            return await receive()
+
+        resultado = {"codigo": None, "content_type": None, "partes": [], "bytes": 0}
+
+        async def enviar(message: Message):
+            if message["type"] == "http.response.start":
+                resultado["codigo"] = message["status"]
+                headers = dict(message.get("headers") or [])
+                resultado["content_type"] = headers.get(b"content-type", b"").decode("latin-1") or None
+            elif message["type"] == "http.response.body" and resultado["bytes"] <= MAX_BYTES_RESPUESTA:
+                parte = message.get("body", b"")
+                resultado["partes"].append(parte)
+                resultado["bytes"] += len(parte)
+            await send(message)
+
+        try:
+            await self.app(scope, recibir, enviar)
+        finally:
+            await self._guardar_respuesta(alcance, clave, resultado)
+
+    async def _reservar_clave(self, alcance: str, clave: str, firma: str):
+        """
+        Busca la clave y, si no existe, la registra como "en curso".
+        Si está en curso con el lease vencido, la toma
+
+        Returns:
+            La respuesta a devolver (repetición o error), o None si hay que ejecutar la request
+        """
+        ahora = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            registro = await db.scalar(
+                select(ClaveIdempotencia)
+                .where(ClaveIdempotencia.alcance == alcance, ClaveIdempotencia.clave == clave)
+            )
+            if registro is not None and registro.expira <= ahora:
+                await db.delete(registro)
+                await db.commit()
+                registro = None
+
+            if registro is not None:
+                if registro.hash_request != firma:
+                    return _error(422, "La Idempotency-Key ya se usó con otra request")
+                if registro.codigo is None:
+                    if registro.creada > ahora - self.lease or not await self._tomar_clave(db, registro, ahora):
+                        return _error(409, "Hay una request con esta Idempotency-Key en curso", **{"Retry-After": "1"})
+                    metricas.incrementar("idempotencia.leases_vencidos")
+                    return None
+                metricas.incrementar("idempotencia.repeticiones")
+                return Response(
+                    content=registro.cuerpo,
+                    status_code=registro.codigo,
+                    media_type=registro.content_type,
+                    headers={"Idempotent-Replayed": "true"},
+                )
+
+            db.add(ClaveIdempotencia(
+                alcance=alcance, clave=clave, hash_request=firma, creada=ahora, expira=ahora + self.ttl
+            ))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Otra request con la misma clave la registró entre la búsqueda y el insert
+                return _error(409, "Hay una request con esta Idempotency-Key en curso", **{"Retry-After": "1"})
+        return None
+
+    @staticmethod
+    async def _tomar_clave(db, registro: ClaveIdempotencia, ahora: datetime) -> bool:
+        """
+        Renueva el lease de una clave en curso abandonada. El UPDATE condicionado
+        a la fecha leída hace que entre varios reintentos simultáneos gane uno
+
+        Returns:
+            True si esta request se quedó con la clave
+        """
+        resultado = await db.execute(
+            update(ClaveIdempotencia)
+            .where(
+                ClaveIdempotencia.id == registro.id,
+                ClaveIdempotencia.codigo.is_(None),
+                ClaveIdempotencia.creada == registro.creada,
+            )
+            .values(creada=ahora)
+        )
+        await db.commit()
+        return resultado.rowcount == 1
+
+    async def _guardar_respuesta(self, alcance: str, clave: str, resultado: dict):
+        """Guarda respuestas < 500; si no hubo respuesta válida libera la clave para el reintento"""
+        codigo = resultado["codigo"]
+        filtro = (ClaveIdempotencia.alcance == alcance, ClaveIdempotencia.clave == clave)
+        async with AsyncSessionLocal() as db:
+            if codigo is not None and codigo < 500 and resultado["bytes"] <= MAX_BYTES_RESPUESTA:
+                await db.execute(
+                    update(ClaveIdempotencia)
+                    .where(*filtro)
+                    .values(codigo=codigo, content_type=resultado["content_type"], cuerpo=b"".join(resultado["partes"]))
+                )
+                metricas.incrementar("idempotencia.guardadas")
+            else:
+                await db.execute(delete(ClaveIdempotencia).where(*filtro))
+            # De vez en cuando se purgan las claves vencidas
+            if random.random() < PROBABILIDAD_PURGA:
+                await db.execute(delete(ClaveIdempotencia).where(ClaveIdempotencia.expira < datetime.utcnow()))
+            await db.commit()
@@ -0,0 +1,316 @@
+"""
+Importación masiva de pacientes desde CSV / XLSX
+Valida todas las filas en lote, verifica duplicados con una consulta IN por bloque,
+hashea contraseñas en un pool de procesos e inserta usuarios, roles y perfiles
+en bloques (un commit por bloque).
+
+Las contraseñas generadas para filas sin password no se guardan ni se informan:
+el reporte solo lista esas filas para que se les asigne una nueva.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import csv
+import io
+import multiprocessing
+import secrets
+import zipfile
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import IMPORTACION_PROCESOS
+from app.database import SessionBackground
+from app.core.security import get_password_hash
+from app.core.trabajos import trabajos
+from app.core.validaciones import (
+    validar_lote, validar_columna, errores_por_fila, capitalizar_texto, MensajesError
+)
+from app.models.user import User
+from app.models.role import Role
+from app.models.user_role import UserRole
+from app.models.paciente import Paciente
+
+try:
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:  # openpyxl es opcional: solo necesario para .xlsx
+    openpyxl = None
+    InvalidFileException = ValueError
+
+
+COLUMNAS = ("nombre", "email", "password", "dni", "telefono", "obra_social", "historial_medico", "direccion")
+TAMANO_BLOQUE = 500
+# Fila 1 del archivo es el encabezado: la primera fila de datos es la 2
+PRIMERA_FILA_DATOS = 2
+# Codificaciones probadas en orden: UTF-8 (con o sin BOM) y la de Excel en Windows.
+# latin-1 decodifica cualquier byte, así que siempre hay resultado
+CODIFICACIONES_CSV = ("utf-8-sig", "cp1252", "latin-1")
+DELIMITADORES_CSV = ",;\t"
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# LECTURA DEL ARCHIVO
+# ══════════════════════════════════════════════════════════════════════════
+
+def _normalizar_encabezado(valor) -> str:
+    return str(valor or "").strip().lower().replace(" ", "_")
+
+
+def _decodificar(contenido: bytes) -> str:
+    for codificacion in CODIFICACIONES_CSV:
+        try:
+            return contenido.decode(codificacion)
+        except UnicodeDecodeError:
+            continue
+    raise HTTPException(status_code=400, detail="No se pudo leer el archivo: codificación no reconocida")
+
+
+def _dialecto_csv(texto: str):
+    """
+    Detecta el delimitador. Si el Sniffer no puede (ej: archivo de una sola
+    columna o filas con campos de más) se usa el delimitador más frecuente
+    del encabezado, o coma si no aparece ninguno
+    """
+    muestra = texto[:2048]
+    try:
+        return csv.Sniffer().sniff(muestra, delimiters=DELIMITADORES_CSV)
+    except csv.Error:
+        encabezado = muestra.splitlines()[0] if muestra.strip() else ""
+        delimitador = max(DELIMITADORES_CSV, key=encabezado.count)
+
+        class Dialecto(csv.excel):
+            delimiter = delimitador if encabezado.count(delimitador) else ","
+
+        return Dialecto
+
+
+def _leer_xlsx(contenido: bytes) -> list:
+    if openpyxl is None:
+        raise HTTPException(status_code=400, detail="Para importar .xlsx se requiere el paquete openpyxl")
+    try:
+        libro = openpyxl.load_workbook(io.BytesIO(contenido), read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="El archivo .xlsx está dañado o no es un libro de Excel")
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [_normalizar_encabezado(celda) for celda in next(filas, [])]
+        return [
+            {encabezados[i]: ("" if celda is None else str(celda)) for i, celda in enumerate(fila) if i < len(encabezados)}
+            for fila in filas
+        ]
+    finally:
+        libro.close()
+
+
+def _leer_csv(contenido: bytes) -> list:
+    texto = _decodificar(contenido)
+    dialecto = _dialecto_csv(texto) if texto.strip() else csv.excel
+    # Los campos de más (ej: separador al final de la fila) quedan bajo restkey y se descartan
+    lector = csv.DictReader(io.StringIO(texto), dialect=dialecto, restkey="_sobrantes")
+    try:
+        lector.fieldnames = [_normalizar_encabezado(c) for c in (lector.fieldnames or [])]
+        registros = list(lector)
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"CSV inválido (línea {lector.line_num}): {e}")
+    for registro in registros:
+        registro.pop("_sobrantes", None)
+    return registros
+
+
+def leer_archivo(nombre_archivo: str, contenido: bytes) -> list:
+    """
+    Convierte un CSV o XLSX en una lista de dicts (una por fila).
+    CSV: UTF-8 o la codificación de Excel (cp1252), delimitador , ; o tab
+
+    Raises:
+        HTTPException 400: Si el formato no es soportado, el archivo no se puede
+            leer o faltan columnas obligatorias
+    """
+    nombre = (nombre_archivo or "").lower()
+
+    if nombre.endswith(".xlsx"):
+        registros = _leer_xlsx(contenido)
+    elif nombre.endswith(".csv"):
+        registros = _leer_csv(contenido)
+    else:
+        raise HTTPException(status_code=400, detail="Formato no soportado: se acepta .csv o .xlsx")
+
+    faltantes = {"nombre", "email"} - set(registros[0].keys() if registros else [])
+    if registros and faltantes:
+        raise HTTPException(status_code=400, detail=f"Faltan columnas obligatorias: {', '.join(sorted(faltantes))}")
+
+    # Se descartan filas completamente vacías
+    return [r for r in registros if any((v or "").strip() for v in r.values())]
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# VALIDACIÓN EN LOTE
+# ══════════════════════════════════════════════════════════════════════════
+
+def _error(fila: int, campo: str, mensaje: str) -> dict:
+    return {"fila": fila, "campo": campo, "mensaje": mensaje}
+
+
+def validar_filas(registros: list) -> tuple:
+    """
+    Valida y limpia todas las filas sin cortar en el primer error.
+    También detecta emails y DNIs repetidos dentro del mismo archivo.
+
+    Returns:
+        (filas_validas, errores): filas_validas es una lista de (numero_fila, datos_limpios)
+    """
+    validas, errores = [], []
+    emails_vistos, dnis_vistos = {}, {}
+
+    # Columnas con formato: una pasada por columna con los chequeos compilados
+    limpios, errores_lote = validar_lote(registros, ("email", "dni", "telefono"))
+    con_password = [i for i, r in enumerate(registros) if (r.get("password") or "").strip()]
+    passwords, errores_password = validar_columna(
+        "password", [registros[i]["password"].strip() for i in con_password]
+    )
+    for error in errores_password:
+        error["loc"][1] = con_password[error["loc"][1]]
+    errores_lote = errores_por_fila(errores_lote + errores_password)
+    passwords = dict(zip(con_password, passwords))
+
+    for indice, registro in enumerate(registros):
+        numero = indice + PRIMERA_FILA_DATOS
+        errores_fila = [
+            _error(numero, error["loc"][-1], error["msg"]) for error in errores_lote.get(indice, [])
+        ]
+        limpio = {campo: limpios[indice].get(campo) for campo in ("email", "dni", "telefono")}
+        limpio["password"] = passwords.get(indice)
+
+        nombre = (registro.get("nombre") or "").strip()
+        if len(nombre) < 2:
+            errores_fila.insert(0, _error(numero, "nombre", "El nombre es obligatorio (mínimo 2 caracteres)"))
+        limpio["nombre"] = capitalizar_texto(nombre)
+
+        limpio["obra_social"] = capitalizar_texto(registro.get("obra_social") or "")
+        limpio["direccion"] = capitalizar_texto(registro.get("direccion") or "")
+        limpio["historial_medico"] = (registro.get("historial_medico") or "").strip() or None
+
+        # Duplicados dentro del archivo
+        email = limpio.get("email")
+        if email and email in emails_vistos:
+            errores_fila.append(_error(numero, "email", f"Email repetido en el archivo (fila {emails_vistos[email]})"))
+        dni = limpio.get("dni")
+        if dni and dni in dnis_vistos:
+            errores_fila.append(_error(numero, "dni", f"DNI repetido en el archivo (fila {dnis_vistos[dni]})"))
+
+        if errores_fila:
+            errores.extend(errores_fila)
+            continue
+
+        emails_vistos[email] = numero
+        if dni:
+            dnis_vistos[dni] = numero
+        validas.append((numero, limpio))
+
+    return validas, errores
+
+
+def filtrar_existentes(db: Session, bloque: list) -> tuple:
+    """
+    Descarta filas cuyo email o DNI ya existen en la base.
+    Una consulta IN por columna para todo el bloque.
+    """
+    emails = [datos["email"] for _, datos in bloque]
+    dnis = [datos["dni"] for _, datos in bloque if datos["dni"]]
+
+    emails_existentes = {e for (e,) in db.query(User.email).filter(User.email.in_(emails))} if emails else set()
+    dnis_existentes = {d for (d,) in db.query(Paciente.dni).filter(Paciente.dni.in_(dnis))} if dnis else set()
+
+    nuevas, errores = [], []
+    for numero, datos in bloque:
+        if datos["email"] in emails_existentes:
+            errores.append(_error(numero, "email", MensajesError.email_duplicado(datos["email"])))
+        elif datos["dni"] and datos["dni"] in dnis_existentes:
+            errores.append(_error(numero, "dni", MensajesError.dni_duplicado(datos["dni"])))
+        else:
+            nuevas.append((numero, datos))
+    return nuevas, errores
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# INSERCIÓN EN BLOQUES
+# ══════════════════════════════════════════════════════════════════════════
+
+def insertar_bloque(db: Session, bloque: list, hashes: list, rol_id: int):
+    """Inserta usuarios, roles y perfiles de un bloque con executemany y un solo commit"""
+    db.execute(insert(User), [
+        {"nombre": datos["nombre"], "email": datos["email"], "password_hash": hash_, "activo": True}
+        for (_, datos), hash_ in zip(bloque, hashes)
+    ])
+    ids = dict(db.query(User.email, User.id).filter(User.email.in_([d["email"] for _, d in bloque])))
+
+    db.execute(insert(UserRole), [{"user_id": ids[datos["email"]], "role_id": rol_id} for _, datos in bloque])
+    db.execute(insert(Paciente), [
+        {
+            "user_id": ids[datos["email"]],
+            "dni": datos["dni"],
+            "telefono": datos["telefono"],
+            "obra_social": datos["obra_social"],
+            "historial_medico": datos["historial_medico"],
+            "direccion": datos["direccion"],
+        }
+        for _, datos in bloque
+    ])
+    db.commit()
+
+
+def ejecutar_importacion(trabajo_id: str, registros: list, procesos: Optional[int] = None):
+    """
+    Trabajo en segundo plano: valida, hashea e inserta los pacientes,
+    actualizando el progreso en el registro de trabajos.
+    """
+    trabajos.actualizar(trabajo_id, estado="en_proceso")
+    db = SessionBackground()
+    importados, sin_password = 0, []
+    try:
+        rol = db.query(Role).filter(Role.name == "paciente").first()
+        if not rol:
+            raise RuntimeError("Error de configuración: rol 'paciente' no encontrado en el sistema")
+
+        validas, errores = validar_filas(registros)
+        procesados = len(registros) - len(validas)
+        trabajos.actualizar(trabajo_id, procesados=procesados)
+
+        # spawn: no se hace fork de un proceso con hilos (el servidor); cantidad acotada por config
+        with ProcessPoolExecutor(
+            max_workers=procesos or IMPORTACION_PROCESOS,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            for inicio in range(0, len(validas), TAMANO_BLOQUE):
+                bloque, errores_bloque = filtrar_existentes(db, validas[inicio:inicio + TAMANO_BLOQUE])
+                errores.extend(errores_bloque)
+
+                # Contraseñas: las que faltan se generan al azar (no se informan: hay que
+                # asignarles una nueva); todas se hashean en paralelo
+                passwords = []
+                for numero, datos in bloque:
+                    if datos["password"] is None:
+                        datos["password"] = secrets.token_urlsafe(16)
+                        sin_password.append({"fila": numero, "email": datos["email"]})
+                    passwords.append(datos["password"])
+                hashes = list(pool.map(get_password_hash, passwords, chunksize=16))
+
+                if bloque:
+                    insertar_bloque(db, bloque, hashes, rol.id)
+                importados += len(bloque)
+                procesados += len(validas[inicio:inicio + TAMANO_BLOQUE])
+                trabajos.actualizar(trabajo_id, procesados=procesados)
+
+        trabajos.actualizar(trabajo_id, estado="completado", resultado={
+            "importados": importados,
+            "con_errores": len({e["fila"] for e in errores}),
+            "errores": sorted(errores, key=lambda e: e["fila"]),
+            # Usuarios creados con una contraseña aleatoria que nadie conoce
+            "sin_password": sin_password,
+        })
+    except Exception as e:
+        db.rollback()
+        trabajos.actualizar(trabajo_id, estado="error", error=str(e), resultado={"importados": importados})
+    finally:
+        db.close()
@@ -0,0 +1,102 @@
+"""
+Ruteo de lecturas a la réplica
+Decide, por request, si un GET puede leer de la réplica:
+- read-your-writes: un cliente que acaba de escribir lee del primario durante
+  LECTURA_VENTANA_PRIMARIO segundos
+- fallback: si la réplica no acepta conexiones se la saltea durante
+  LECTURA_REINTENTO_REPLICA segundos
+
+El registro de escrituras vive en memoria del proceso: con varios workers la
+ventana aplica por worker.
+"""
+import hashlib
+import threading
+import time
+
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import LECTURA_REINTENTO_REPLICA, LECTURA_VENTANA_PRIMARIO
+from app.core.metricas import metricas
+
+METODOS_LECTURA = ("GET", "HEAD", "OPTIONS")
+MAX_CLIENTES = 10_000
+
+
+def clave_cliente(headers: dict, cliente) -> str:
+    """Identifica al cliente por su token (sin decodificarlo) o, si no tiene, por IP"""
+    autorizacion = headers.get(b"authorization")
+    if autorizacion:
+        return hashlib.blake2b(autorizacion, digest_size=16).hexdigest()
+    return f"ip:{cliente[0] if cliente else 'desconocido'}"
+
+
+class RegistroEscrituras:
+    """Hasta cuándo cada cliente debe leer del primario"""
+
+    def __init__(self, ventana: float = LECTURA_VENTANA_PRIMARIO):
+        self.ventana = ventana
+        self._lock = threading.Lock()
+        self._hasta = {}
+
+    def registrar(self, clave: str):
+        ahora = time.monotonic()
+        with self._lock:
+            if len(self._hasta) >= MAX_CLIENTES:
+                self._hasta = {c: h for c, h in self._hasta.items() if h > ahora}
+            self._hasta[clave] = ahora + self.ventana
+
+    def leer_del_primario(self, clave: str) -> bool:
+        hasta = self._hasta.get(clave)
+        return hasta is not None and hasta > time.monotonic()
+
+
+class EstadoReplica:
+    """Marca la réplica como caída por un tiempo después de un error de conexión"""
+
+    def __init__(self, reintento: float = LECTURA_REINTENTO_REPLICA):
+        self.reintento = reintento
+        self.caida_hasta = 0.0
+
+    def disponible(self) -> bool:
+        return time.monotonic() >= self.caida_hasta
+
+    def marcar_caida(self):
+        self.caida_hasta = time.monotonic() + self.reintento
+        metricas.incrementar("lectura.replica_caida")
+
+
+escrituras = RegistroEscrituras()
+replica = EstadoReplica()
+
+
+def usar_replica(request: Request) -> bool:
+    """True si la request puede leer de la réplica (se cuenta en métricas)"""
+    clave = clave_cliente(dict(request.scope.get("headers") or []), request.client)
+    if escrituras.leer_del_primario(clave):
+        metricas.incrementar("lectura.primario_por_escritura_reciente")
+        return False
+    if not replica.disponible():
+        metricas.incrementar("lectura.primario_por_replica_caida")
+        return False
+    metricas.incrementar("lectura.replica")
+    return True
+
+
+class MarcadorEscriturasMiddleware:
+    """Registra a los clientes cuyas escrituras (POST, PUT, PATCH, DELETE) terminaron bien"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in METODOS_LECTURA:
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                escrituras.registrar(clave_cliente(dict(scope.get("headers") or []), scope.get("client")))
+            await send(message)
+
+        await self.app(scope, receive, enviar)
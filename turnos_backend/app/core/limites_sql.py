@@ -0,0 +1,122 @@
+"""
+Límite de tiempo por sentencia según la clase de ruta
+Cada router declara su clase con la dependencia limite_sentencia("reserva"),
+y todos los SELECT de esa request llevan el límite de TIMEOUTS_SENTENCIA_MS:
+- MySQL: hint /*+ MAX_EXECUTION_TIME(n) */ (la base cancela la consulta)
+- SQLite (tests): progress handler que interrumpe la consulta al vencer el plazo
+
+Una consulta cancelada termina en 503 con Retry-After y se cuenta en métricas,
+en lugar de retener la conexión por minutos.
+
+El límite de la ruta tiene prioridad sobre el MAX_EXECUTION_TIME de sesión que
+fija cada pool (app.core.pool_conexiones): ver POOLS_POR_CARGA en config.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+import re
+import sqlite3
+import time
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import TIMEOUTS_SENTENCIA_MS
+from app.core.exceptions import generic_error_handler
+from app.core.metricas import metricas
+
+# (clase, ms) vigente para la request en curso; los hilos del threadpool heredan el contexto
+_limite_actual: ContextVar[Optional[Tuple[str, int]]] = ContextVar("limite_sentencia", default=None)
+
+_SELECT = re.compile(r"^\s*SELECT\s", re.IGNORECASE)
+# 3024: límite de MAX_EXECUTION_TIME excedido; 1317: consulta interrumpida (KILL QUERY)
+CODIGOS_CANCELACION_MYSQL = (3024, 1317)
+RETRY_AFTER_SEGUNDOS = 2
+
+
+def limite_sentencia(clase: str):
+    """
+    Dependencia que fija el límite de la clase de ruta
+    Uso: APIRouter(..., dependencies=[Depends(limite_sentencia("reserva"))])
+    """
+    limite_ms = TIMEOUTS_SENTENCIA_MS[clase]
+
+    # async: se ejecuta en la tarea de la request, así el valor queda visible para el handler
+    async def fijar_limite():
+        _limite_actual.set((clase, limite_ms))
+
+    return fijar_limite
+
+
+def limite_vigente() -> Optional[Tuple[str, int]]:
+    return _limite_actual.get()
+
+
+@contextmanager
+def limite_aislado():
+    """
+    Ejecuta el bloque sin límite heredado y restaura el anterior al salir.
+    Para despachar rutas dentro de otra request (sub-requests de /batch): la
+    dependencia de cada ruta corre en la misma tarea y si no se aislara su
+    límite quedaría vigente para las siguientes
+    """
+    token = _limite_actual.set(None)
+    try:
+        yield
+    finally:
+        _limite_actual.reset(token)
+
+
+def instalar_limites(engine: Engine):
+    """Registra en el engine la aplicación del límite vigente a cada SELECT"""
+    if engine.dialect.name == "mysql":
+        @event.listens_for(engine, "before_cursor_execute", retval=True)
+        def _hint_mysql(conn, cursor, statement, parameters, context, executemany):
+            limite = _limite_actual.get()
+            if limite and _SELECT.match(statement) and "MAX_EXECUTION_TIME" not in statement:
+                statement = _SELECT.sub(f"SELECT /*+ MAX_EXECUTION_TIME({limite[1]}) */ ", statement, count=1)
+            return statement, parameters
+
+    elif engine.dialect.name == "sqlite" and engine.dialect.driver == "pysqlite":
+        @event.listens_for(engine, "before_cursor_execute")
+        def _plazo_sqlite(conn, cursor, statement, parameters, context, executemany):
+            limite = _limite_actual.get()
+            if limite and _SELECT.match(statement):
+                vence = time.monotonic() + limite[1] / 1000
+                conn.connection.dbapi_connection.set_progress_handler(lambda: time.monotonic() > vence, 1000)
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _limpiar_sqlite(conn, cursor, statement, parameters, context, executemany):
+            conn.connection.dbapi_connection.set_progress_handler(None, 0)
+
+        @event.listens_for(engine, "handle_error")
+        def _limpiar_sqlite_error(contexto):
+            if contexto.connection is not None and not contexto.connection.invalidated:
+                contexto.connection.connection.dbapi_connection.set_progress_handler(None, 0)
+
+
+def es_sentencia_cancelada(exc: Exception) -> bool:
+    original = getattr(exc, "orig", None)
+    if isinstance(original, sqlite3.OperationalError):
+        return "interrupted" in str(original)
+    codigo = original.args[0] if original is not None and original.args else None
+    return codigo in CODIGOS_CANCELACION_MYSQL
+
+
+async def sentencia_cancelada_handler(request: Request, exc: OperationalError):
+    """503 para consultas canceladas por tiempo; el resto de los errores de base sigue como 500"""
+    if not es_sentencia_cancelada(exc):
+        return await generic_error_handler(request, exc)
+
+    limite = _limite_actual.get()
+    clase = limite[0] if limite else "sin_clase"
+    metricas.incrementar("sql.sentencias_canceladas")
+    metricas.incrementar(f"sql.sentencias_canceladas.{clase}")
+    return JSONResponse(
+        status_code=503,
+        content={"error": "La consulta excedió el tiempo máximo permitido. Probá con un rango más chico."},
+        headers={"Retry-After": str(RETRY_AFTER_SEGUNDOS)},
+    )
@@ -0,0 +1,46 @@
+"""
+Registro de métricas en memoria del proceso
+Contadores y observaciones (cantidad, suma, máximo) expuestas en /debug/metricas
+"""
+from collections import defaultdict
+import threading
+
+
+class RegistroMetricas:
+    """Métricas simples y thread-safe, sin dependencias externas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = defaultdict(float)
+        self._observaciones = {}
+
+    def incrementar(self, nombre: str, valor: float = 1):
+        """Suma un valor a un contador"""
+        with self._lock:
+            self._contadores[nombre] += valor
+
+    def observar(self, nombre: str, valor: float):
+        """Registra una observación (ej: duración, tamaño)"""
+        with self._lock:
+            obs = self._observaciones.setdefault(nombre, {"cantidad": 0, "suma": 0.0, "maximo": 0.0})
+            obs["cantidad"] += 1
+            obs["suma"] += valor
+            obs["maximo"] = max(obs["maximo"], valor)
+
+    def snapshot(self) -> dict:
+        """Devuelve una copia de todas las métricas con el promedio calculado"""
+        with self._lock:
+            observaciones = {
+                nombre: {**obs, "promedio": obs["suma"] / obs["cantidad"] if obs["cantidad"] else 0.0}
+                for nombre, obs in self._observaciones.items()
+            }
+            return {"contadores": dict(self._contadores), "observaciones": observaciones}
+
+    def reiniciar(self):
+        """Borra todas las métricas"""
+        with self._lock:
+            self._contadores.clear()
+            self._observaciones.clear()
+
+
+metricas = RegistroMetricas()
@@ -0,0 +1,44 @@
+"""
+Paginación por cursor (keyset) sobre columnas (fecha, id)
+El cursor es opaco para el cliente: base64 de "fecha_iso|id"
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+HEADER_SIGUIENTE_CURSOR = "X-Next-Cursor"
+
+
+def codificar_cursor(fecha: datetime, id: int) -> str:
+    """Codifica la última fila de una página como cursor opaco"""
+    crudo = f"{fecha.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(crudo).decode()
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por codificar_cursor
+
+    Raises:
+        HTTPException 400: Si el cursor no es válido
+    """
+    try:
+        fecha_txt, id_txt = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(fecha_txt), int(id_txt)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def filtro_antes_de(columna_fecha, columna_id, cursor: Optional[str]):
+    """
+    Condición keyset para orden descendente (fecha DESC, id DESC):
+    filas estrictamente anteriores al cursor. None si no hay cursor.
+    """
+    if not cursor:
+        return None
+    fecha, id = decodificar_cursor(cursor)
+    return or_(columna_fecha < fecha, and_(columna_fecha == fecha, columna_id < id))
@@ -0,0 +1,58 @@
+"""
+Consultas compartidas sobre perfiles (paciente / kinesiólogo) de usuarios
+"""
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.role import Role
+from app.models.user_role import UserRole
+
+
+def escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE (% y _) para buscar el texto literal (usar con escape="\\")"""
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def obtener_usuarios_sin_perfil(
+    db: Session,
+    rol: str,
+    modelo_perfil,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    nombre: Optional[str] = None,
+) -> list[dict]:
+    """
+    Obtiene usuarios que tienen un rol pero todavía no tienen el perfil asociado.
+    Una sola consulta con anti-join (LEFT JOIN perfil ... WHERE perfil.id IS NULL)
+    y proyección de columnas: no se cargan objetos User ni roles.
+
+    Args:
+        db: Sesión de base de datos
+        rol: Nombre del rol (ej: "paciente", "kinesiologo")
+        modelo_perfil: Modelo del perfil con columna user_id (Paciente, Kinesiologo)
+        skip: Número de registros a saltar
+        limit: Número máximo de registros a retornar (None = todos, lo que usan
+            los selects de los formularios de alta)
+        nombre: Filtro opcional por nombre (contiene, sin distinguir mayúsculas;
+            % y _ se buscan literalmente)
+
+    Returns:
+        Lista de dicts con id, nombre y email
+    """
+    query = (
+        db.query(User.id, User.nombre, User.email)
+        .join(UserRole, UserRole.user_id == User.id)
+        .join(Role, Role.id == UserRole.role_id)
+        .outerjoin(modelo_perfil, modelo_perfil.user_id == User.id)
+        .filter(Role.name == rol, modelo_perfil.id.is_(None))
+    )
+
+    if nombre:
+        query = query.filter(User.nombre.ilike(f"%{escapar_like(nombre.strip())}%", escape="\\"))
+
+    query = query.order_by(User.nombre.asc(), User.id.asc()).offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    filas = query.all()
+    return [{"id": fila.id, "nombre": fila.nombre, "email": fila.email} for fila in filas]
@@ -1,7 +1,24 @@
 from fastapi import Depends, HTTPException, status
-from app.core.security import get_current_user 
+from app.core.security import get_current_user, get_current_user_async
 from app.models.user import User
 
+def _verificar_roles(current_user: User, allowed_roles: tuple) -> User:
+    user_roles = [r.name for r in current_user.roles]
+    
+    # Si es admin, pasa siempre
+    if "admin" in user_roles:
+        return current_user
+
+    # Verificar si tiene alguno de los roles requeridos
+    has_permission = any(role in user_roles for role in allowed_roles)
+    
+    if not has_permission:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Acceso denegado. Se requiere uno de los siguientes roles: {', '.join(allowed_roles)}"
+        )
+    return current_user
+
 def role_required(*allowed_roles: str):
     """
     Permite el acceso si el usuario tiene AL MENOS UNO de los roles permitidos.
@@ -9,19 +26,14 @@ def role_required(*allowed_roles: str):
     Uso: role_required("kinesiologo", "recepcionista")
     """
     def wrapper(current_user: User = Depends(get_current_user)):
-        user_roles = [r.name for r in current_user.roles]
-        
-        # Si es admin, pasa siempre
-        if "admin" in user_roles:
-            return current_user
+        return _verificar_roles(current_user, allowed_roles)
+    return wrapper
 
-        # Verificar si tiene alguno de los roles requeridos
-        has_permission = any(role in user_roles for role in allowed_roles)
-        
-        if not has_permission:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Acceso denegado. Se requiere uno de los siguientes roles: {', '.join(allowed_roles)}"
-            )
-        return current_user
-    return wrapper
\ No newline at end of file
+def role_required_async(*allowed_roles: str):
+    """
+    Variante de role_required para routers `async def` (usa AsyncSession).
+    Uso: role_required_async("recepcionista", "admin")
+    """
+    async def wrapper(current_user: User = Depends(get_current_user_async)):
+        return _verificar_roles(current_user, allowed_roles)
+    return wrapper
@@ -0,0 +1,141 @@
+"""
+Pools de conexiones instrumentados
+Construye las opciones de create_engine a partir de la configuración y registra
+en `metricas` la espera por conexiones, los timeouts y la rotación (conexiones
+creadas / cerradas / invalidadas) de cada engine. Hay un pool por tipo de carga
+(interactivo, reportes, background, ver POOLS_POR_CARGA) para que ninguna pueda
+agotar las conexiones de otra. El estado actual de todos los pools se expone en
+/debug/pool.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT
+from app.core.metricas import metricas
+
+# Esperas por debajo de este umbral (ms) no cuentan como "request encolada"
+UMBRAL_ESPERA_MS = 1.0
+
+_engines = {}
+_timeouts_sentencia = {}
+
+
+class _EsperaMedida:
+    """
+    Mide el tiempo de checkout dentro del pool (_do_get es donde se bloquea
+    cuando no hay conexiones libres). El nombre del pool viaja en logging_name,
+    que SQLAlchemy conserva cuando recrea el pool.
+    """
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metricas.incrementar(f"pool.{self.logging_name}.timeouts")
+            raise
+        finally:
+            espera_ms = (time.perf_counter() - inicio) * 1000
+            metricas.observar(f"pool.{self.logging_name}.espera_checkout_ms", espera_ms)
+            if espera_ms >= UMBRAL_ESPERA_MS:
+                metricas.incrementar(f"pool.{self.logging_name}.checkouts_con_espera")
+
+
+class QueuePoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+
+class AsyncQueuePoolMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    pass
+
+
+def opciones_pool(url: str, nombre: str, es_async: bool = False, **ajustes) -> dict:
+    """
+    Argumentos de create_engine para un pool con nombre
+
+    Args:
+        url: URL de la base (define si aplica un QueuePool)
+        nombre: Identificador del pool en métricas y en /debug/pool
+        es_async: True para create_async_engine
+        ajustes: Overrides de pool_size, max_overflow, pool_timeout, pool_recycle
+
+    Returns:
+        dict para pasar como **kwargs a create_engine / create_async_engine
+    """
+    opciones = {"pool_logging_name": nombre, "pool_pre_ping": DB_POOL_PRE_PING}
+    # SQLite (tests / desarrollo) usa los pools propios de su dialecto
+    if make_url(url).get_backend_name() == "sqlite":
+        return opciones
+
+    opciones.update(
+        poolclass=AsyncQueuePoolMedido if es_async else QueuePoolMedido,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    opciones.update(ajustes)
+    return opciones
+
+
+def instrumentar_engine(engine: Engine, nombre: str, timeout_sentencia_ms: int = 0):
+    """
+    Registra el engine para /debug/pool, cuenta la rotación de conexiones y,
+    en MySQL, fija MAX_EXECUTION_TIME en cada conexión nueva (aplica a SELECT)
+    """
+    _engines[nombre] = engine
+    _timeouts_sentencia[nombre] = timeout_sentencia_ms or None
+
+    if timeout_sentencia_ms and engine.dialect.name == "mysql":
+        @event.listens_for(engine, "connect")
+        def _limitar_sentencias(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(timeout_sentencia_ms)}")
+            cursor.close()
+
+    @event.listens_for(engine, "connect")
+    def _conexion_creada(dbapi_connection, connection_record):
+        metricas.incrementar(f"pool.{nombre}.conexiones_creadas")
+
+    @event.listens_for(engine, "close")
+    def _conexion_cerrada(dbapi_connection, connection_record):
+        metricas.incrementar(f"pool.{nombre}.conexiones_cerradas")
+
+    @event.listens_for(engine, "invalidate")
+    def _conexion_invalidada(dbapi_connection, connection_record, exception):
+        metricas.incrementar(f"pool.{nombre}.conexiones_invalidadas")
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        metricas.incrementar(f"pool.{nombre}.checkouts")
+
+
+def estado_pools() -> dict:
+    """Ocupación actual de cada pool registrado más sus métricas acumuladas"""
+    snapshot = metricas.snapshot()
+    estado = {}
+    for nombre, engine in _engines.items():
+        pool = engine.pool
+        prefijo = f"pool.{nombre}."
+        actual = {"clase": type(pool).__name__, "timeout_sentencia_ms": _timeouts_sentencia.get(nombre)}
+        if isinstance(pool, QueuePool):
+            actual.update(
+                tamano=pool.size(),
+                en_uso=pool.checkedout(),
+                libres=pool.checkedin(),
+                # overflow() es negativo mientras el pool base no se llenó
+                overflow_en_uso=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+                recycle=pool._recycle,
+            )
+        actual["contadores"] = {
+            clave[len(prefijo):]: valor for clave, valor in snapshot["contadores"].items() if clave.startswith(prefijo)
+        }
+        actual["espera_checkout_ms"] = snapshot["observaciones"].get(prefijo + "espera_checkout_ms")
+        estado[nombre] = actual
+    return estado
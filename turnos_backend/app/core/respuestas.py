@@ -0,0 +1,182 @@
+"""
+Serialización rápida para listados grandes
+Evita la doble validación de FastAPI y el encoder json estándar.
+Negocia application/msgpack como formato alternativo vía header Accept.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type, Union, get_args, get_origin
+
+from fastapi import Request, Response
+from pydantic import BaseModel, EmailStr, TypeAdapter, create_model
+
+from app.core.compresion import parsear_calidades
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional
+    msgpack = None
+
+
+_adaptador_generico = TypeAdapter(Any)
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class JSONBytesResponse(Response):
+    """
+    Respuesta JSON al estilo ORJSONResponse, pero sin dependencias extra.
+    Si recibe bytes ya serializados los envía tal cual; cualquier otro
+    contenido se codifica con el serializador en Rust de pydantic-core.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return _adaptador_generico.dump_json(content)
+
+
+class MsgPackResponse(Response):
+    """Respuesta codificada en MessagePack"""
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def acepta_msgpack(request: Optional[Request]) -> bool:
+    """
+    Indica si el cliente prefiere MessagePack sobre JSON según el header Accept.
+    Si msgpack no está instalado siempre se responde JSON.
+    """
+    if request is None or msgpack is None:
+        return False
+
+    calidades = parsear_calidades(request.headers.get("accept", ""))
+    q_msgpack = max(calidades.get(tipo, 0.0) for tipo in MSGPACK_MEDIA_TYPES)
+    q_json = max(calidades.get(tipo, 0.0) for tipo in ("application/json", "application/*", "*/*"))
+    return q_msgpack > 0 and q_msgpack >= q_json
+
+
+def _tipo_lectura(anotacion: Any) -> Any:
+    """Reemplaza EmailStr por str y los schemas anidados por su versión de lectura"""
+    if anotacion is EmailStr:
+        return str
+    if isinstance(anotacion, type) and issubclass(anotacion, BaseModel):
+        return schema_lectura(anotacion)
+
+    origen = get_origin(anotacion)
+    if origen is Union:
+        return Union[tuple(_tipo_lectura(arg) for arg in get_args(anotacion))]
+    if origen is list:
+        return List[_tipo_lectura(get_args(anotacion)[0])]
+    return anotacion
+
+
+@lru_cache(maxsize=None)
+def schema_lectura(schema: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Deriva un schema de solo lectura para datos que ya vienen de la base.
+    Los emails se validaron al escribirse, así que no se vuelve a correr
+    email-validator por cada fila (es lo más caro de validar un listado).
+    Los field_validator del schema original se heredan sin cambios.
+
+    Args:
+        schema: Schema Pydantic de salida (ej: TurnoOut)
+
+    Returns:
+        Subclase del schema con los tipos costosos simplificados
+    """
+    campos = {}
+    for nombre, campo in schema.model_fields.items():
+        nuevo_tipo = _tipo_lectura(campo.annotation)
+        if nuevo_tipo != campo.annotation:
+            campos[nombre] = (nuevo_tipo, campo)
+
+    if not campos:
+        return schema
+    return create_model(schema.__name__, __base__=schema, **campos)
+
+
+@lru_cache(maxsize=None)
+def adaptador_lista(schema: Type[BaseModel]) -> TypeAdapter:
+    """
+    Devuelve el TypeAdapter(list[schema]) cacheado para un schema
+
+    Args:
+        schema: Schema Pydantic de cada elemento (ej: TurnoOut)
+
+    Returns:
+        TypeAdapter construido una única vez por schema
+    """
+    return TypeAdapter(list[schema_lectura(schema)])
+
+
+def serializar_lista(items: Iterable[Any], schema: Type[BaseModel], formato: str = "json") -> bytes:
+    """
+    Valida objetos ORM contra el schema y los serializa directo a bytes
+
+    Args:
+        items: Objetos ORM (o dicts) a serializar
+        schema: Schema Pydantic de salida
+        formato: "json" o "msgpack"
+
+    Returns:
+        Cuerpo codificado en bytes
+    """
+    adaptador = adaptador_lista(schema)
+    validados = adaptador.validate_python(list(items), from_attributes=True)
+    if formato == "msgpack":
+        return msgpack.packb(adaptador.dump_python(validados, mode="json"), use_bin_type=True)
+    return adaptador.dump_json(validados)
+
+
+def respuesta_lista(
+    items: Iterable[Any], schema: Type[BaseModel], request: Optional[Request] = None
+) -> Response:
+    """
+    Arma la respuesta de un listado usando el camino rápido.
+    Al devolver un Response, FastAPI no vuelve a validar contra response_model
+    (que se mantiene en el decorador solo para la documentación OpenAPI).
+
+    Args:
+        items: Objetos ORM a devolver
+        schema: Schema Pydantic de cada elemento
+        request: Request actual, para negociar MessagePack por header Accept
+
+    Returns:
+        JSONBytesResponse o MsgPackResponse con el cuerpo ya serializado
+    """
+    if acepta_msgpack(request):
+        respuesta = MsgPackResponse(content=serializar_lista(items, schema, formato="msgpack"))
+    else:
+        respuesta = JSONBytesResponse(content=serializar_lista(items, schema))
+    respuesta.headers["Vary"] = "Accept"
+    return respuesta
+
+
+def serializar_datos(datos: Any) -> bytes:
+    """Serializa a JSON datos ya armados (dicts, filas proyectadas) sin pasar por un schema"""
+    return _adaptador_generico.dump_json(datos)
+
+
+def respuesta_datos(datos: Any, request: Optional[Request] = None) -> Response:
+    """
+    Igual que respuesta_lista pero para datos ya armados (dicts, listas de filas
+    proyectadas) que no pasan por un schema de salida.
+
+    Args:
+        datos: Estructura serializable (dicts, listas, fechas, etc.)
+        request: Request actual, para negociar MessagePack por header Accept
+
+    Returns:
+        JSONBytesResponse o MsgPackResponse
+    """
+    if acepta_msgpack(request):
+        respuesta = MsgPackResponse(content=_adaptador_generico.dump_python(datos, mode="json"))
+    else:
+        respuesta = JSONBytesResponse(content=serializar_datos(datos))
+    respuesta.headers["Vary"] = "Accept"
+    return respuesta
@@ -1,11 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from app.database import AsyncSessionLocal, get_db
+from app.core.batch import estado_batch
+from app.core.config import LOTE_HASH_HILOS
 from app.models.user import User
+import asyncio
 import os
 import bcrypt
 
@@ -24,6 +29,14 @@ def get_password_hash(password: str) -> str:
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
+# Pool propio para los lotes: no ocupa el threadpool de las rutas (ni su limitador de admisión)
+_pool_hash = ThreadPoolExecutor(max_workers=LOTE_HASH_HILOS, thread_name_prefix="hash")
+
+async def hashear_passwords(passwords: List[str]) -> List[str]:
+    """Hashea varias contraseñas en paralelo (bcrypt libera el GIL), en el mismo orden"""
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(*(loop.run_in_executor(_pool_hash, get_password_hash, p) for p in passwords)))
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     password_bytes = plain_password.encode('utf-8')
     if len(password_bytes) > 72: password_bytes = password_bytes[:72]
@@ -38,25 +51,65 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 # --- OBTENER USUARIO ACTUAL ---
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
+def _credenciales_invalidas() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def email_desde_token(token: str) -> str:
+    """Email (sub) de un token válido
+
+    Raises:
+        HTTPException 401: Si el token es inválido o venció
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub") 
         if email is None:
-            raise credentials_exception
+            raise _credenciales_invalidas()
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
+        raise _credenciales_invalidas()
+    return email
+
+def _verificar_usuario(user: Optional[User]) -> User:
     if user is None:
-        raise credentials_exception
+        raise _credenciales_invalidas()
         
     if not user.activo:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
         
-    return user
\ No newline at end of file
+    return user
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    # En un batch el usuario ya se resolvió en la request principal
+    batch = estado_batch()
+    if batch is not None:
+        return batch.usuario
+    email = email_desde_token(token)
+    user = db.query(User).filter(User.email == email).first()
+    return _verificar_usuario(user)
+
+# --- OBTENER USUARIO ACTUAL (routers async) ---
+async def get_current_user_async(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    Igual que get_current_user pero con AsyncSession. Roles y perfil de paciente
+    se cargan de entrada: en async no hay lazy loading.
+
+    El usuario se lee del primario (nunca de la réplica: un usuario dado de
+    baja o sin un rol no puede seguir autorizado mientras la réplica se atrasa),
+    en una sesión propia que se cierra enseguida: el User queda desacoplado, con
+    todo cargado, y la conexión vuelve al pool antes de que corra la ruta
+    """
+    batch = estado_batch()
+    if batch is not None:
+        return batch.usuario
+    email = email_desde_token(token)
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(
+            select(User)
+            .options(selectinload(User.roles), selectinload(User.paciente))
+            .where(User.email == email)
+        )
+    return _verificar_usuario(user)
@@ -0,0 +1,133 @@
+"""
+Series temporales de signos vitales
+Armado columnar y reducción de puntos (LTTB / promedio por buckets) con NumPy
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+METRICAS_VITALES = ("peso", "altura", "sistolica", "diastolica", "frecuencia_cardiaca", "temperatura")
+
+
+def parsear_presion(presion: Optional[str]) -> Tuple[float, float]:
+    """
+    Separa una presión arterial "120/80" en (sistólica, diastólica)
+
+    Returns:
+        Tupla de floats; NaN si el valor falta o no tiene formato válido
+    """
+    if not presion:
+        return np.nan, np.nan
+    sistolica, _, diastolica = presion.replace(" ", "").partition("/")
+    try:
+        return float(sistolica), float(diastolica)
+    except ValueError:
+        return np.nan, np.nan
+
+
+def construir_columnas(filas: Sequence) -> dict:
+    """
+    Convierte filas (fecha_consulta, peso, altura, presion_arterial,
+    frecuencia_cardiaca, temperatura) en arrays NumPy por columna.
+    Los timestamps quedan en milisegundos epoch (UTC) y los faltantes como NaN.
+    """
+    fechas = np.array([fila.fecha_consulta for fila in filas], dtype="datetime64[ms]")
+    presiones = np.array([parsear_presion(fila.presion_arterial) for fila in filas], dtype=float).reshape(-1, 2)
+
+    def columna(nombre):
+        return np.array([getattr(fila, nombre) for fila in filas], dtype=float)
+
+    return {
+        "timestamps": fechas.astype(np.int64).astype(float),
+        "peso": columna("peso"),
+        "altura": columna("altura"),
+        "sistolica": presiones[:, 0],
+        "diastolica": presiones[:, 1],
+        "frecuencia_cardiaca": columna("frecuencia_cardiaca"),
+        "temperatura": columna("temperatura"),
+    }
+
+
+def indices_lttb(x: np.ndarray, y: np.ndarray, puntos: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: elige `puntos` índices que preservan
+    la forma visual de la serie (x, y). Siempre conserva el primero y el último.
+    """
+    n = len(x)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+
+    seleccion = np.empty(puntos, dtype=np.int64)
+    seleccion[0], seleccion[-1] = 0, n - 1
+    bordes = np.floor(np.linspace(1, n - 1, puntos - 1)).astype(np.int64)
+
+    anterior = 0
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        # Promedio del bucket siguiente (el último punto si ya no quedan buckets)
+        sig_inicio, sig_fin = fin, bordes[i + 2] if i + 2 < len(bordes) else n
+        x_prom, y_prom = x[sig_inicio:sig_fin].mean(), y[sig_inicio:sig_fin].mean()
+
+        xa, ya = x[anterior], y[anterior]
+        areas = np.abs((xa - x_prom) * (y[inicio:fin] - ya) - (xa - x[inicio:fin]) * (y_prom - ya))
+        anterior = inicio + int(np.argmax(areas))
+        seleccion[i + 1] = anterior
+
+    return seleccion
+
+
+def reducir_lttb(columnas: dict, puntos: int, referencia: str) -> dict:
+    """
+    Aplica LTTB sobre la métrica de referencia y usa los mismos índices para
+    todas las columnas (los timestamps quedan compartidos). Las filas sin valor
+    en la métrica de referencia no participan: usar reducir_serie, que cae a
+    promedio por buckets cuando la referencia casi no tiene valores.
+    """
+    validos = np.flatnonzero(np.isfinite(columnas[referencia]))
+    elegidos = validos[indices_lttb(columnas["timestamps"][validos], columnas[referencia][validos], puntos)]
+    return {nombre: valores[elegidos] for nombre, valores in columnas.items()}
+
+
+def reducir_promedio(columnas: dict, puntos: int) -> dict:
+    """
+    Divide la serie en `puntos` buckets con la misma cantidad de filas y
+    devuelve el promedio de cada uno ignorando los faltantes (NaN).
+    """
+    n = len(columnas["timestamps"])
+    if puntos >= n:
+        return columnas
+
+    inicios = np.array([grupo[0] for grupo in np.array_split(np.arange(n), puntos)])
+    reducidas = {}
+    for nombre, valores in columnas.items():
+        presentes = np.isfinite(valores)
+        sumas = np.add.reduceat(np.where(presentes, valores, 0.0), inicios)
+        cantidades = np.add.reduceat(presentes.astype(np.int64), inicios)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            reducidas[nombre] = np.where(cantidades > 0, sumas / cantidades, np.nan)
+    return reducidas
+
+
+def reducir_serie(columnas: dict, puntos: int, metodo: str, referencia: str) -> Tuple[dict, str]:
+    """
+    Reduce la serie a `puntos` con el método pedido ("lttb" o "promedio").
+    Si la métrica de referencia de LTTB tiene menos de `puntos` valores (ej: un
+    paciente sin peso cargado), LTTB descartaría casi todas las filas aunque
+    haya otras métricas: se usa promedio por buckets sobre todas las filas.
+
+    Returns:
+        (columnas reducidas, método aplicado)
+    """
+    if metodo == "lttb" and np.count_nonzero(np.isfinite(columnas[referencia])) >= puntos:
+        return reducir_lttb(columnas, puntos, referencia), "lttb"
+    return reducir_promedio(columnas, puntos), "promedio"
+
+
+def a_listas(columnas: dict) -> dict:
+    """Convierte los arrays a listas JSON (NaN -> None, timestamps a int)"""
+    salida = {"timestamps": columnas["timestamps"].astype(np.int64).tolist()}
+    for nombre in METRICAS_VITALES:
+        valores = np.round(columnas[nombre], 2).astype(object)
+        valores[~np.isfinite(columnas[nombre])] = None
+        salida[nombre] = valores.tolist()
+    return salida
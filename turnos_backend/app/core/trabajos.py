@@ -0,0 +1,63 @@
+"""
+Registro en memoria de trabajos en segundo plano (importaciones, etc.)
+Permite consultar el progreso de un trabajo mientras corre
+"""
+from datetime import datetime
+from typing import Optional
+import threading
+import uuid
+
+# Trabajos terminados que se conservan para consultar su resultado
+MAX_TRABAJOS_GUARDADOS = 100
+
+
+class RegistroTrabajos:
+    """Estado de trabajos en segundo plano, thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trabajos = {}
+
+    def crear(self, tipo: str, total: int = 0) -> str:
+        """Registra un trabajo nuevo y devuelve su id"""
+        trabajo_id = uuid.uuid4().hex
+        with self._lock:
+            if len(self._trabajos) >= MAX_TRABAJOS_GUARDADOS:
+                terminados = [t for t in self._trabajos.values() if t["estado"] in ("completado", "error")]
+                for viejo in sorted(terminados, key=lambda t: t["creado"])[: len(terminados) // 2 or 1]:
+                    self._trabajos.pop(viejo["id"], None)
+            self._trabajos[trabajo_id] = {
+                "id": trabajo_id,
+                "tipo": tipo,
+                "estado": "pendiente",
+                "total": total,
+                "procesados": 0,
+                "creado": datetime.utcnow(),
+                "finalizado": None,
+                "resultado": None,
+                "error": None,
+            }
+        return trabajo_id
+
+    def actualizar(self, trabajo_id: str, **cambios):
+        """Actualiza campos del trabajo (estado, procesados, resultado, ...)"""
+        with self._lock:
+            trabajo = self._trabajos.get(trabajo_id)
+            if trabajo is None:
+                return
+            trabajo.update(cambios)
+            if cambios.get("estado") in ("completado", "error"):
+                trabajo["finalizado"] = datetime.utcnow()
+
+    def obtener(self, trabajo_id: str) -> Optional[dict]:
+        """Copia del estado actual del trabajo, con el porcentaje calculado"""
+        with self._lock:
+            trabajo = self._trabajos.get(trabajo_id)
+            if trabajo is None:
+                return None
+            copia = dict(trabajo)
+        copia["progreso"] = round(100 * copia["procesados"] / copia["total"], 1) if copia["total"] else 0.0
+        return copia
+
+
+trabajos = RegistroTrabajos()
@@ -2,12 +2,103 @@
 Funciones de validación centralizadas para el backend
 Contiene validaciones reutilizables y mensajes estandarizados
 """
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from pydantic import EmailStr, ValidationError, TypeAdapter
 from fastapi import HTTPException
 import re
 
 
+# ══════════════════════════════════════════════════════════════════════════
+# CHEQUEOS BASE (compilados una sola vez)
+# Cada chequeo devuelve (valor_limpio, mensaje_error) sin lanzar excepciones;
+# los validadores individuales y los de lote se construyen sobre ellos.
+# ══════════════════════════════════════════════════════════════════════════
+
+_ADAPTADOR_EMAIL = TypeAdapter(EmailStr)
+
+_RE_DIGITO = re.compile(r"\d")
+_RE_NO_DIGITO = re.compile(r"\D")
+_RE_MAYUSCULA = re.compile(r"[A-Z]")
+_RE_TELEFONO = re.compile(r"^[\d\+\-\s()]+$")
+# Parte local "dot-atom" ASCII (RFC 5322): la forma de casi todos los emails reales
+_RE_EMAIL_LOCAL = re.compile(r"^[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*$")
+
+_EMAIL_OBLIGATORIO = "El email es obligatorio"
+_EMAIL_INVALIDO = "El formato del email no es válido (debe contener @ y un dominio válido)"
+
+
+def _chequear_password(v: str) -> Tuple[Optional[str], Optional[str]]:
+    if len(v) < 8:
+        return None, 'La contraseña debe tener al menos 8 caracteres.'
+    if not _RE_DIGITO.search(v):
+        return None, 'La contraseña debe contener al menos un número.'
+    if not _RE_MAYUSCULA.search(v):
+        return None, 'La contraseña debe contener al menos una letra mayúscula.'
+    return v, None
+
+
+def _chequear_dni(dni: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    if dni is None or dni.strip() == '':
+        return None, None
+    dni_limpio = dni.replace(".", "").replace(" ", "").strip()
+    if not dni_limpio.isdigit():
+        return None, 'El DNI debe contener solo números'
+    if len(dni_limpio) < 6 or len(dni_limpio) > 10:
+        return None, 'El DNI debe tener entre 6 y 10 dígitos'
+    return dni_limpio, None
+
+
+def _chequear_telefono(telefono: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    if telefono is None or telefono.strip() == '':
+        return None, None
+    if not _RE_TELEFONO.match(telefono):
+        return None, 'El teléfono contiene caracteres inválidos (solo se permiten números, +, -, (), espacios)'
+    if len(_RE_NO_DIGITO.sub('', telefono)) < 6:
+        return None, 'El teléfono debe tener al menos 6 dígitos'
+    return telefono.strip(), None
+
+
+def _chequear_matricula(matricula: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    if matricula is None or matricula.strip() == '':
+        return None, None
+    matricula_limpia = matricula.strip()
+    if len(matricula_limpia) < 3:
+        return None, 'La matrícula profesional debe tener al menos 3 caracteres'
+    return matricula_limpia, None
+
+
+def _email_valido_completo(email: str) -> bool:
+    try:
+        _ADAPTADOR_EMAIL.validate_python(email)
+    except ValidationError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _dominio_email_valido(dominio: str) -> bool:
+    """La validación del dominio es la parte cara de EmailStr; se cachea por dominio"""
+    return _email_valido_completo(f"x@{dominio}")
+
+
+def _email_valido(email: str) -> bool:
+    local, arroba, dominio = email.rpartition("@")
+    if arroba and len(local) <= 64 and len(email) <= 254 and _RE_EMAIL_LOCAL.match(local):
+        return _dominio_email_valido(dominio)
+    # Formas poco comunes (comillas, unicode, "Nombre <email>"): validación completa
+    return _email_valido_completo(email)
+
+
+def _chequear_email(email: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    if not email or not email.strip():
+        return None, _EMAIL_OBLIGATORIO
+    email_limpio = email.strip().lower()
+    if not _email_valido(email_limpio):
+        return None, _EMAIL_INVALIDO
+    return email_limpio, None
+
+
 # ══════════════════════════════════════════════════════════════════════════
 # VALIDADORES DE FORMATO
 # ══════════════════════════════════════════════════════════════════════════
@@ -28,13 +119,10 @@ def validar_password_fuerte(v: str) -> str:
     Raises:
         ValueError: Si la contraseña no cumple los requisitos
     """
-    if len(v) < 8:
-        raise ValueError('La contraseña debe tener al menos 8 caracteres.')
-    if not re.search(r"\d", v):
-        raise ValueError('La contraseña debe contener al menos un número.')
-    if not re.search(r"[A-Z]", v):
-        raise ValueError('La contraseña debe contener al menos una letra mayúscula.')
-    return v
+    valor, error = _chequear_password(v)
+    if error:
+        raise ValueError(error)
+    return valor
 
 
 def validar_dni(dni: Optional[str]) -> Optional[str]:
@@ -53,21 +141,10 @@ def validar_dni(dni: Optional[str]) -> Optional[str]:
     Raises:
         ValueError: Si el DNI no cumple los requisitos
     """
-    if dni is None or dni.strip() == '':
-        return None
-        
-    # Limpiar puntos y espacios
-    dni_limpio = dni.replace(".", "").replace(" ", "").strip()
-    
-    # Validar que solo contenga números
-    if not dni_limpio.isdigit():
-        raise ValueError('El DNI debe contener solo números')
-    
-    # Validar longitud
-    if len(dni_limpio) < 6 or len(dni_limpio) > 10:
-        raise ValueError('El DNI debe tener entre 6 y 10 dígitos')
-    
-    return dni_limpio
+    valor, error = _chequear_dni(dni)
+    if error:
+        raise ValueError(error)
+    return valor
 
 
 def validar_telefono(telefono: Optional[str]) -> Optional[str]:
@@ -85,19 +162,10 @@ def validar_telefono(telefono: Optional[str]) -> Optional[str]:
     Raises:
         ValueError: Si el teléfono no cumple los requisitos
     """
-    if telefono is None or telefono.strip() == '':
-        return None
-    
-    # Permitir números, +, -, espacios y paréntesis
-    if not re.match(r'^[\d\+\-\s()]+$', telefono):
-        raise ValueError('El teléfono contiene caracteres inválidos (solo se permiten números, +, -, (), espacios)')
-    
-    # Verificar que tenga al menos 6 dígitos
-    solo_digitos = re.sub(r'\D', '', telefono)
-    if len(solo_digitos) < 6:
-        raise ValueError('El teléfono debe tener al menos 6 dígitos')
-    
-    return telefono.strip()
+    valor, error = _chequear_telefono(telefono)
+    if error:
+        raise ValueError(error)
+    return valor
 
 
 def validar_email_formato(email: str) -> str:
@@ -113,23 +181,10 @@ def validar_email_formato(email: str) -> str:
     Raises:
         HTTPException 400: Si el formato del email no es válido
     """
-    if not email or not email.strip():
-        raise HTTPException(
-            status_code=400, 
-            detail="El email es obligatorio"
-        )
-    
-    email_limpio = email.strip().lower()
-    
-    try:
-        TypeAdapter(EmailStr).validate_python(email_limpio)
-    except ValidationError:
-        raise HTTPException(
-            status_code=400, 
-            detail="El formato del email no es válido (debe contener @ y un dominio válido)"
-        )
-    
-    return email_limpio
+    valor, error = _chequear_email(email)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    return valor
 
 
 def validar_matricula(matricula: Optional[str]) -> Optional[str]:
@@ -147,15 +202,10 @@ def validar_matricula(matricula: Optional[str]) -> Optional[str]:
     Raises:
         ValueError: Si la matrícula no cumple los requisitos
     """
-    if matricula is None or matricula.strip() == '':
-        return None
-    
-    matricula_limpia = matricula.strip()
-    
-    if len(matricula_limpia) < 3:
-        raise ValueError('La matrícula profesional debe tener al menos 3 caracteres')
-    
-    return matricula_limpia
+    valor, error = _chequear_matricula(matricula)
+    if error:
+        raise ValueError(error)
+    return valor
 
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -243,6 +293,22 @@ class MensajesError:
 # FUNCIONES HELPER
 # ══════════════════════════════════════════════════════════════════════════
 
+def detalle_error(campo: str, mensaje: str, fila: Optional[int] = None) -> dict:
+    """
+    Crea un item de error con formato de Pydantic
+    
+    Args:
+        campo: Nombre del campo con error
+        mensaje: Mensaje de error
+        fila: Índice de la fila (validación en lote); se agrega al loc
+        
+    Returns:
+        Dict {"loc", "msg", "type"}
+    """
+    loc = ["body", campo] if fila is None else ["body", fila, campo]
+    return {"loc": loc, "msg": mensaje, "type": "value_error"}
+
+
 def crear_error_validacion(campo: str, mensaje: str) -> dict:
     """
     Crea un error de validación en formato estandarizado
@@ -254,12 +320,81 @@ def crear_error_validacion(campo: str, mensaje: str) -> dict:
     Returns:
         Dict con formato de error de Pydantic
     """
-    return {
-        "detail": [
-            {
-                "loc": ["body", campo],
-                "msg": mensaje,
-                "type": "value_error"
-            }
-        ]
-    }
+    return {"detail": [detalle_error(campo, mensaje)]}
+
+
+def crear_errores_validacion(errores: Sequence[dict]) -> dict:
+    """Agrupa varios items de detalle_error en el formato {"detail": [...]}"""
+    return {"detail": list(errores)}
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# VALIDACIÓN EN LOTE
+# Valida columnas completas sin cortar en el primer error
+# ══════════════════════════════════════════════════════════════════════════
+
+CHEQUEOS = {
+    "email": _chequear_email,
+    "password": _chequear_password,
+    "dni": _chequear_dni,
+    "telefono": _chequear_telefono,
+    "matricula": _chequear_matricula,
+}
+
+
+def validar_columna(campo: str, valores: Sequence, tipo: Optional[str] = None) -> Tuple[list, list]:
+    """
+    Valida todos los valores de una columna
+    
+    Args:
+        campo: Nombre del campo (se usa en los errores)
+        valores: Valores de la columna, uno por fila
+        tipo: Chequeo a aplicar (email, password, dni, telefono, matricula);
+              por defecto el mismo nombre del campo
+        
+    Returns:
+        (limpios, errores): limpios tiene un valor por fila (None si es inválido);
+        errores es una lista de detalle_error con el índice de fila en el loc
+        
+    Raises:
+        KeyError: Si no hay chequeo para el tipo pedido
+    """
+    chequeo = CHEQUEOS[tipo or campo]
+    limpios, errores = [], []
+    for i, valor in enumerate(valores):
+        limpio, error = chequeo(valor)
+        limpios.append(limpio)
+        if error:
+            errores.append(detalle_error(campo, error, i))
+    return limpios, errores
+
+
+def validar_lote(registros: Sequence[dict], campos: Iterable[str]) -> Tuple[List[dict], List[dict]]:
+    """
+    Valida varias columnas de una lista de registros (dicts)
+    
+    Args:
+        registros: Filas a validar (ej: filas de un CSV o formularios)
+        campos: Campos a validar; cada uno usa el chequeo de su mismo nombre
+        
+    Returns:
+        (limpios, errores): limpios son copias de los registros con los valores
+        normalizados; errores está ordenado por fila y campo
+    """
+    limpios = [dict(registro) for registro in registros]
+    errores = []
+    for campo in campos:
+        valores, errores_columna = validar_columna(campo, [r.get(campo) for r in registros])
+        for fila, valor in zip(limpios, valores):
+            fila[campo] = valor
+        errores.extend(errores_columna)
+    errores.sort(key=lambda e: e["loc"][1])
+    return limpios, errores
+
+
+def errores_por_fila(errores: Iterable[dict]) -> Dict[int, List[dict]]:
+    """Agrupa los errores de validar_lote por índice de fila"""
+    agrupados: Dict[int, List[dict]] = {}
+    for error in errores:
+        agrupados.setdefault(error["loc"][1], []).append(error)
+    return agrupados
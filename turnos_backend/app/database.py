@@ -1,8 +1,18 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
 
+from app.core.config import POOLS_POR_CARGA
+from app.core.pool_conexiones import instrumentar_engine, opciones_pool
+from app.core.limites_sql import instalar_limites
+from app.core.batch import estado_batch
+from app.core import lectura
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -11,10 +21,52 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL is None:
     raise RuntimeError("DATABASE_URL no está definida. Revisá el archivo .env")
 
+# Driver async equivalente a cada backend sync
+DRIVERS_ASYNC = {
+    "mysql": "mysql+asyncmy",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def url_async(url: str) -> str:
+    """
+    Traduce DATABASE_URL al driver async del mismo backend
+    (ej: mysql+mysqldb://... -> mysql+asyncmy://..., sqlite:///... -> sqlite+aiosqlite:///...)
+    """
+    url_sync = make_url(url)
+    driver = DRIVERS_ASYNC.get(url_sync.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No hay driver async configurado para '{url_sync.get_backend_name()}'. Definí ASYNC_DATABASE_URL")
+    return url_sync.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# Se puede forzar otro driver (ej: mysql+aiomysql) con ASYNC_DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or url_async(DATABASE_URL)
+
+# Réplica de lectura opcional: sin ella, las dependencias de lectura usan el primario
+DATABASE_URL_LECTURA = os.getenv("DATABASE_URL_LECTURA")
+ASYNC_DATABASE_URL_LECTURA = (
+    os.getenv("ASYNC_DATABASE_URL_LECTURA") or url_async(DATABASE_URL_LECTURA)
+    if DATABASE_URL_LECTURA else None
+)
+
+
+def _ajustes_pool(carga: str) -> dict:
+    ajustes = dict(POOLS_POR_CARGA[carga])
+    ajustes.pop("timeout_sentencia_ms")
+    return ajustes
+
+def _timeout_sentencia(carga: str) -> int:
+    return POOLS_POR_CARGA[carga]["timeout_sentencia_ms"]
+
+# 🟢 Pool interactivo (login, reservas, recepción): el default de get_db / get_async_db.
+# Tamaño, timeout y recycle del pool vienen de app.core.config (DB_POOL_*)
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True
+    **opciones_pool(DATABASE_URL, "interactivo", **_ajustes_pool("interactivo"))
 )
+instrumentar_engine(engine, "interactivo", _timeout_sentencia("interactivo"))
+instalar_limites(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -22,11 +74,209 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# ⚡ Engine async: los routers `async def` no ocupan un hilo del threadpool
+# mientras esperan a la base. Convive con el engine sync durante la migración.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **opciones_pool(ASYNC_DATABASE_URL, "interactivo_async", es_async=True, **_ajustes_pool("interactivo"))
+)
+instrumentar_engine(async_engine.sync_engine, "interactivo_async", _timeout_sentencia("interactivo"))
+instalar_limites(async_engine.sync_engine)
+
+# expire_on_commit=False: después del commit los atributos siguen cargados;
+# en async un refresh implícito (lazy) no está permitido
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# 📊 Pool de reportes / exportaciones: consultas largas con su propio límite de conexiones
+engine_reportes = create_engine(
+    DATABASE_URL,
+    **opciones_pool(DATABASE_URL, "reportes", **_ajustes_pool("reportes"))
+)
+instrumentar_engine(engine_reportes, "reportes", _timeout_sentencia("reportes"))
+instalar_limites(engine_reportes)
+SessionReportes = sessionmaker(autocommit=False, autoflush=False, bind=engine_reportes)
+
+async_engine_reportes = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **opciones_pool(ASYNC_DATABASE_URL, "reportes_async", es_async=True, **_ajustes_pool("reportes"))
+)
+instrumentar_engine(async_engine_reportes.sync_engine, "reportes_async", _timeout_sentencia("reportes"))
+instalar_limites(async_engine_reportes.sync_engine)
+AsyncSessionReportes = async_sessionmaker(
+    bind=async_engine_reportes,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# ⚙️ Pool de trabajos en segundo plano (importaciones, reindexado).
+# Sin límites por ruta: los BackgroundTasks heredan el contexto de la request que los lanzó
+engine_background = create_engine(
+    DATABASE_URL,
+    **opciones_pool(DATABASE_URL, "background", **_ajustes_pool("background"))
+)
+instrumentar_engine(engine_background, "background", _timeout_sentencia("background"))
+SessionBackground = sessionmaker(autocommit=False, autoflush=False, bind=engine_background)
+
+# 📖 Réplica de lectura
+SessionLectura = None
+AsyncSessionLectura = None
+SessionLecturaReportes = None
+AsyncSessionLecturaReportes = None
+
+class SesionLectura(Session):
+    """Session contra la réplica: cualquier flush es un error de programación"""
+
+@event.listens_for(SesionLectura, "before_flush")
+def _solo_lectura(session, flush_context, instances):
+    raise RuntimeError("La sesión de la réplica es de solo lectura")
+
+if DATABASE_URL_LECTURA:
+    engine_lectura = create_engine(
+        DATABASE_URL_LECTURA,
+        **opciones_pool(DATABASE_URL_LECTURA, "lectura", **_ajustes_pool("interactivo"))
+    )
+    instrumentar_engine(engine_lectura, "lectura", _timeout_sentencia("interactivo"))
+    instalar_limites(engine_lectura)
+    SessionLectura = sessionmaker(class_=SesionLectura, autocommit=False, autoflush=False, bind=engine_lectura)
+
+    async_engine_lectura = create_async_engine(
+        ASYNC_DATABASE_URL_LECTURA,
+        **opciones_pool(ASYNC_DATABASE_URL_LECTURA, "lectura_async", es_async=True, **_ajustes_pool("interactivo"))
+    )
+    instrumentar_engine(async_engine_lectura.sync_engine, "lectura_async", _timeout_sentencia("interactivo"))
+    instalar_limites(async_engine_lectura.sync_engine)
+    AsyncSessionLectura = async_sessionmaker(
+        bind=async_engine_lectura,
+        class_=AsyncSession,
+        sync_session_class=SesionLectura,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+    # Pools de la réplica para lecturas pesadas: tamaño y timeout de reportes,
+    # así un reporte largo no agota las conexiones de las lecturas interactivas
+    engine_lectura_reportes = create_engine(
+        DATABASE_URL_LECTURA,
+        **opciones_pool(DATABASE_URL_LECTURA, "lectura_reportes", **_ajustes_pool("reportes"))
+    )
+    instrumentar_engine(engine_lectura_reportes, "lectura_reportes", _timeout_sentencia("reportes"))
+    instalar_limites(engine_lectura_reportes)
+    SessionLecturaReportes = sessionmaker(
+        class_=SesionLectura, autocommit=False, autoflush=False, bind=engine_lectura_reportes
+    )
+
+    async_engine_lectura_reportes = create_async_engine(
+        ASYNC_DATABASE_URL_LECTURA,
+        **opciones_pool(ASYNC_DATABASE_URL_LECTURA, "lectura_reportes_async", es_async=True, **_ajustes_pool("reportes"))
+    )
+    instrumentar_engine(
+        async_engine_lectura_reportes.sync_engine, "lectura_reportes_async", _timeout_sentencia("reportes")
+    )
+    instalar_limites(async_engine_lectura_reportes.sync_engine)
+    AsyncSessionLecturaReportes = async_sessionmaker(
+        bind=async_engine_lectura_reportes,
+        class_=AsyncSession,
+        sync_session_class=SesionLectura,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
 Base = declarative_base()
 
 def get_db():
+    # Dentro de POST /batch todas las sub-requests comparten la sesión (la cierra el batch)
+    batch = estado_batch()
+    if batch is not None:
+        yield batch.obtener_sesion_sync(SessionLocal)
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    batch = estado_batch()
+    if batch is not None:
+        yield batch.sesion_async
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# 📖 Dependencias de lectura: réplica salvo escritura reciente del cliente o réplica caída.
+# Sin réplica disponible se usa el pool del primario que corresponda a la carga
+def _abrir_sesion_lectura(request: Request, fabrica_replica, fabrica_primario) -> Session:
+    if fabrica_replica is not None and lectura.usar_replica(request):
+        db = fabrica_replica()
+        try:
+            db.connection()
+            return db
+        except OperationalError:
+            db.close()
+            lectura.replica.marcar_caida()
+    return fabrica_primario()
+
+async def _abrir_sesion_lectura_async(request: Request, fabrica_replica, fabrica_primario) -> AsyncSession:
+    if fabrica_replica is not None and lectura.usar_replica(request):
+        db = fabrica_replica()
+        try:
+            await db.connection()
+            return db
+        except OperationalError:
+            await db.close()
+            lectura.replica.marcar_caida()
+    return fabrica_primario()
+
+def get_db_lectura(request: Request):
+    # En un batch se lee de la sesión compartida: ve las escrituras de las sub-requests anteriores
+    batch = estado_batch()
+    if batch is not None:
+        yield batch.obtener_sesion_sync(SessionLocal)
+        return
+    db = _abrir_sesion_lectura(request, SessionLectura, SessionLocal)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db_lectura(request: Request):
+    batch = estado_batch()
+    if batch is not None:
+        yield batch.sesion_async
+        return
+    db = await _abrir_sesion_lectura_async(request, AsyncSessionLectura, AsyncSessionLocal)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+# 📊 Dependencias de lecturas pesadas (estadísticas, series, búsqueda, calendario):
+# pool de reportes de la réplica si está disponible; si no, el del primario.
+# Nunca ocupan las conexiones de los pools interactivos
+def get_db_reportes(request: Request):
+    batch = estado_batch()
+    if batch is not None:
+        yield batch.obtener_sesion_sync(SessionLocal)
+        return
+    db = _abrir_sesion_lectura(request, SessionLecturaReportes, SessionReportes)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db_reportes(request: Request):
+    batch = estado_batch()
+    if batch is not None:
+        yield batch.sesion_async
+        return
+    db = await _abrir_sesion_lectura_async(request, AsyncSessionLecturaReportes, AsyncSessionReportes)
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -4,23 +4,56 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from fastapi.openapi.utils import get_openapi
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 import os
 
 # Routers
-from app.routers import auth, usuarios, roles, turnos, pacientes, kinesiologos, servicios, salas, recepcion,historias_clinicas
+from app.routers import auth, usuarios, roles, turnos, pacientes, kinesiologos, servicios, salas, recepcion,historias_clinicas, exportar, debug, bootstrap, batch
 
 # Excepciones personalizadas
 from app.core.exceptions import http_error_handler, generic_error_handler
+from app.core.limites_sql import sentencia_cancelada_handler
+from sqlalchemy.exc import OperationalError
 
 # Middleware de logging
 from app.core.logging_middleware import log_requests
 
+# Compresión de respuestas
+from app.core.compresion import CompresionMiddleware
+from app.core.config import COMPRESION_HABILITADA, CAPTURA_HABILITADA
+
+# Captura de tráfico (opcional)
+from app.core.captura import CapturaMiddleware
+
+# Idempotency-Key para reservas y cambios de estado
+from app.core.idempotencia import IdempotenciaMiddleware
+
+# Control de admisión para el threadpool
+from app.core.admision import AdmisionMiddleware
+from app.core.config import ADMISION_HABILITADA
+
+# Tablas nuevas (índice de búsqueda, ...) sobre el esquema existente
+from app.core.esquema import preparar_esquema
+
+# Réplica de lectura (read-your-writes)
+from app.database import DATABASE_URL_LECTURA
+from app.core.lectura import MarcadorEscriturasMiddleware
+
 
 # Cargar variables de entorno
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🧱 Crea las tablas agregadas que falten antes de atender requests
+    await run_in_threadpool(preparar_esquema)
+    yield
+
+
 # Inicializar app
 app = FastAPI(
+    lifespan=lifespan,
     title="KinesioPro API",
     description="Sistema de gestión de turnos para kinesiólogos con autenticación JWT.",
     version="2.0.0",
@@ -34,13 +67,44 @@ app = FastAPI(
         {"name": "Salas", "description": "Gestión de salas"},
         {"name": "Servicios", "description": "Gestión de servicios"},
         {"name": "Recepción", "description": "Funcionalidades para recepcionistas"},
+        {"name": "Bootstrap", "description": "Datos iniciales de pantallas en una sola request"},
+        {"name": "Batch", "description": "Varias operaciones en una sola request (opcionalmente atómicas)"},
+        {"name": "Exportación", "description": "Exportaciones CSV / NDJSON en streaming"},
+        {"name": "Debug", "description": "Métricas internas (solo admin)"},
     ],
 )
 
 # 🔐 Seguridad global
 bearer_scheme = HTTPBearer()
 
-# ⚙️ CORS para frontend
+# 🔁 Idempotency-Key: los reintentos de POST /turnos/ y PATCH estado se contestan
+# con la respuesta guardada (por dentro de la compresión, se guarda sin comprimir)
+app.add_middleware(IdempotenciaMiddleware)
+
+# 🗜️ Compresión gzip / brotli negociada
+# (se registra antes del logging para quedar por dentro y ver la respuesta original)
+if COMPRESION_HABILITADA:
+    app.add_middleware(CompresionMiddleware)
+
+# 🚦 Control de admisión: rechaza primero reportes / exportaciones / listados ante saturación
+# (por dentro del logging, así los 503 quedan registrados)
+if ADMISION_HABILITADA:
+    app.add_middleware(AdmisionMiddleware)
+
+# 📝 Middleware de logging
+app.middleware("http")(log_requests)
+
+# 📖 Con réplica configurada, recordar quién escribió para leerle del primario un rato
+if DATABASE_URL_LECTURA:
+    app.add_middleware(MarcadorEscriturasMiddleware)
+
+# 🎥 Captura de tráfico anonimizada (por fuera de todo salvo CORS, para medir la request completa)
+if CAPTURA_HABILITADA:
+    app.add_middleware(CapturaMiddleware)
+
+# ⚙️ CORS para frontend: se registra último para ser el middleware más externo.
+# Así también llevan sus headers las respuestas que arman otros middlewares
+# (repeticiones y errores de idempotencia, 503 de admisión)
 origins = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -52,13 +116,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "Retry-After"],
 )
 
-# 📝 Middleware de logging
-app.middleware("http")(log_requests)
-
 # 🧱 Manejo global de errores
 app.add_exception_handler(HTTPException, http_error_handler)
+# ⏱️ Consultas canceladas por límite de tiempo -> 503 con Retry-After
+app.add_exception_handler(OperationalError, sentencia_cancelada_handler)
 app.add_exception_handler(Exception, generic_error_handler)
 
 # 🧾 Documentación Swagger con Bearer Token
@@ -93,6 +157,10 @@ app.include_router(servicios.router)
 app.include_router(salas.router)
 app.include_router(recepcion.router)
 app.include_router(historias_clinicas.router) 
+app.include_router(exportar.router)
+app.include_router(bootstrap.router)
+app.include_router(batch.router)
+app.include_router(debug.router)
 
 @app.get("/")
 def root():
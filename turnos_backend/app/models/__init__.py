@@ -8,3 +8,5 @@ from app.models.servicio import Servicio
 from app.models.sala import Sala
 from app.models.horario_kinesiologo import HorarioKinesiologo
 from app.models.historia_clinica import HistoriaClinica  # ✨ NUEVO
+from app.models.historia_termino import HistoriaTermino
+from app.models.clave_idempotencia import ClaveIdempotencia
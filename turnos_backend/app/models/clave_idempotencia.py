@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+# Tamaño máximo de respuesta guardada: con largo explícito MySQL usa MEDIUMBLOB
+# (un BLOB sin largo corta en 64 KB)
+MAX_BYTES_CUERPO = 256 * 1024
+
+
+class ClaveIdempotencia(Base):
+    """Respuesta guardada por Idempotency-Key para contestar reintentos sin re-ejecutar (ver app/core/idempotencia.py)"""
+    __tablename__ = "claves_idempotencia"
+    __table_args__ = (
+        # La misma clave de dos clientes distintos son dos registros
+        UniqueConstraint("alcance", "clave", name="uq_claves_idempotencia_alcance_clave"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    alcance = Column(String(64), nullable=False)  # sha256 de quién hace la request (usuario del token)
+    clave = Column(String(128), nullable=False)
+    hash_request = Column(String(64), nullable=False)  # sha256 de método, ruta, query y body
+    codigo = Column(Integer, nullable=True)  # NULL mientras la request original está en curso
+    content_type = Column(String(100), nullable=True)
+    cuerpo = Column(LargeBinary(MAX_BYTES_CUERPO), nullable=True)
+    creada = Column(DateTime, default=datetime.utcnow, nullable=False)  # inicio del lease mientras codigo es NULL
+    expira = Column(DateTime, nullable=False, index=True)
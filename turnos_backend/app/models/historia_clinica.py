@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -6,6 +6,10 @@ from app.database import Base
 
 class HistoriaClinica(Base):
     __tablename__ = "historias_clinicas"
+    __table_args__ = (
+        # Timeline por paciente: paginación por cursor (fecha_consulta, id) y última consulta
+        Index("ix_historias_paciente_fecha", "paciente_id", "fecha_consulta", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     paciente_id = Column(Integer, ForeignKey("pacientes.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.database import Base
+
+
+class HistoriaTermino(Base):
+    """Índice invertido para la búsqueda de texto en historias clínicas"""
+    __tablename__ = "historia_terminos"
+    __table_args__ = (
+        Index("ix_historia_terminos_termino", "termino", "historia_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    historia_id = Column(Integer, ForeignKey("historias_clinicas.id", ondelete="CASCADE"), nullable=False, index=True)
+    termino = Column(String(64), nullable=False)  # normalizado: sin acentos, minúsculas, con stemming
+    frecuencia = Column(Integer, nullable=False, default=1)
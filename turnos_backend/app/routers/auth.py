@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.database import get_db
+from app.database import get_async_db
 from app.core.token import create_access_token
 from app.core.security import verify_password, get_password_hash
+from app.core.limites_sql import limite_sentencia
 
 from app.models.user import User
 from app.models.role import Role
@@ -11,7 +14,11 @@ from app.models.user_role import UserRole
 from app.schemas.user_schema import UserCreate
 from pydantic import BaseModel, EmailStr
 
-router = APIRouter(prefix="/auth", tags=["Autenticación"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["Autenticación"],
+    dependencies=[Depends(limite_sentencia("reserva"))]
+)
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -19,9 +26,10 @@ class LoginRequest(BaseModel):
 
 # 🔐 LOGIN
 @router.post("/login")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == data.email))
+    # bcrypt es CPU puro (~100ms): va al threadpool para no frenar el event loop
+    if not user or not await run_in_threadpool(verify_password, data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales incorrectas")
 
     if not user.activo:
@@ -41,22 +49,21 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
 
 # 🧾 REGISTRO
 @router.post("/register")
-def register(new_user: UserCreate, db: Session = Depends(get_db)):
-    user_exist = db.query(User).filter(User.email == new_user.email).first()
+async def register(new_user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user_exist = await db.scalar(select(User.id).where(User.email == new_user.email))
     if user_exist:
         raise HTTPException(status_code=400, detail="El usuario ya existe")
 
-    hashed_pw = get_password_hash(new_user.password)
+    hashed_pw = await run_in_threadpool(get_password_hash, new_user.password)
     user = User(nombre=new_user.nombre, email=new_user.email, password_hash=hashed_pw)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
     # Asigna rol de paciente por defecto
-    role = db.query(Role).filter(Role.name == "paciente").first()
+    role = await db.scalar(select(Role).where(Role.name == "paciente"))
     if role:
         user_role = UserRole(user_id=user.id, role_id=role.id)
         db.add(user_role)
-        db.commit()
+        await db.commit()
 
     return {"message": "Usuario registrado correctamente"}
\ No newline at end of file
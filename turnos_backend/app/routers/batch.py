@@ -0,0 +1,226 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.middleware.exceptions import ExceptionMiddleware
+from typing import Any
+import anyio
+import json
+import re
+
+from app.database import async_engine, get_async_db
+from app.core.batch import EstadoBatch, iniciar_batch, terminar_batch
+from app.core.security import get_current_user_async
+from app.core.limites_sql import limite_aislado, limite_sentencia
+from app.core.metricas import metricas
+from app.models.user import User
+from app.schemas.batch_schema import BatchOut, BatchRequest, SubRequest
+
+router = APIRouter(
+    prefix="/batch",
+    tags=["Batch"],
+    dependencies=[Depends(limite_sentencia("reserva"))]
+)
+
+# {{indice.campo.subcampo}}: valor del body de una sub-request anterior
+_REFERENCIA = re.compile(r"\{\{(\d+)((?:\.\w+)*)\}\}")
+
+
+class ReferenciaInvalida(Exception):
+    pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REFERENCIAS ENTRE SUB-REQUESTS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _valor_referencia(resultados: list, indice: int, camino: str) -> Any:
+    if indice >= len(resultados):
+        raise ReferenciaInvalida(f"La sub-request {indice} todavía no se ejecutó")
+    if resultados[indice]["codigo"] >= 400:
+        raise ReferenciaInvalida(f"La sub-request {indice} falló")
+
+    valor = resultados[indice]["body"]
+    for campo in filter(None, camino.split(".")):
+        if isinstance(valor, dict) and campo in valor:
+            valor = valor[campo]
+        elif isinstance(valor, list) and campo.isdigit() and int(campo) < len(valor):
+            valor = valor[int(campo)]
+        else:
+            raise ReferenciaInvalida(f"La respuesta de la sub-request {indice} no tiene '{camino.lstrip('.')}'")
+    return valor
+
+
+def resolver_referencias(valor: Any, resultados: list) -> Any:
+    """
+    Reemplaza {{i.campo}} por el valor correspondiente de resultados[i].
+    Un string que es solo la referencia toma el tipo del valor (ej: un id int);
+    dentro de un texto más largo (ej: la ruta) se interpola como string
+
+    Raises:
+        ReferenciaInvalida: Si la sub-request no se ejecutó, falló o no tiene el campo
+    """
+    if isinstance(valor, str):
+        completa = _REFERENCIA.fullmatch(valor)
+        if completa:
+            return _valor_referencia(resultados, int(completa[1]), completa[2])
+        return _REFERENCIA.sub(lambda m: str(_valor_referencia(resultados, int(m[1]), m[2])), valor)
+    if isinstance(valor, dict):
+        return {clave: resolver_referencias(v, resultados) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [resolver_referencias(v, resultados) for v in valor]
+    return valor
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EJECUCIÓN EN PROCESO
+# ═══════════════════════════════════════════════════════════════════════════
+
+async def ejecutar_sub_request(request: Request, app_interna, sub: SubRequest) -> dict:
+    """
+    Despacha la sub-request directo al router de la app (sin pasar por HTTP ni
+    por los middlewares) con el header Authorization del batch
+
+    Returns:
+        {"codigo": status, "body": JSON decodificado, texto o None}
+    """
+    ruta, _, query = sub.ruta.partition("?")
+    if ruta.rstrip("/") == router.prefix:
+        return {"codigo": 400, "body": {"error": "No se puede anidar un batch"}}
+
+    cuerpo = json.dumps(sub.body).encode() if sub.body is not None else b""
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(cuerpo)).encode())]
+    if "authorization" in request.headers:
+        headers.append((b"authorization", request.headers["authorization"].encode("latin-1")))
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": sub.metodo,
+        "scheme": request.url.scheme,
+        "path": ruta,
+        "raw_path": ruta.encode(),
+        "root_path": request.scope.get("root_path", ""),
+        "query_string": query.encode(),
+        "headers": headers,
+        "client": request.client,
+        "server": request.scope.get("server"),
+        "app": request.app,
+    }
+
+    body_entregado = False
+
+    async def recibir():
+        nonlocal body_entregado
+        if not body_entregado:
+            body_entregado = True
+            return {"type": "http.request", "body": cuerpo, "more_body": False}
+        # Sin desconexión: las respuestas en streaming se leen completas
+        await anyio.sleep_forever()
+
+    respuesta = {"codigo": 500, "content_type": "", "partes": []}
+
+    async def enviar(message):
+        if message["type"] == "http.response.start":
+            respuesta["codigo"] = message["status"]
+            respuesta["content_type"] = dict(message.get("headers") or []).get(b"content-type", b"").decode("latin-1")
+        elif message["type"] == "http.response.body":
+            respuesta["partes"].append(message.get("body", b""))
+
+    # Cada sub-request arranca sin límite de sentencia, como por HTTP: fija el de su ruta
+    with limite_aislado():
+        await app_interna(scope, recibir, enviar)
+
+    contenido = b"".join(respuesta["partes"])
+    if not contenido:
+        body = None
+    elif "json" in respuesta["content_type"]:
+        body = json.loads(contenido)
+    else:
+        body = contenido.decode("utf-8", errors="replace")
+    return {"codigo": respuesta["codigo"], "body": body}
+
+
+# ─────────────────────────────────────────────
+# 📦 Ejecutar batch
+# ─────────────────────────────────────────────
+@router.post("", response_model=BatchOut)
+async def ejecutar_batch(
+    datos: BatchRequest,
+    request: Request,
+    usuario: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ejecuta en orden una lista de sub-requests a rutas existentes, en proceso:
+    el token se valida una sola vez y todas comparten la sesión de la request
+    (ven las escrituras de las anteriores).
+
+    Con atomico=true la sesión se une a una transacción externa: los commit de
+    cada ruta solo hacen flush, el batch se corta en la primera sub-request con
+    código >= 400 y se revierte todo. Admiten modo atómico las rutas async:
+    turnos, recepción, historias y las de un paciente (POST /pacientes/,
+    /pacientes/con-usuario, GET/PUT/DELETE /pacientes/{id}). Las que siguen con
+    sesión sync (listados de pacientes, kinesiólogos, usuarios, salas,
+    servicios, roles, exportar) responden 400 en modo atómico.
+
+    Sin atomico, una sub-request con código >= 500 revierte lo pendiente de las
+    sesiones compartidas (lo ya confirmado por commit queda) y el batch sigue.
+
+    Los middlewares (admisión, idempotencia, compresión) se aplican al batch,
+    no a cada sub-request.
+    """
+    conexion = transaccion = None
+    sesion = db
+    if datos.atomico:
+        conexion = await async_engine.connect()
+        transaccion = await conexion.begin()
+        sesion = AsyncSession(bind=conexion, join_transaction_mode="rollback_only", expire_on_commit=False)
+
+    estado = EstadoBatch(sesion, usuario, atomico=datos.atomico)
+    # Mismos handlers de error que la app, para que cada sub-request responda igual que por HTTP
+    app_interna = ExceptionMiddleware(request.app.router, handlers=request.app.exception_handlers)
+    resultados = []
+    confirmado = True
+
+    token = iniciar_batch(estado)
+    try:
+        for sub in datos.requests:
+            try:
+                sub_resuelta = sub.model_copy(update={
+                    "ruta": resolver_referencias(sub.ruta, resultados),
+                    "body": resolver_referencias(sub.body, resultados),
+                })
+            except ReferenciaInvalida as e:
+                resultado = {"codigo": 400, "body": {"error": str(e)}}
+            else:
+                resultado = await ejecutar_sub_request(request, app_interna, sub_resuelta)
+            resultados.append(resultado)
+
+            if datos.atomico and resultado["codigo"] >= 400:
+                confirmado = False
+                break
+            if resultado["codigo"] >= 500:
+                # Un error de base deja la transacción de la sesión compartida inválida:
+                # sin rollback todas las sub-requests siguientes fallarían con PendingRollbackError
+                await sesion.rollback()
+                if estado.sesion_sync is not None:
+                    await run_in_threadpool(estado.sesion_sync.rollback)
+
+        if transaccion is not None:
+            if confirmado:
+                await sesion.flush()
+                await transaccion.commit()
+            else:
+                await transaccion.rollback()
+                metricas.incrementar("batch.revertidos")
+    finally:
+        terminar_batch(token)
+        if estado.sesion_sync is not None:
+            await run_in_threadpool(estado.sesion_sync.close)
+        if conexion is not None:
+            await sesion.close()
+            # Si no se llegó a confirmar, cerrar la conexión revierte la transacción
+            await conexion.close()
+
+    metricas.observar("batch.sub_requests", len(resultados))
+    return {"resultados": resultados, "atomico": datos.atomico, "confirmado": confirmado}
@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
+
+from app.database import get_async_db
+from app.core.security import get_current_user_async
+from app.core.respuestas import JSONBytesResponse, serializar_lista, serializar_datos
+from app.core.limites_sql import limite_sentencia
+
+# MODELOS
+from app.models.turno import Turno
+from app.models.paciente import Paciente
+from app.models.kinesiologo import Kinesiologo
+from app.models.servicio import Servicio
+from app.models.sala import Sala
+from app.models.user import User
+
+# SCHEMAS
+from app.schemas.turno_schema import TurnoOut
+from app.routers.turnos import OPCIONES_TURNO
+
+# get_current_user_async lee el usuario del primario en una sesión corta propia;
+# los datos de cada sección salen de la sesión de la ruta
+router = APIRouter(
+    prefix="/bootstrap",
+    tags=["Bootstrap"],
+    dependencies=[Depends(limite_sentencia("consulta")), Depends(get_current_user_async)]
+)
+
+
+def _etag(secciones: dict) -> str:
+    """ETag débil combinado: hash de los hashes de cada sección (el body puede ir comprimido)"""
+    combinado = hashlib.blake2b(digest_size=16)
+    for nombre, cuerpo in secciones.items():
+        combinado.update(nombre.encode())
+        combinado.update(hashlib.blake2b(cuerpo, digest_size=16).digest())
+    return f'W/"{combinado.hexdigest()}"'
+
+
+def _coincide_etag(request: Request, etag: str) -> bool:
+    candidatos = [e.strip() for e in request.headers.get("if-none-match", "").split(",")]
+    return "*" in candidatos or etag in candidatos or etag[2:] in candidatos
+
+
+async def _filas(db: AsyncSession, consulta) -> list[dict]:
+    """Filas proyectadas (id + etiqueta) como dicts"""
+    return [dict(fila) for fila in (await db.execute(consulta)).mappings()]
+
+
+# ─────────────────────────────────────────────
+# 🚀 Datos iniciales del ABM de turnos
+# ─────────────────────────────────────────────
+@router.get("/turnos")
+async def bootstrap_turnos(
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Reemplaza los cinco GET que hace el formulario de turnos al abrirse:
+    primera página de /turnos/ (TurnoOut completo, para la tabla) y los
+    listados de pacientes, kinesiólogos, servicios y salas proyectados a
+    id + etiqueta (solo las columnas que usan los selects).
+
+    Returns:
+        JSON con turnos, pacientes, kinesiologos, servicios y salas, con ETag
+        combinado; 304 si coincide con If-None-Match
+    """
+    turnos = (await db.scalars(
+        select(Turno).options(*OPCIONES_TURNO)
+        .order_by(Turno.fecha.asc(), Turno.hora_inicio.asc()).limit(limit)
+    )).all()
+
+    secciones = {
+        "turnos": serializar_lista(turnos, TurnoOut),
+        "pacientes": serializar_datos(await _filas(db,
+            select(Paciente.id, User.nombre).join(Paciente.user).order_by(User.nombre)
+        )),
+        "kinesiologos": serializar_datos(await _filas(db,
+            select(Kinesiologo.id, User.nombre, Kinesiologo.especialidad)
+            .join(Kinesiologo.user).order_by(User.nombre)
+        )),
+        "servicios": serializar_datos(await _filas(db,
+            select(Servicio.id, Servicio.nombre, Servicio.duracion_minutos).order_by(Servicio.nombre)
+        )),
+        "salas": serializar_datos(await _filas(db,
+            select(Sala.id, Sala.nombre, Sala.ubicacion).order_by(Sala.nombre)
+        )),
+    }
+
+    etag = _etag(secciones)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _coincide_etag(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    # Las secciones ya vienen serializadas: el objeto se arma concatenando bytes
+    cuerpo = b"{" + b",".join(b'"%s":%s' % (nombre.encode(), datos) for nombre, datos in secciones.items()) + b"}"
+    return JSONBytesResponse(content=cuerpo, headers=headers)
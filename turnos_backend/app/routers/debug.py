@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+
+from app.core.permissions import role_required
+from app.core.metricas import metricas
+from app.core.pool_conexiones import estado_pools
+from app.core.admision import control
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"],
+    dependencies=[Depends(role_required("admin"))]
+)
+
+
+# 📈 Métricas internas del proceso (solo admin)
+@router.get("/metricas")
+def obtener_metricas():
+    return metricas.snapshot()
+
+
+# 🔌 Estado de los pools de conexiones: ocupación, espera por checkout y rotación
+@router.get("/pool")
+def obtener_pool():
+    return estado_pools()
+
+
+# 🚦 Threadpool y control de admisión: hilos ocupados, cola y p95 de espera
+# (async: el limitador de AnyIO solo se consulta desde el event loop)
+@router.get("/admision")
+async def obtener_admision():
+    return control.estado()
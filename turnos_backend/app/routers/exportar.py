@@ -0,0 +1,247 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from datetime import date, datetime, time
+from typing import Iterator, Optional
+import csv
+import enum
+import io
+import json
+import zlib
+
+from app.database import SessionReportes
+from app.core.permissions import role_required
+from app.core.security import get_current_user
+from app.core.limites_sql import limite_sentencia
+from app.routers.historias_clinicas import verificar_rol_profesional, verificar_acceso_paciente
+
+# Modelos
+from app.models.user import User
+from app.models.turno import Turno
+from app.models.paciente import Paciente
+from app.models.kinesiologo import Kinesiologo
+from app.models.servicio import Servicio
+from app.models.sala import Sala
+from app.models.historia_clinica import HistoriaClinica
+
+
+router = APIRouter(
+    prefix="/exportar",
+    tags=["Exportación"],
+    dependencies=[Depends(limite_sentencia("exportacion"))]
+)
+
+FILAS_POR_LOTE = 1000
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+# ─────────────────────────────────────────────
+# 🧰 Helpers de streaming
+# ─────────────────────────────────────────────
+
+def _valor_plano(valor):
+    """Convierte enums y fechas a texto para CSV / NDJSON"""
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, (date, datetime, time)):
+        return valor.isoformat()
+    return valor
+
+
+def _filas_en_streaming(consulta) -> Iterator[dict]:
+    """
+    Ejecuta la consulta con cursor del lado del servidor (stream_results + yield_per)
+    en una sesión propia, que se cierra apenas termina (o se corta) el stream.
+    Es del pool de reportes pero no sale de get_db_reportes: FastAPI cierra las
+    dependencias con yield antes de que el StreamingResponse consuma el generador.
+    """
+    db = SessionReportes()
+    try:
+        resultado = db.execute(
+            consulta.execution_options(stream_results=True, yield_per=FILAS_POR_LOTE)
+        )
+        for particion in resultado.mappings().partitions():
+            for fila in particion:
+                yield {clave: _valor_plano(valor) for clave, valor in fila.items()}
+    finally:
+        db.close()
+
+
+def _codificar(filas: Iterator[dict], columnas: list, formato: str) -> Iterator[bytes]:
+    """Escribe las filas a medida que llegan, en bloques de FILAS_POR_LOTE"""
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=columnas) if formato == "csv" else None
+    if escritor:
+        escritor.writeheader()
+
+    for i, fila in enumerate(filas, start=1):
+        if escritor:
+            escritor.writerow(fila)
+        else:
+            buffer.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+        if i % FILAS_POR_LOTE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _gzip(bloques: Iterator[bytes]) -> Iterator[bytes]:
+    """Comprime el stream al vuelo (formato .gz)"""
+    compresor = zlib.compressobj(wbits=31)
+    for bloque in bloques:
+        comprimido = compresor.compress(bloque)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+def _respuesta_exportacion(consulta, nombre: str, formato: str, comprimir: bool) -> StreamingResponse:
+    columnas = [columna.key for columna in consulta.selected_columns]
+    cuerpo = _codificar(_filas_en_streaming(consulta), columnas, formato)
+    archivo = f"{nombre}.{formato}"
+    media_type = MEDIA_TYPES[formato]
+
+    if comprimir:
+        cuerpo = _gzip(cuerpo)
+        archivo += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        cuerpo,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{archivo}"'}
+    )
+
+
+def _validar_rango(desde: Optional[date], hasta: Optional[date]):
+    if desde and hasta and desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'.")
+
+
+# ─────────────────────────────────────────────
+# 📄 Exportar historias clínicas
+# ─────────────────────────────────────────────
+@router.get("/historias")
+def exportar_historias(
+    formato: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False, description="Comprimir el archivo (.gz)"),
+    paciente_id: Optional[int] = Query(None),
+    kinesiologo_id: Optional[int] = Query(None),
+    desde: Optional[date] = Query(None),
+    hasta: Optional[date] = Query(None),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exporta historias clínicas en CSV o NDJSON, en streaming.
+    Mismas reglas que /historias-clinicas: el export de un paciente sigue las
+    reglas de acceso de ese paciente; el export general es solo para profesionales.
+    """
+    if paciente_id is not None:
+        verificar_acceso_paciente(current_user, paciente_id)
+    else:
+        verificar_rol_profesional(current_user)
+    _validar_rango(desde, hasta)
+
+    UsuarioPaciente = aliased(User)
+    UsuarioKine = aliased(User)
+
+    consulta = (
+        select(
+            HistoriaClinica.id,
+            HistoriaClinica.fecha_consulta,
+            HistoriaClinica.paciente_id,
+            UsuarioPaciente.nombre.label("paciente_nombre"),
+            Paciente.dni.label("paciente_dni"),
+            Paciente.obra_social,
+            HistoriaClinica.kinesiologo_id,
+            UsuarioKine.nombre.label("kinesiologo_nombre"),
+            HistoriaClinica.turno_id,
+            HistoriaClinica.peso,
+            HistoriaClinica.altura,
+            HistoriaClinica.presion_arterial,
+            HistoriaClinica.frecuencia_cardiaca,
+            HistoriaClinica.temperatura,
+            HistoriaClinica.motivo_consulta,
+            HistoriaClinica.diagnostico,
+            HistoriaClinica.tratamiento,
+            HistoriaClinica.evolucion,
+            HistoriaClinica.observaciones,
+            HistoriaClinica.proxima_consulta,
+        )
+        .join(Paciente, Paciente.id == HistoriaClinica.paciente_id)
+        .outerjoin(UsuarioPaciente, UsuarioPaciente.id == Paciente.user_id)
+        .join(Kinesiologo, Kinesiologo.id == HistoriaClinica.kinesiologo_id)
+        .outerjoin(UsuarioKine, UsuarioKine.id == Kinesiologo.user_id)
+    )
+
+    if paciente_id is not None: consulta = consulta.where(HistoriaClinica.paciente_id == paciente_id)
+    if kinesiologo_id is not None: consulta = consulta.where(HistoriaClinica.kinesiologo_id == kinesiologo_id)
+    if desde: consulta = consulta.where(HistoriaClinica.fecha_consulta >= datetime.combine(desde, time.min))
+    if hasta: consulta = consulta.where(HistoriaClinica.fecha_consulta <= datetime.combine(hasta, time.max))
+
+    consulta = consulta.order_by(HistoriaClinica.id)
+    return _respuesta_exportacion(consulta, "historias_clinicas", formato, gzip)
+
+
+# ─────────────────────────────────────────────
+# 📅 Exportar turnos
+# ─────────────────────────────────────────────
+@router.get("/turnos")
+def exportar_turnos(
+    formato: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False, description="Comprimir el archivo (.gz)"),
+    paciente_id: Optional[int] = Query(None),
+    kinesiologo_id: Optional[int] = Query(None),
+    estado: Optional[str] = Query(None),
+    desde: Optional[date] = Query(None),
+    hasta: Optional[date] = Query(None),
+    current_user: User = Depends(role_required("recepcionista", "kinesiologo"))
+):
+    """
+    Exporta turnos en CSV o NDJSON, en streaming.
+    Accesible por recepcionistas, kinesiólogos y admins.
+    """
+    _validar_rango(desde, hasta)
+
+    UsuarioPaciente = aliased(User)
+    UsuarioKine = aliased(User)
+
+    consulta = (
+        select(
+            Turno.id,
+            Turno.fecha,
+            Turno.hora_inicio,
+            Turno.hora_fin,
+            Turno.estado,
+            Turno.motivo,
+            Turno.observaciones,
+            Turno.paciente_id,
+            UsuarioPaciente.nombre.label("paciente_nombre"),
+            Paciente.dni.label("paciente_dni"),
+            Paciente.obra_social,
+            Turno.kinesiologo_id,
+            UsuarioKine.nombre.label("kinesiologo_nombre"),
+            Servicio.nombre.label("servicio"),
+            Sala.nombre.label("sala"),
+        )
+        .join(Paciente, Paciente.id == Turno.paciente_id)
+        .outerjoin(UsuarioPaciente, UsuarioPaciente.id == Paciente.user_id)
+        .outerjoin(Kinesiologo, Kinesiologo.id == Turno.kinesiologo_id)
+        .outerjoin(UsuarioKine, UsuarioKine.id == Kinesiologo.user_id)
+        .outerjoin(Servicio, Servicio.id == Turno.servicio_id)
+        .outerjoin(Sala, Sala.id == Turno.sala_id)
+    )
+
+    if paciente_id is not None: consulta = consulta.where(Turno.paciente_id == paciente_id)
+    if kinesiologo_id is not None: consulta = consulta.where(Turno.kinesiologo_id == kinesiologo_id)
+    if estado: consulta = consulta.where(Turno.estado == estado)
+    if desde: consulta = consulta.where(Turno.fecha >= desde)
+    if hasta: consulta = consulta.where(Turno.fecha <= hasta)
+
+    consulta = consulta.order_by(Turno.id)
+    return _respuesta_exportacion(consulta, "turnos", formato, gzip)
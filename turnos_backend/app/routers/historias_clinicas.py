@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
 
-from app.database import get_db
-from app.core.security import get_current_user  # 👈 Importamos la seguridad
+from app.database import get_async_db, get_async_db_lectura, get_async_db_reportes
+from app.core.crud import paciente_crud
+from app.core.paginacion import HEADER_SIGUIENTE_CURSOR, codificar_cursor, filtro_antes_de
+from app.core.respuestas import JSONBytesResponse, respuesta_datos, respuesta_lista
+from app.core import series, busqueda
+from app.core.security import get_current_user_async  # 👈 Importamos la seguridad
+from app.core.limites_sql import limite_sentencia
+from app.core.campos import parsear_campos
 from app.models.user import User
 from app.models.historia_clinica import HistoriaClinica
 from app.models.paciente import Paciente
@@ -14,7 +22,28 @@ from app.schemas.historia_clinica_schema import (
     HistoriaClinicaOut
 )
 
-router = APIRouter(prefix="/historias-clinicas", tags=["Historias Clínicas"])
+router = APIRouter(
+    prefix="/historias-clinicas",
+    tags=["Historias Clínicas"],
+    dependencies=[Depends(limite_sentencia("consulta"))]
+)
+
+# Columnas proyectables con ?fields=: cualquier columna de la tabla (no solo las de
+# HistoriaClinicaOut). "resumen" es un atajo para todas salvo los textos largos
+CAMPOS_HISTORIA = [columna.key for columna in HistoriaClinica.__table__.columns]
+CAMPOS_TEXTO_LARGO = {"motivo_consulta", "diagnostico", "tratamiento", "evolucion", "observaciones"}
+ATAJOS_HISTORIA = {"resumen": [campo for campo in CAMPOS_HISTORIA if campo not in CAMPOS_TEXTO_LARGO]}
+
+
+def parsear_campos_historia(fields: Optional[str], obligatorios=("id", "fecha_consulta")):
+    """
+    Proyección de ?fields= para historias; id y fecha_consulta siempre se incluyen (son el cursor)
+
+    Raises:
+        HTTPException 400: Si se pide un campo inexistente
+    """
+    return parsear_campos(fields, None, HistoriaClinica, obligatorios=obligatorios, atajos=ATAJOS_HISTORIA)
+
 
 # 🛡️ HELPER DE PERMISOS
 def verificar_rol_profesional(current_user: User):
@@ -26,42 +55,72 @@ def verificar_rol_profesional(current_user: User):
             detail="No tienes permisos para acceder a historias clínicas."
         )
 
+def verificar_acceso_paciente(current_user: User, paciente_id: int):
+    """
+    Lanza error si el usuario no puede ver datos clínicos del paciente:
+    pacientes solo los propios, recepcionistas nunca (salvo rol profesional)
+    """
+    roles = [r.name for r in current_user.roles]
+    if "paciente" in roles and "kinesiologo" not in roles and "admin" not in roles:
+        if not current_user.paciente or current_user.paciente.id != paciente_id:
+            raise HTTPException(status_code=403, detail="Acceso denegado")
+
+    if "recepcionista" in roles and "kinesiologo" not in roles and "admin" not in roles:
+        raise HTTPException(status_code=403, detail="Acceso denegado")
+
 # ==========================================
 # LISTAR TODAS (Solo Admin y Kinesiólogos)
 # ==========================================
-@router.get("/", response_model=List[HistoriaClinicaOut])
-def listar_historias(
+@router.get("/", response_model=List[HistoriaClinicaOut], response_class=JSONBytesResponse)
+async def listar_historias(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user) # 🔒 Auth requerida
+    fields: Optional[str] = Query(
+        None, description="Columnas separadas por coma, o 'resumen' para omitir los textos largos"
+    ),
+    db: AsyncSession = Depends(get_async_db_lectura),
+    current_user: User = Depends(get_current_user_async) # 🔒 Auth requerida
 ):
     # 1. Validar permiso (Recepcionistas y Pacientes NO pueden ver el listado global)
     verificar_rol_profesional(current_user)
 
-    historias = (
-        db.query(HistoriaClinica)
-        .options(
-            joinedload(HistoriaClinica.paciente).joinedload(Paciente.user),
-            joinedload(HistoriaClinica.kinesiologo).joinedload(Kinesiologo.user)
-        )
+    # HistoriaClinicaOut no embebe paciente ni kinesiólogo: no hace falta cargarlos
+    proyeccion = parsear_campos_historia(fields)
+    query = select(HistoriaClinica)
+    if proyeccion:
+        query = query.options(*proyeccion.opciones())
+    historias = (await db.scalars(
+        query
         .order_by(HistoriaClinica.fecha_consulta.desc())
         .offset(skip)
         .limit(limit)
-        .all()
-    )
-    return historias
+    )).all()
+    if proyeccion:
+        return respuesta_datos(proyeccion.a_dicts(historias), request)
+    return respuesta_lista(historias, HistoriaClinicaOut, request)
 
 
 # ==========================================
 # OBTENER HISTORIAS DE UN PACIENTE
 # ==========================================
-@router.get("/paciente/{paciente_id}", response_model=List[HistoriaClinicaOut])
-def obtener_historias_paciente(
+@router.get("/paciente/{paciente_id}", response_model=List[HistoriaClinicaOut], response_class=JSONBytesResponse)
+async def obtener_historias_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user) # 🔒 Auth requerida
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en el header X-Next-Cursor"),
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = Query(
+        None, description="Columnas separadas por coma, o 'resumen' para omitir los textos largos"
+    ),
+    db: AsyncSession = Depends(get_async_db_lectura),
+    current_user: User = Depends(get_current_user_async) # 🔒 Auth requerida
 ):
+    """
+    Timeline de un paciente, de la consulta más reciente a la más antigua.
+    Paginado por cursor sobre (fecha_consulta, id): si hay más resultados,
+    el cursor de la página siguiente viaja en el header X-Next-Cursor.
+    """
     roles = [r.name for r in current_user.roles]
 
     # 1. Si es Paciente, SOLO puede ver las suyas
@@ -78,41 +137,99 @@ def obtener_historias_paciente(
          raise HTTPException(status_code=403, detail="Confidencialidad médica: Acceso denegado.")
 
     # Verificar que el paciente existe
-    paciente = db.query(Paciente).filter(Paciente.id == paciente_id).first()
-    if not paciente:
+    # CRUDBase es sync: run_sync lo ejecuta sobre la misma conexión async, sin threadpool
+    if not await db.run_sync(paciente_crud.exists, paciente_id):
         raise HTTPException(status_code=404, detail="Paciente no encontrado")
     
+    proyeccion = parsear_campos_historia(fields)
+    query = select(HistoriaClinica).where(HistoriaClinica.paciente_id == paciente_id)
+    if proyeccion:
+        query = query.options(*proyeccion.opciones())
+
+    condicion_cursor = filtro_antes_de(HistoriaClinica.fecha_consulta, HistoriaClinica.id, cursor)
+    if condicion_cursor is not None:
+        query = query.where(condicion_cursor)
+
+    # Se pide una fila de más para saber si existe una página siguiente
+    query = query.order_by(HistoriaClinica.fecha_consulta.desc(), HistoriaClinica.id.desc()).limit(limit + 1)
+    historias = (await db.scalars(query)).all()
+    hay_mas = len(historias) > limit
+    historias = historias[:limit]
+
+    if proyeccion:
+        respuesta = respuesta_datos(proyeccion.a_dicts(historias), request)
+    else:
+        respuesta = respuesta_lista(historias, HistoriaClinicaOut, request)
+
+    if hay_mas:
+        ultima = historias[-1]
+        respuesta.headers[HEADER_SIGUIENTE_CURSOR] = codificar_cursor(ultima.fecha_consulta, ultima.id)
+    return respuesta
+
+
+# ==========================================
+# BÚSQUEDA DE TEXTO (por relevancia)
+# ==========================================
+@router.get("/buscar", dependencies=[Depends(limite_sentencia("busqueda"))])
+async def buscar_historias(
+    request: Request,
+    q: str = Query(..., min_length=2, description="Texto a buscar (ej: lumbalgia, LCA)"),
+    paciente_id: Optional[int] = Query(None),
+    kinesiologo_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db_reportes),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Busca en motivo, diagnóstico, tratamiento, evolución y observaciones.
+    Profesionales buscan en todas las historias; un paciente solo en las suyas.
+    """
+    roles = [r.name for r in current_user.roles]
+    es_profesional = "admin" in roles or "kinesiologo" in roles
+
+    if not es_profesional:
+        if "paciente" not in roles or not current_user.paciente:
+            raise HTTPException(status_code=403, detail="Acceso denegado")
+        paciente_id = current_user.paciente.id
+
+    encontrados = await db.run_sync(
+        busqueda.buscar_historias, q, paciente_id=paciente_id, kinesiologo_id=kinesiologo_id, limit=limit
+    )
+    relevancias = dict(encontrados)
     historias = (
-        db.query(HistoriaClinica)
-        .options(
-            joinedload(HistoriaClinica.kinesiologo).joinedload(Kinesiologo.user)
-        )
-        .filter(HistoriaClinica.paciente_id == paciente_id)
-        .order_by(HistoriaClinica.fecha_consulta.desc())
-        .all()
+        (await db.scalars(select(HistoriaClinica).where(HistoriaClinica.id.in_(relevancias)))).all()
+        if relevancias else []
     )
-    
-    return historias
+    por_id = {h.id: h for h in historias}
+
+    resultados = [
+        {**HistoriaClinicaOut.model_validate(por_id[id]).model_dump(), "relevancia": relevancia}
+        for id, relevancia in encontrados if id in por_id
+    ]
+    return respuesta_datos({"query": q, "resultados": resultados, "total": len(resultados)}, request)
 
 
 # ==========================================
 # OBTENER UNA HISTORIA POR ID
 # ==========================================
 @router.get("/{historia_id}", response_model=HistoriaClinicaOut)
-def obtener_historia(
+async def obtener_historia(
     historia_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Columnas separadas por coma, o 'resumen' para omitir los textos largos"
+    ),
+    db: AsyncSession = Depends(get_async_db_lectura),
+    current_user: User = Depends(get_current_user_async)
 ):
-    historia = (
-        db.query(HistoriaClinica)
-        .options(
-            joinedload(HistoriaClinica.paciente).joinedload(Paciente.user),
-            joinedload(HistoriaClinica.kinesiologo).joinedload(Kinesiologo.user)
+    # paciente_id siempre se lee: lo necesita la validación de acceso
+    proyeccion = parsear_campos_historia(fields, obligatorios=("id", "paciente_id"))
+    if proyeccion:
+        historia = await db.scalar(
+            select(HistoriaClinica).options(*proyeccion.opciones()).where(HistoriaClinica.id == historia_id)
         )
-        .filter(HistoriaClinica.id == historia_id)
-        .first()
-    )
+    else:
+        historia = await db.get(HistoriaClinica, historia_id)
     
     if not historia:
         raise HTTPException(status_code=404, detail="Historia clínica no encontrada")
@@ -129,6 +246,8 @@ def obtener_historia(
     if "recepcionista" in roles and "kinesiologo" not in roles and "admin" not in roles:
         raise HTTPException(status_code=403, detail="Acceso denegado.")
     
+    if proyeccion:
+        return respuesta_datos(proyeccion.a_dict(historia), request)
     return historia
 
 
@@ -136,111 +255,185 @@ def obtener_historia(
 # CREAR (Solo Kinesiólogos y Admin)
 # ==========================================
 @router.post("/", response_model=HistoriaClinicaOut, status_code=201)
-def crear_historia(
+async def crear_historia(
     historia_data: HistoriaClinicaCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     # 🔒 Solo profesionales pueden escribir
     verificar_rol_profesional(current_user)
 
     # Validaciones de existencia
-    paciente = db.query(Paciente).filter(Paciente.id == historia_data.paciente_id).first()
+    paciente = await db.scalar(select(Paciente.id).where(Paciente.id == historia_data.paciente_id))
     if not paciente: raise HTTPException(status_code=404, detail="Paciente no encontrado")
     
-    kinesiologo = db.query(Kinesiologo).filter(Kinesiologo.id == historia_data.kinesiologo_id).first()
+    kinesiologo = await db.scalar(select(Kinesiologo.id).where(Kinesiologo.id == historia_data.kinesiologo_id))
     if not kinesiologo: raise HTTPException(status_code=404, detail="Kinesiólogo no encontrado")
     
     nueva_historia = HistoriaClinica(**historia_data.model_dump())
     db.add(nueva_historia)
-    db.commit()
-    db.refresh(nueva_historia)
+    await db.flush()
+    await db.run_sync(busqueda.indexar_historia, nueva_historia)
+    await db.commit()
     
-    return db.query(HistoriaClinica).options(
-        joinedload(HistoriaClinica.paciente).joinedload(Paciente.user),
-        joinedload(HistoriaClinica.kinesiologo).joinedload(Kinesiologo.user)
-    ).filter(HistoriaClinica.id == nueva_historia.id).first()
+    return nueva_historia
 
 
 # ==========================================
 # ACTUALIZAR (Solo Kinesiólogos y Admin)
 # ==========================================
 @router.put("/{historia_id}", response_model=HistoriaClinicaOut)
-def actualizar_historia(
+async def actualizar_historia(
     historia_id: int,
     historia_data: HistoriaClinicaUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     # 🔒 Seguridad
     verificar_rol_profesional(current_user)
 
-    historia = db.query(HistoriaClinica).filter(HistoriaClinica.id == historia_id).first()
+    historia = await db.get(HistoriaClinica, historia_id)
     if not historia: raise HTTPException(status_code=404, detail="Historia no encontrada")
     
-    for field, value in historia_data.model_dump(exclude_unset=True).items():
+    cambios = historia_data.model_dump(exclude_unset=True)
+    for field, value in cambios.items():
         setattr(historia, field, value)
     
-    db.commit()
-    db.refresh(historia)
+    # Reindexar solo si cambió algún campo de texto
+    if any(campo in cambios for campo in busqueda.CAMPOS_INDEXADOS):
+        await db.run_sync(busqueda.indexar_historia, historia)
     
-    return db.query(HistoriaClinica).options(
-        joinedload(HistoriaClinica.paciente).joinedload(Paciente.user),
-        joinedload(HistoriaClinica.kinesiologo).joinedload(Kinesiologo.user)
-    ).filter(HistoriaClinica.id == historia_id).first()
+    await db.commit()
+    # updated_at lo calcula el onupdate durante el flush
+    await db.refresh(historia)
+    
+    return historia
 
 
 # ==========================================
 # ELIMINAR (Solo Admin)
 # ==========================================
 @router.delete("/{historia_id}", status_code=204)
-def eliminar_historia(
+async def eliminar_historia(
     historia_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     # 🔒 ULTRA Seguridad: Solo Admin puede borrar historias clínicas (Auditoría)
     roles = [r.name for r in current_user.roles]
     if "admin" not in roles:
         raise HTTPException(status_code=403, detail="Solo un administrador puede eliminar historias clínicas.")
 
-    historia = db.query(HistoriaClinica).filter(HistoriaClinica.id == historia_id).first()
+    historia = await db.get(HistoriaClinica, historia_id)
     if not historia: raise HTTPException(status_code=404, detail="Historia no encontrada")
     
-    db.delete(historia)
-    db.commit()
+    await db.run_sync(busqueda.eliminar_indice, historia_id)
+    await db.delete(historia)
+    await db.commit()
     return None
 
 # ==========================================
 # ESTADÍSTICAS (Solo Profesionales)
 # ==========================================
 @router.get("/paciente/{paciente_id}/estadisticas")
-def obtener_estadisticas_paciente(
+async def obtener_estadisticas_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_reportes),
+    current_user: User = Depends(get_current_user_async)
 ):
-    # Permitimos al paciente ver sus propias estadísticas
-    roles = [r.name for r in current_user.roles]
-    if "paciente" in roles and "kinesiologo" not in roles and "admin" not in roles:
-        if not current_user.paciente or current_user.paciente.id != paciente_id:
-            raise HTTPException(status_code=403, detail="Acceso denegado")
-            
-    # Recepcionistas fuera
-    if "recepcionista" in roles and "kinesiologo" not in roles and "admin" not in roles:
-         raise HTTPException(status_code=403, detail="Acceso denegado")
+    # El paciente ve sus propias estadísticas; recepcionistas fuera
+    verificar_acceso_paciente(current_user, paciente_id)
+    if not await db.run_sync(paciente_crud.exists, paciente_id):
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
 
-    historias = db.query(HistoriaClinica)\
-        .filter(HistoriaClinica.paciente_id == paciente_id)\
-        .order_by(HistoriaClinica.fecha_consulta.desc()).all()
+    # Una sola consulta agregada: nunca se cargan los textos de las historias
+    total, primera, ultima = (await db.execute(
+        select(
+            func.count(HistoriaClinica.id),
+            func.min(HistoriaClinica.fecha_consulta),
+            func.max(HistoriaClinica.fecha_consulta)
+        ).where(HistoriaClinica.paciente_id == paciente_id)
+    )).one()
     
-    if not historias:
+    if not total:
         return {"total_consultas": 0, "ultima_consulta": None}
     
+    # Última consulta por índice (paciente_id, fecha_consulta, id), solo columnas necesarias
+    mas_reciente = (await db.execute(
+        select(HistoriaClinica.peso, HistoriaClinica.presion_arterial)
+        .where(HistoriaClinica.paciente_id == paciente_id)
+        .order_by(HistoriaClinica.fecha_consulta.desc(), HistoriaClinica.id.desc())
+        .limit(1)
+    )).first()
+    
     return {
-        "total_consultas": len(historias),
-        "ultima_consulta": historias[0].fecha_consulta,
-        "primera_consulta": historias[-1].fecha_consulta,
-        "peso_actual": historias[0].peso,
-        "presion_actual": historias[0].presion_arterial
-    }
\ No newline at end of file
+        "total_consultas": total,
+        "ultima_consulta": ultima,
+        "primera_consulta": primera,
+        "peso_actual": mas_reciente.peso,
+        "presion_actual": mas_reciente.presion_arterial
+    }
+
+
+# ==========================================
+# SIGNOS VITALES (serie temporal columnar)
+# ==========================================
+@router.get("/paciente/{paciente_id}/signos-vitales")
+async def obtener_signos_vitales(
+    paciente_id: int,
+    request: Request,
+    puntos: Optional[int] = Query(None, ge=3, le=5000, description="Reducir la serie a N puntos"),
+    metodo: str = Query("lttb", pattern="^(lttb|promedio)$"),
+    referencia: str = Query(
+        "peso", pattern="^(peso|altura|sistolica|diastolica|frecuencia_cardiaca|temperatura)$",
+        description="Métrica que guía la selección de puntos en LTTB"
+    ),
+    desde: Optional[datetime] = Query(None),
+    hasta: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_async_db_reportes),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Devuelve los signos vitales del paciente como arrays paralelos:
+    timestamps (ms epoch UTC) y un array por métrica, con la presión arterial
+    separada en sistólica y diastólica. Con `puntos` se reduce la serie en el
+    servidor (LTTB o promedio por buckets) para graficar sin traer historias completas;
+    "metodo" informa el que se aplicó.
+
+    Raises:
+        HTTPException 403: Sin acceso a los datos clínicos del paciente
+        HTTPException 404: Si el paciente no existe
+    """
+    verificar_acceso_paciente(current_user, paciente_id)
+    if not await db.run_sync(paciente_crud.exists, paciente_id):
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
+
+    query = select(
+        HistoriaClinica.fecha_consulta,
+        HistoriaClinica.peso,
+        HistoriaClinica.altura,
+        HistoriaClinica.presion_arterial,
+        HistoriaClinica.frecuencia_cardiaca,
+        HistoriaClinica.temperatura
+    ).where(HistoriaClinica.paciente_id == paciente_id)
+
+    if desde: query = query.where(HistoriaClinica.fecha_consulta >= desde)
+    if hasta: query = query.where(HistoriaClinica.fecha_consulta <= hasta)
+
+    filas = (await db.execute(
+        query.order_by(HistoriaClinica.fecha_consulta.asc(), HistoriaClinica.id.asc())
+    )).all()
+
+    columnas = series.construir_columnas(filas)
+    total = len(filas)
+    metodo_aplicado = None
+    if puntos and puntos < total:
+        # LTTB cae a promedio si la métrica de referencia tiene menos de `puntos` valores
+        columnas, metodo_aplicado = series.reducir_serie(columnas, puntos, metodo, referencia)
+
+    return respuesta_datos({
+        "paciente_id": paciente_id,
+        "total_registros": total,
+        "metodo": metodo_aplicado,
+        **series.a_listas(columnas)
+    }, request)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.database import get_db
+from app.database import get_db, get_db_lectura, get_db_reportes
 from app.core.crud import kinesiologo_crud
+from app.core.perfiles import obtener_usuarios_sin_perfil
+from app.core.respuestas import respuesta_datos
+from app.core.campos import DESCRIPCION_FIELDS, parsear_campos
 from app.schemas.kinesiologo_schema import KinesiologoCreate, KinesiologoUpdate, KinesiologoOut
 from app.core.validaciones import validar_email_formato, MensajesError, capitalizar_texto
 from app.models.user import User
@@ -12,10 +15,12 @@ from app.models.turno import Turno
 from app.models.role import Role
 from app.models.user_role import UserRole
 from app.core.security import get_password_hash
+from app.core.limites_sql import limite_sentencia
 
 router = APIRouter(
     prefix="/kinesiologos",
-    tags=["Kinesiologos"]
+    tags=["Kinesiologos"],
+    dependencies=[Depends(limite_sentencia("consulta"))]
 )
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -110,43 +115,50 @@ def verificar_sin_turnos_activos(db: Session, kinesiologo_id: int):
 # ═══════════════════════════════════════════════════════════════════════════
 
 @router.get("/usuarios-disponibles", response_model=list[dict])
-def obtener_usuarios_disponibles(db: Session = Depends(get_db)):
+def obtener_usuarios_disponibles(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Sin limit se devuelven todos"),
+    nombre: Optional[str] = Query(None, description="Filtrar por nombre"),
+    db: Session = Depends(get_db_reportes)
+):
     """
     Obtiene lista de usuarios con rol kinesiólogo que no tienen perfil creado
     
+    Args:
+        skip: Número de registros a saltar
+        limit: Número máximo de registros a retornar (sin limit, todos)
+        nombre: Filtro opcional por nombre
+    
     Returns:
-        Lista de usuarios disponibles para crear perfil
+        Lista de usuarios disponibles para crear perfil (id, nombre, email)
     """
-    usuarios_con_rol = (
-        db.query(User).join(User.roles)
-        .filter(Role.name == "kinesiologo")
-        .options(joinedload(User.roles)).all()
+    return obtener_usuarios_sin_perfil(
+        db, "kinesiologo", Kinesiologo, skip=skip, limit=limit, nombre=nombre
     )
-    
-    usuarios_disponibles = []
-    for user in usuarios_con_rol:
-        tiene_perfil = db.query(Kinesiologo).filter(Kinesiologo.user_id == user.id).first()
-        if not tiene_perfil:
-            usuarios_disponibles.append({
-                "id": user.id, 
-                "nombre": user.nombre, 
-                "email": user.email
-            })
-    
-    return usuarios_disponibles
 
 @router.get("/", response_model=list[KinesiologoOut])
-def listar_kinesiologos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def listar_kinesiologos(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: Session = Depends(get_db_lectura)
+):
     """
     Lista todos los kinesiólogos con paginación
     
     Args:
         skip: Número de registros a saltar
         limit: Número máximo de registros a retornar
+        fields: Campos a devolver (ej: id,matricula,user.nombre); por defecto KinesiologoOut completo
         
     Returns:
         Lista de kinesiólogos
     """
+    proyeccion = parsear_campos(fields, KinesiologoOut, Kinesiologo)
+    if proyeccion:
+        kinesiologos = kinesiologo_crud.get_multi(db, skip=skip, limit=limit, opciones=proyeccion.opciones())
+        return respuesta_datos(proyeccion.a_dicts(kinesiologos), request)
     return kinesiologo_crud.get_multi(db, skip=skip, limit=limit)
 
 @router.post("/", response_model=KinesiologoOut, status_code=201)
@@ -272,19 +284,30 @@ def crear_kinesiologo_con_usuario(kinesiologo_data: dict, db: Session = Depends(
         )
 
 @router.get("/{kinesiologo_id}", response_model=KinesiologoOut)
-def obtener_kinesiologo(kinesiologo_id: int, db: Session = Depends(get_db)):
+def obtener_kinesiologo(
+    kinesiologo_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: Session = Depends(get_db_lectura)
+):
     """
     Obtiene un kinesiólogo por ID
     
     Args:
         kinesiologo_id: ID del kinesiólogo
+        fields: Campos a devolver; por defecto KinesiologoOut completo
         
     Returns:
         Datos del kinesiólogo
         
     Raises:
+        HTTPException 400: Si fields pide un campo inexistente
         HTTPException 404: Si el kinesiólogo no existe
     """
+    proyeccion = parsear_campos(fields, KinesiologoOut, Kinesiologo)
+    if proyeccion:
+        kinesiologo = kinesiologo_crud.get_or_404(db, kinesiologo_id, proyeccion.opciones())
+        return respuesta_datos(proyeccion.a_dict(kinesiologo), request)
     return kinesiologo_crud.get_or_404(db, kinesiologo_id)
 
 @router.put("/{kinesiologo_id}", response_model=KinesiologoOut)
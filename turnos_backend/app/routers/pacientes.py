@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from app.database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_async_db, get_async_db_lectura, get_db_lectura, get_db_reportes
 from app.core.crud import paciente_crud
+from app.core.respuestas import JSONBytesResponse, respuesta_datos, respuesta_lista
+from app.core.campos import DESCRIPCION_FIELDS, parsear_campos
+from app.core.perfiles import obtener_usuarios_sin_perfil
+from app.core.permissions import role_required
+from app.core.trabajos import trabajos
+from app.core import importacion
 from app.schemas.paciente_schema import PacienteCreate, PacienteUpdate, PacienteOut
 from app.core.validaciones import validar_email_formato, MensajesError, capitalizar_texto
+from app.core.security import get_password_hash
+from app.core.limites_sql import limite_sentencia
 from app.models.user import User
 from app.models.paciente import Paciente
 from app.models.role import Role
 
 router = APIRouter(
     prefix="/pacientes",
-    tags=["Pacientes"]
+    tags=["Pacientes"],
+    dependencies=[Depends(limite_sentencia("consulta"))]
 )
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -86,60 +98,101 @@ def verificar_perfil_no_existe(db: Session, user_id: int):
 # ═══════════════════════════════════════════════════════════════════════════
 
 @router.get("/usuarios-disponibles", response_model=list[dict])
-def obtener_usuarios_disponibles(db: Session = Depends(get_db)):
+def obtener_usuarios_disponibles(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Sin limit se devuelven todos"),
+    nombre: Optional[str] = Query(None, description="Filtrar por nombre"),
+    db: Session = Depends(get_db_reportes)
+):
     """
     Obtiene lista de usuarios con rol paciente que no tienen perfil creado
     
+    Args:
+        skip: Número de registros a saltar
+        limit: Número máximo de registros a retornar (sin limit, todos)
+        nombre: Filtro opcional por nombre
+    
     Returns:
-        Lista de usuarios disponibles para crear perfil
+        Lista de usuarios disponibles para crear perfil (id, nombre, email)
     """
-    usuarios_con_rol = (
-        db.query(User).join(User.roles)
-        .filter(Role.name == "paciente")
-        .options(joinedload(User.roles)).all()
+    return obtener_usuarios_sin_perfil(
+        db, "paciente", Paciente, skip=skip, limit=limit, nombre=nombre
     )
+
+@router.post("/importar", status_code=202, dependencies=[Depends(role_required("admin"))])
+async def importar_pacientes(background_tasks: BackgroundTasks, archivo: UploadFile = File(...)):
+    """
+    Importa pacientes (usuario + perfil) desde un archivo CSV o XLSX
+    
+    Columnas: nombre, email (obligatorias), password, dni, telefono,
+    obra_social, historial_medico, direccion. Si falta password se genera una
+    aleatoria que no se informa (el reporte lista esas filas en sin_password).
+    La importación corre en segundo plano; el progreso y el reporte de errores
+    por fila se consultan en GET /pacientes/importar/{trabajo_id}
     
-    usuarios_disponibles = []
-    for user in usuarios_con_rol:
-        tiene_perfil = db.query(Paciente).filter(Paciente.user_id == user.id).first()
-        if not tiene_perfil:
-            usuarios_disponibles.append({
-                "id": user.id, 
-                "nombre": user.nombre, 
-                "email": user.email
-            })
-    
-    return usuarios_disponibles
+    Returns:
+        Id del trabajo y cantidad de filas leídas
+        
+    Raises:
+        HTTPException 400: Si el archivo no es CSV/XLSX o faltan columnas obligatorias
+    """
+    # El parseo (CSV / XLSX completos) corre en el threadpool, no en el event loop
+    contenido = await archivo.read()
+    registros = await run_in_threadpool(importacion.leer_archivo, archivo.filename, contenido)
+    if not registros:
+        raise HTTPException(status_code=400, detail="El archivo no contiene filas para importar")
+    
+    trabajo_id = trabajos.crear("importacion_pacientes", total=len(registros))
+    background_tasks.add_task(importacion.ejecutar_importacion, trabajo_id, registros)
+    
+    return {"trabajo_id": trabajo_id, "filas": len(registros)}
 
-@router.get("/", response_model=list[PacienteOut])
-def listar_pacientes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/importar/{trabajo_id}", dependencies=[Depends(role_required("admin"))])
+def estado_importacion(trabajo_id: str):
+    """
+    Consulta el progreso y el resultado de una importación
+    
+    Raises:
+        HTTPException 404: Si el trabajo no existe
+    """
+    trabajo = trabajos.obtener(trabajo_id)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo de importación no encontrado")
+    return trabajo
+
+@router.get("/", response_model=list[PacienteOut], response_class=JSONBytesResponse)
+def listar_pacientes(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: Session = Depends(get_db_lectura)
+):
     """
     Lista todos los pacientes con paginación
     
     Args:
         skip: Número de registros a saltar
         limit: Número máximo de registros a retornar
+        fields: Campos a devolver (ej: id,dni,user.nombre); por defecto PacienteOut completo
         
     Returns:
         Lista de pacientes
     """
-    return paciente_crud.get_multi(db, skip=skip, limit=limit)
+    proyeccion = parsear_campos(fields, PacienteOut, Paciente)
+    if proyeccion:
+        pacientes = paciente_crud.get_multi(db, skip=skip, limit=limit, opciones=proyeccion.opciones())
+        return respuesta_datos(proyeccion.a_dicts(pacientes), request)
+    return respuesta_lista(paciente_crud.get_multi(db, skip=skip, limit=limit), PacienteOut, request)
 
-@router.post("/", response_model=PacienteOut, status_code=201)
-def crear_paciente(paciente: PacienteCreate, db: Session = Depends(get_db)):
-    """
-    Crea un perfil de paciente para un usuario existente
-    
-    Args:
-        paciente: Datos del perfil de paciente
-        
-    Returns:
-        Paciente creado
-        
-    Raises:
-        HTTPException 404: Si el usuario no existe
-        HTTPException 400: Si el usuario ya tiene perfil o el DNI está duplicado
-    """
+# ═══════════════════════════════════════════════════════════════════════════
+# OPERACIONES POR PACIENTE
+# Las rutas son async y ejecutan estas funciones sync con run_sync: usan la
+# misma conexión que la AsyncSession, así que también funcionan dentro de un
+# POST /batch atómico (una Session sync aparte no entraría en su transacción)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _crear_paciente(db: Session, paciente: PacienteCreate) -> PacienteOut:
     # Validar que el usuario exista
     verificar_usuario_existe(db, paciente.user_id)
     
@@ -150,55 +203,35 @@ def crear_paciente(paciente: PacienteCreate, db: Session = Depends(get_db)):
     if paciente.dni:
         verificar_dni_existente(db, paciente.dni)
     
-    return paciente_crud.create(db, paciente)
+    return PacienteOut.model_validate(paciente_crud.create(db, paciente))
 
-@router.post("/con-usuario", response_model=PacienteOut, status_code=201)
-def crear_paciente_con_usuario(paciente_data: dict, db: Session = Depends(get_db)):
+@router.post("/", response_model=PacienteOut, status_code=201)
+async def crear_paciente(paciente: PacienteCreate, db: AsyncSession = Depends(get_async_db)):
     """
-    Crea un paciente completo (usuario + perfil) en una sola operación
+    Crea un perfil de paciente para un usuario existente
     
     Args:
-        paciente_data: Dict con datos del usuario y perfil
-            - nombre: str (requerido)
-            - email: str (requerido)
-            - password: str (requerido)
-            - dni: str (opcional)
-            - telefono: str (opcional)
-            - obra_social: str (opcional)
-            - historial_medico: str (opcional)
-            - direccion: str (opcional)
-            
+        paciente: Datos del perfil de paciente
+        
     Returns:
-        Paciente creado con usuario asociado
+        Paciente creado
         
     Raises:
-        HTTPException 400: Si hay errores de validación o datos duplicados
-        HTTPException 500: Si no se encuentra el rol paciente
+        HTTPException 404: Si el usuario no existe
+        HTTPException 400: Si el usuario ya tiene perfil o el DNI está duplicado
     """
-    from app.core.security import get_password_hash
+    return await db.run_sync(_crear_paciente, paciente)
+
+def _crear_paciente_con_usuario(
+    db: Session,
+    paciente_data: dict,
+    email_limpio: str,
+    nombre_limpio: str,
+    dni_limpio: Optional[str],
+    password_hash: str
+) -> PacienteOut:
     from app.models.user_role import UserRole
     
-    # Validar y limpiar email
-    if "email" not in paciente_data or not paciente_data["email"]:
-        raise HTTPException(status_code=400, detail="El email es obligatorio")
-    
-    email_limpio = validar_email_formato(paciente_data["email"])
-    
-    # Validar y limpiar nombre
-    if "nombre" not in paciente_data or not paciente_data["nombre"].strip():
-        raise HTTPException(status_code=400, detail="El nombre es obligatorio")
-    
-    nombre_limpio = capitalizar_texto(paciente_data["nombre"])
-    
-    # Validar password
-    if "password" not in paciente_data or not paciente_data["password"].strip():
-        raise HTTPException(status_code=400, detail="La contraseña es obligatoria")
-    
-    # Limpiar DNI si existe
-    dni_limpio = None
-    if paciente_data.get("dni"):
-        dni_limpio = paciente_data["dni"].replace(".", "").replace(" ", "").strip()
-    
     # Validar unicidad de email
     if db.query(User).filter(User.email == email_limpio).first():
         raise HTTPException(
@@ -214,7 +247,7 @@ def crear_paciente_con_usuario(paciente_data: dict, db: Session = Depends(get_db
     nuevo_usuario = User(
         nombre=nombre_limpio,
         email=email_limpio,
-        password_hash=get_password_hash(paciente_data["password"]),
+        password_hash=password_hash,
         activo=True
     )
     db.add(nuevo_usuario)
@@ -245,7 +278,7 @@ def crear_paciente_con_usuario(paciente_data: dict, db: Session = Depends(get_db
     try:
         db.commit()
         db.refresh(nuevo_paciente)
-        return nuevo_paciente
+        return PacienteOut.model_validate(nuevo_paciente)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -253,27 +286,107 @@ def crear_paciente_con_usuario(paciente_data: dict, db: Session = Depends(get_db
             detail=f"Error al crear el paciente: {str(e)}"
         )
 
+@router.post("/con-usuario", response_model=PacienteOut, status_code=201)
+async def crear_paciente_con_usuario(paciente_data: dict, db: AsyncSession = Depends(get_async_db)):
+    """
+    Crea un paciente completo (usuario + perfil) en una sola operación
+    
+    Args:
+        paciente_data: Dict con datos del usuario y perfil
+            - nombre: str (requerido)
+            - email: str (requerido)
+            - password: str (requerido)
+            - dni: str (opcional)
+            - telefono: str (opcional)
+            - obra_social: str (opcional)
+            - historial_medico: str (opcional)
+            - direccion: str (opcional)
+            
+    Returns:
+        Paciente creado con usuario asociado
+        
+    Raises:
+        HTTPException 400: Si hay errores de validación o datos duplicados
+        HTTPException 500: Si no se encuentra el rol paciente
+    """
+    # Validar y limpiar email
+    if "email" not in paciente_data or not paciente_data["email"]:
+        raise HTTPException(status_code=400, detail="El email es obligatorio")
+    
+    email_limpio = validar_email_formato(paciente_data["email"])
+    
+    # Validar y limpiar nombre
+    if "nombre" not in paciente_data or not paciente_data["nombre"].strip():
+        raise HTTPException(status_code=400, detail="El nombre es obligatorio")
+    
+    nombre_limpio = capitalizar_texto(paciente_data["nombre"])
+    
+    # Validar password
+    if "password" not in paciente_data or not paciente_data["password"].strip():
+        raise HTTPException(status_code=400, detail="La contraseña es obligatoria")
+    
+    # Limpiar DNI si existe
+    dni_limpio = None
+    if paciente_data.get("dni"):
+        dni_limpio = paciente_data["dni"].replace(".", "").replace(" ", "").strip()
+    
+    # bcrypt es CPU: va al threadpool para no frenar el event loop
+    password_hash = await run_in_threadpool(get_password_hash, paciente_data["password"])
+    return await db.run_sync(
+        _crear_paciente_con_usuario, paciente_data, email_limpio, nombre_limpio, dni_limpio, password_hash
+    )
+
+def _obtener_paciente(db: Session, paciente_id: int, fields: Optional[str]):
+    proyeccion = parsear_campos(fields, PacienteOut, Paciente)
+    if proyeccion:
+        return proyeccion.a_dict(paciente_crud.get_or_404(db, paciente_id, proyeccion.opciones()))
+    return PacienteOut.model_validate(paciente_crud.get_or_404(db, paciente_id))
+
 @router.get("/{paciente_id}", response_model=PacienteOut)
-def obtener_paciente(paciente_id: int, db: Session = Depends(get_db)):
+async def obtener_paciente(
+    paciente_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: AsyncSession = Depends(get_async_db_lectura)
+):
     """
     Obtiene un paciente por ID
     
     Args:
         paciente_id: ID del paciente
+        fields: Campos a devolver; por defecto PacienteOut completo
         
     Returns:
         Datos del paciente
         
     Raises:
+        HTTPException 400: Si fields pide un campo inexistente
         HTTPException 404: Si el paciente no existe
     """
-    return paciente_crud.get_or_404(db, paciente_id)
+    paciente = await db.run_sync(_obtener_paciente, paciente_id, fields)
+    if fields:
+        return respuesta_datos(paciente, request)
+    return paciente
+
+def _actualizar_paciente(db: Session, paciente_id: int, paciente: PacienteUpdate) -> PacienteOut:
+    db_paciente = paciente_crud.get(db, paciente_id)
+    if not db_paciente:
+        raise HTTPException(
+            status_code=404, 
+            detail=MensajesError.PACIENTE_NO_ENCONTRADO
+        )
+    
+    # Si intentan cambiar el DNI, verificar que no esté duplicado
+    if paciente.dni and paciente.dni != db_paciente.dni:
+        verificar_dni_existente(db, paciente.dni, exclude_id=paciente_id)
+    
+    return PacienteOut.model_validate(paciente_crud.update(db, paciente_id, paciente))
 
 @router.put("/{paciente_id}", response_model=PacienteOut)
-def actualizar_paciente(
+async def actualizar_paciente(
     paciente_id: int, 
     paciente: PacienteUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Actualiza los datos de un paciente
@@ -289,21 +402,10 @@ def actualizar_paciente(
         HTTPException 404: Si el paciente no existe
         HTTPException 400: Si el nuevo DNI ya está en uso
     """
-    db_paciente = paciente_crud.get(db, paciente_id)
-    if not db_paciente:
-        raise HTTPException(
-            status_code=404, 
-            detail=MensajesError.PACIENTE_NO_ENCONTRADO
-        )
-    
-    # Si intentan cambiar el DNI, verificar que no esté duplicado
-    if paciente.dni and paciente.dni != db_paciente.dni:
-        verificar_dni_existente(db, paciente.dni, exclude_id=paciente_id)
-    
-    return paciente_crud.update(db, paciente_id, paciente)
+    return await db.run_sync(_actualizar_paciente, paciente_id, paciente)
 
 @router.delete("/{paciente_id}")
-def eliminar_paciente(paciente_id: int, db: Session = Depends(get_db)):
+async def eliminar_paciente(paciente_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un paciente
     
@@ -316,7 +418,7 @@ def eliminar_paciente(paciente_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException 404: Si el paciente no existe
     """
-    deleted = paciente_crud.delete(db, paciente_id)
+    deleted = await db.run_sync(paciente_crud.delete, paciente_id)
     if not deleted:
         raise HTTPException(
             status_code=404, 
@@ -1,17 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from datetime import date, datetime, time
 from typing import List, Optional
 
-from app.database import get_db
-from app.core.permissions import role_required
+from app.database import get_async_db, get_async_db_lectura
+from app.core.permissions import role_required_async
 from app.core.token import get_current_user
+from app.core.limites_sql import limite_sentencia
 
 # Modelos
 from app.models.turno import Turno
 from app.models.paciente import Paciente
 from app.models.kinesiologo import Kinesiologo
 from app.models.user import User
+from app.routers.turnos import OPCIONES_TURNO
 
 # Schemas
 from app.schemas.turno_schema import TurnoOut
@@ -19,7 +23,8 @@ from app.schemas.turno_schema import TurnoOut
 
 router = APIRouter(
     prefix="/recepcion",
-    tags=["Recepción"]
+    tags=["Recepción"],
+    dependencies=[Depends(limite_sentencia("reserva"))]
 )
 
 
@@ -27,9 +32,9 @@ router = APIRouter(
 # 📅 Turnos del día actual
 # ─────────────────────────────────────────────
 @router.get("/turnos-hoy", response_model=List[TurnoOut])
-def turnos_de_hoy(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(role_required("recepcionista", "admin"))
+async def turnos_de_hoy(
+    db: AsyncSession = Depends(get_async_db_lectura),
+    current_user: User = Depends(role_required_async("recepcionista", "admin"))
 ):
     """
     Obtener todos los turnos del día actual.
@@ -37,18 +42,12 @@ def turnos_de_hoy(
     """
     hoy = date.today()
     
-    turnos = (
-        db.query(Turno)
-        .options(
-            joinedload(Turno.paciente).joinedload(Paciente.user),
-            joinedload(Turno.kinesiologo).joinedload(Kinesiologo.user),
-            joinedload(Turno.servicio),
-            joinedload(Turno.sala)
-        )
-        .filter(Turno.fecha == hoy)
+    turnos = (await db.scalars(
+        select(Turno)
+        .options(*OPCIONES_TURNO)
+        .where(Turno.fecha == hoy)
         .order_by(Turno.hora_inicio.asc())
-        .all()
-    )
+    )).all()
     
     return turnos
 
@@ -56,55 +55,50 @@ def turnos_de_hoy(
 # ─────────────────────────────────────────────
 # 📅 Turnos por rango de fechas
 # ─────────────────────────────────────────────
-@router.get("/turnos", response_model=List[TurnoOut])
-def turnos_recepcion(
+@router.get("/turnos", response_model=List[TurnoOut], dependencies=[Depends(limite_sentencia("consulta"))])
+async def turnos_recepcion(
     fecha_desde: Optional[date] = Query(None),
     fecha_hasta: Optional[date] = Query(None),
     estado: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(role_required("recepcionista", "admin"))
+    db: AsyncSession = Depends(get_async_db_lectura),
+    current_user: User = Depends(role_required_async("recepcionista", "admin"))
 ):
     """
     Obtener turnos con filtros opcionales.
     Solo accesible por recepcionistas y admins.
     """
-    query = db.query(Turno).options(
-        joinedload(Turno.paciente).joinedload(Paciente.user),
-        joinedload(Turno.kinesiologo).joinedload(Kinesiologo.user),
-        joinedload(Turno.servicio),
-        joinedload(Turno.sala)
-    )
+    query = select(Turno).options(*OPCIONES_TURNO)
     
     # Aplicar filtros
     if fecha_desde:
-        query = query.filter(Turno.fecha >= fecha_desde)
+        query = query.where(Turno.fecha >= fecha_desde)
     if fecha_hasta:
-        query = query.filter(Turno.fecha <= fecha_hasta)
+        query = query.where(Turno.fecha <= fecha_hasta)
     if estado:
-        query = query.filter(Turno.estado == estado)
+        query = query.where(Turno.estado == estado)
     
     # Si no hay filtros, mostrar turnos de hoy
     if not fecha_desde and not fecha_hasta:
-        query = query.filter(Turno.fecha == date.today())
+        query = query.where(Turno.fecha == date.today())
     
-    return query.order_by(Turno.fecha.asc(), Turno.hora_inicio.asc()).all()
+    return (await db.scalars(query.order_by(Turno.fecha.asc(), Turno.hora_inicio.asc()))).all()
 
 
 # ─────────────────────────────────────────────
 # ✅ Confirmar asistencia de paciente
 # ─────────────────────────────────────────────
 @router.patch("/{turno_id}/confirmar-asistencia")
-def confirmar_asistencia(
+async def confirmar_asistencia(
     turno_id: int,
     llego_tarde: bool = Query(False, description="Indica si el paciente llegó tarde"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(role_required("recepcionista", "admin"))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(role_required_async("recepcionista", "admin"))
 ):
     """
     Confirmar que el paciente asistió al turno.
     Opcionalmente marcar si llegó tarde.
     """
-    turno = db.query(Turno).filter(Turno.id == turno_id).first()
+    turno = await db.get(Turno, turno_id)
     
     if not turno:
         raise HTTPException(status_code=404, detail="Turno no encontrado")
@@ -120,8 +114,7 @@ def confirmar_asistencia(
         else:
             turno.observaciones = observacion_tarde
     
-    db.commit()
-    db.refresh(turno)
+    await db.commit()
     
     return {
         "message": "Asistencia confirmada correctamente",
@@ -135,16 +128,16 @@ def confirmar_asistencia(
 # ❌ Marcar como ausente (no asistió)
 # ─────────────────────────────────────────────
 @router.patch("/{turno_id}/marcar-ausente")
-def marcar_ausente(
+async def marcar_ausente(
     turno_id: int,
     motivo: Optional[str] = Query(None, description="Motivo de la ausencia"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(role_required("recepcionista", "admin"))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(role_required_async("recepcionista", "admin"))
 ):
     """
     Marcar que el paciente no asistió al turno.
     """
-    turno = db.query(Turno).filter(Turno.id == turno_id).first()
+    turno = await db.get(Turno, turno_id)
     
     if not turno:
         raise HTTPException(status_code=404, detail="Turno no encontrado")
@@ -162,8 +155,7 @@ def marcar_ausente(
     else:
         turno.observaciones = observacion
     
-    db.commit()
-    db.refresh(turno)
+    await db.commit()
     
     return {
         "message": "Turno marcado como ausente",
@@ -176,22 +168,28 @@ def marcar_ausente(
 # 📊 Estadísticas del día
 # ─────────────────────────────────────────────
 @router.get("/estadisticas-hoy")
-def estadisticas_hoy(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(role_required("recepcionista", "admin"))
+async def estadisticas_hoy(
+    db: AsyncSession = Depends(get_async_db_lectura),
+    current_user: User = Depends(role_required_async("recepcionista", "admin"))
 ):
     """
     Obtener estadísticas de turnos del día actual.
     """
     hoy = date.today()
     
-    turnos_hoy = db.query(Turno).filter(Turno.fecha == hoy).all()
+    # Conteo agrupado en la base: no se cargan los turnos
+    filas = (await db.execute(
+        select(Turno.estado, func.count(Turno.id))
+        .where(Turno.fecha == hoy)
+        .group_by(Turno.estado)
+    )).all()
+    por_estado = {getattr(estado, "value", estado): cantidad for estado, cantidad in filas}
     
-    total = len(turnos_hoy)
-    pendientes = len([t for t in turnos_hoy if t.estado == "pendiente"])
-    confirmados = len([t for t in turnos_hoy if t.estado == "confirmado"])
-    cancelados = len([t for t in turnos_hoy if t.estado == "cancelado"])
-    completados = len([t for t in turnos_hoy if t.estado == "completado"])
+    total = sum(por_estado.values())
+    pendientes = por_estado.get("pendiente", 0)
+    confirmados = por_estado.get("confirmado", 0)
+    cancelados = por_estado.get("cancelado", 0)
+    completados = por_estado.get("completado", 0)
     
     return {
         "fecha": hoy,
@@ -206,26 +204,25 @@ def estadisticas_hoy(
 # ─────────────────────────────────────────────
 # 🔍 Buscar paciente por DNI o nombre
 # ─────────────────────────────────────────────
-@router.get("/buscar-paciente")
-def buscar_paciente(
+@router.get("/buscar-paciente", dependencies=[Depends(limite_sentencia("busqueda"))])
+async def buscar_paciente(
     query: str = Query(..., min_length=2, description="DNI o nombre del paciente"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(role_required("recepcionista", "admin"))
+    db: AsyncSession = Depends(get_async_db_lectura),
+    current_user: User = Depends(role_required_async("recepcionista", "admin"))
 ):
     """
     Buscar pacientes por DNI o nombre.
     """
-    pacientes = (
-        db.query(Paciente)
+    pacientes = (await db.scalars(
+        select(Paciente)
         .join(User)
-        .filter(
+        .where(
             (Paciente.dni.ilike(f"%{query}%")) | 
             (User.nombre.ilike(f"%{query}%"))
         )
         .options(joinedload(Paciente.user))
         .limit(10)
-        .all()
-    )
+    )).all()
     
     resultados = [
         {
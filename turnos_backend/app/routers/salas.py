@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.crud import sala_crud
+from app.core.permissions import role_required
+from app.schemas.lote_schema import ActualizacionLote, CreacionLote, EliminacionLote, ResultadoLote
 from app.schemas.sala_schema import SalaCreate, SalaUpdate, SalaOut
 
 router = APIRouter(prefix="/salas", tags=["Salas"])
@@ -14,6 +16,19 @@ def listar_salas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db))
 def crear_sala(sala: SalaCreate, db: Session = Depends(get_db)):
     return sala_crud.create(db, sala)
 
+# 📦 Operaciones en lote (solo admin): una sentencia por operación, no una por registro
+@router.post("/lote", response_model=ResultadoLote, status_code=201, dependencies=[Depends(role_required("admin"))])
+def crear_salas_lote(lote: CreacionLote[SalaCreate], db: Session = Depends(get_db)):
+    return {"cantidad": sala_crud.create_many(db, lote.items)}
+
+@router.patch("/lote", response_model=ResultadoLote, dependencies=[Depends(role_required("admin"))])
+def actualizar_salas_lote(lote: ActualizacionLote[SalaUpdate], db: Session = Depends(get_db)):
+    return {"cantidad": sala_crud.update_many(db, lote.ids, lote.cambios)}
+
+@router.delete("/lote", response_model=ResultadoLote, dependencies=[Depends(role_required("admin"))])
+def eliminar_salas_lote(lote: EliminacionLote, db: Session = Depends(get_db)):
+    return {"cantidad": sala_crud.delete_many(db, lote.ids)}
+
 @router.get("/{sala_id}", response_model=SalaOut)
 def obtener_sala(sala_id: int, db: Session = Depends(get_db)):
     return sala_crud.get_or_404(db, sala_id)
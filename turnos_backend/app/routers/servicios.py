@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.crud import servicio_crud
+from app.core.permissions import role_required
+from app.schemas.lote_schema import ActualizacionLote, CreacionLote, EliminacionLote, ResultadoLote
 from app.schemas.servicio_schema import ServicioCreate, ServicioUpdate, ServicioOut
 
 router = APIRouter(prefix="/servicios", tags=["Servicios"])
@@ -14,6 +16,19 @@ def listar_servicios(skip: int = 0, limit: int = 100, db: Session = Depends(get_
 def crear_servicio(servicio: ServicioCreate, db: Session = Depends(get_db)):
     return servicio_crud.create(db, servicio)
 
+# 📦 Operaciones en lote (solo admin): una sentencia por operación, no una por registro
+@router.post("/lote", response_model=ResultadoLote, status_code=201, dependencies=[Depends(role_required("admin"))])
+def crear_servicios_lote(lote: CreacionLote[ServicioCreate], db: Session = Depends(get_db)):
+    return {"cantidad": servicio_crud.create_many(db, lote.items)}
+
+@router.patch("/lote", response_model=ResultadoLote, dependencies=[Depends(role_required("admin"))])
+def actualizar_servicios_lote(lote: ActualizacionLote[ServicioUpdate], db: Session = Depends(get_db)):
+    return {"cantidad": servicio_crud.update_many(db, lote.ids, lote.cambios)}
+
+@router.delete("/lote", response_model=ResultadoLote, dependencies=[Depends(role_required("admin"))])
+def eliminar_servicios_lote(lote: EliminacionLote, db: Session = Depends(get_db)):
+    return {"cantidad": servicio_crud.delete_many(db, lote.ids)}
+
 @router.get("/{servicio_id}", response_model=ServicioOut)
 def obtener_servicio(servicio_id: int, db: Session = Depends(get_db)):
     return servicio_crud.get_or_404(db, servicio_id)
@@ -1,23 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from datetime import date, timedelta, datetime, time
 from typing import Optional, List
-from app.database import get_db
+from app.database import get_async_db, get_async_db_lectura, get_async_db_reportes
+from app.core.respuestas import JSONBytesResponse, respuesta_datos, respuesta_lista
+from app.core.campos import DESCRIPCION_FIELDS, parsear_campos
+from app.core.limites_sql import limite_sentencia
 
 # MODELOS
 from app.models.turno import Turno
 from app.models.paciente import Paciente
 from app.models.kinesiologo import Kinesiologo
 from app.models.servicio import Servicio
+from app.models.user import User
 
 # SCHEMAS
 from app.schemas.turno_schema import TurnoCreate, TurnoUpdate, TurnoOut
 
 router = APIRouter(
     prefix="/turnos",
-    tags=["Turnos"]
+    tags=["Turnos"],
+    dependencies=[Depends(limite_sentencia("reserva"))]
 )
 
+# Todo lo que embebe TurnoOut (con AsyncSession no hay lazy loading al serializar)
+OPCIONES_TURNO = (
+    joinedload(Turno.paciente).joinedload(Paciente.user).selectinload(User.roles),
+    joinedload(Turno.kinesiologo).joinedload(Kinesiologo.user).selectinload(User.roles),
+    joinedload(Turno.servicio),
+    joinedload(Turno.sala)
+)
+
+
+async def obtener_turno_completo(db: AsyncSession, turno_id: int) -> Optional[Turno]:
+    """Turno con sus relaciones cargadas, listo para TurnoOut"""
+    return await db.scalar(select(Turno).options(*OPCIONES_TURNO).where(Turno.id == turno_id))
+
+
 # ─────────────────────────────────────────────
 # 🛡️ Validaciones Auxiliares
 # ─────────────────────────────────────────────
@@ -44,8 +65,8 @@ def validar_reglas_horarias(fecha_turno: date, hora_inicio: time):
     except Exception:
         pass 
 
-def validar_superposicion(
-    db: Session,
+async def validar_superposicion(
+    db: AsyncSession,
     fecha: date,
     inicio: time,
     fin: time,
@@ -59,47 +80,47 @@ def validar_superposicion(
     Lógica: (NuevoInicio < ViejoFin) Y (NuevoFin > ViejoInicio)
     """
     
-    query_base = db.query(Turno).filter(
+    query_base = select(Turno.id).where(
         Turno.fecha == fecha,
         Turno.estado != "cancelado",
         Turno.hora_inicio < fin,
         Turno.hora_fin > inicio 
-    )
+    ).limit(1)
 
     if exclude_id:
-        query_base = query_base.filter(Turno.id != exclude_id)
+        query_base = query_base.where(Turno.id != exclude_id)
 
     # 1. Validar Kinesiólogo
     if kine_id:
-        if query_base.filter(Turno.kinesiologo_id == kine_id).first():
+        if await db.scalar(query_base.where(Turno.kinesiologo_id == kine_id)):
             raise HTTPException(status_code=400, detail="El kinesiólogo ya tiene un turno en ese horario.")
 
     # 2. Validar Sala
     if sala_id:
-        if query_base.filter(Turno.sala_id == sala_id).first():
+        if await db.scalar(query_base.where(Turno.sala_id == sala_id)):
             raise HTTPException(status_code=400, detail="La sala seleccionada ya está ocupada en ese horario.")
 
     # 3. Validar Paciente
     if paciente_id:
-        if query_base.filter(Turno.paciente_id == paciente_id).first():
+        if await db.scalar(query_base.where(Turno.paciente_id == paciente_id)):
             raise HTTPException(status_code=400, detail="El paciente ya tiene otro turno asignado en este horario.")
 
 # ─────────────────────────────────────────────
 # ➕ Crear turno
 # ─────────────────────────────────────────────
 @router.post("/", response_model=TurnoOut, status_code=201)
-def crear_turno(turno: TurnoCreate, db: Session = Depends(get_db)):
+async def crear_turno(turno: TurnoCreate, db: AsyncSession = Depends(get_async_db)):
     # 1. Validaciones básicas
     validar_reglas_horarias(turno.fecha, turno.hora_inicio)
 
     # 2. Verificar existencia de FKs
-    servicio = db.query(Servicio).filter(Servicio.id == turno.servicio_id).first()
+    servicio = await db.get(Servicio, turno.servicio_id)
     if not servicio: raise HTTPException(status_code=404, detail="Servicio no encontrado")
     
-    if not db.query(Paciente).filter(Paciente.id == turno.paciente_id).first():
+    if not await db.scalar(select(Paciente.id).where(Paciente.id == turno.paciente_id)):
         raise HTTPException(status_code=404, detail="Paciente no encontrado")
     
-    if not db.query(Kinesiologo).filter(Kinesiologo.id == turno.kinesiologo_id).first():
+    if not await db.scalar(select(Kinesiologo.id).where(Kinesiologo.id == turno.kinesiologo_id)):
         raise HTTPException(status_code=404, detail="Kinesiólogo no encontrado")
 
     # 3. Calcular Hora Fin
@@ -108,7 +129,7 @@ def crear_turno(turno: TurnoCreate, db: Session = Depends(get_db)):
     hora_fin_calculada = (dt_inicio + timedelta(minutes=duracion)).time()
 
     # 4. Validar Superposición
-    validar_superposicion(
+    await validar_superposicion(
         db=db,
         fecha=turno.fecha,
         inicio=turno.hora_inicio,
@@ -124,16 +145,19 @@ def crear_turno(turno: TurnoCreate, db: Session = Depends(get_db)):
     
     nuevo_turno = Turno(**turno_dict) 
     db.add(nuevo_turno)
-    db.commit()
-    db.refresh(nuevo_turno)
-    return nuevo_turno
+    await db.commit()
+    return await obtener_turno_completo(db, nuevo_turno.id)
 
 # ─────────────────────────────────────────────
 # 📋 Listar turnos
 # ─────────────────────────────────────────────
-@router.get("/", response_model=List[TurnoOut])
-def listar_turnos(
-    db: Session = Depends(get_db),
+@router.get(
+    "/", response_model=List[TurnoOut], response_class=JSONBytesResponse,
+    dependencies=[Depends(limite_sentencia("consulta"))]
+)
+async def listar_turnos(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db_lectura),
     fecha: Optional[date] = Query(None),
     desde: Optional[date] = Query(None),
     hasta: Optional[date] = Query(None),
@@ -141,30 +165,33 @@ def listar_turnos(
     kinesiologo_id: Optional[int] = Query(None),
     paciente_id: Optional[int] = Query(None),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=500)
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS)
 ):
-    query = db.query(Turno).options(
-        joinedload(Turno.paciente).joinedload(Paciente.user),
-        joinedload(Turno.kinesiologo).joinedload(Kinesiologo.user),
-        joinedload(Turno.servicio),
-        joinedload(Turno.sala)
-    )
-
-    if fecha: query = query.filter(Turno.fecha == fecha)
-    if desde: query = query.filter(Turno.fecha >= desde)
-    if hasta: query = query.filter(Turno.fecha <= hasta)
-    if estado: query = query.filter(Turno.estado == estado)
-    if kinesiologo_id: query = query.filter(Turno.kinesiologo_id == kinesiologo_id)
-    if paciente_id: query = query.filter(Turno.paciente_id == paciente_id)
-
-    return query.order_by(Turno.fecha.asc(), Turno.hora_inicio.asc()).offset(skip).limit(limit).all()
+    # Con ?fields= solo se leen las columnas y relaciones pedidas
+    proyeccion = parsear_campos(fields, TurnoOut, Turno)
+    query = select(Turno).options(*(proyeccion.opciones() if proyeccion else OPCIONES_TURNO))
+
+    if fecha: query = query.where(Turno.fecha == fecha)
+    if desde: query = query.where(Turno.fecha >= desde)
+    if hasta: query = query.where(Turno.fecha <= hasta)
+    if estado: query = query.where(Turno.estado == estado)
+    if kinesiologo_id: query = query.where(Turno.kinesiologo_id == kinesiologo_id)
+    if paciente_id: query = query.where(Turno.paciente_id == paciente_id)
+
+    turnos = (await db.scalars(
+        query.order_by(Turno.fecha.asc(), Turno.hora_inicio.asc()).offset(skip).limit(limit)
+    )).all()
+    if proyeccion:
+        return respuesta_datos(proyeccion.a_dicts(turnos), request)
+    return respuesta_lista(turnos, TurnoOut, request)
 
 # ─────────────────────────────────────────────
 # ✏️ Actualizar turno
 # ─────────────────────────────────────────────
 @router.put("/{turno_id}", response_model=TurnoOut)
-def actualizar_turno(turno_id: int, turno_update: TurnoUpdate, db: Session = Depends(get_db)):
-    turno_existente = db.query(Turno).filter(Turno.id == turno_id).first()
+async def actualizar_turno(turno_id: int, turno_update: TurnoUpdate, db: AsyncSession = Depends(get_async_db)):
+    turno_existente = await db.get(Turno, turno_id)
     if not turno_existente:
         raise HTTPException(status_code=404, detail="Turno no encontrado")
 
@@ -178,13 +205,13 @@ def actualizar_turno(turno_id: int, turno_update: TurnoUpdate, db: Session = Dep
         validar_reglas_horarias(nueva_fecha, nueva_hora_ini)
 
         id_serv = update_dict.get("servicio_id", turno_existente.servicio_id)
-        servicio = db.query(Servicio).filter(Servicio.id == id_serv).first()
+        servicio = await db.get(Servicio, id_serv) if id_serv else None
         duracion = servicio.duracion_minutos if servicio else 30
         
         dt_start = datetime.combine(date.today(), nueva_hora_ini)
         nueva_hora_fin = (dt_start + timedelta(minutes=duracion)).time()
 
-        validar_superposicion(
+        await validar_superposicion(
             db=db,
             fecha=nueva_fecha,
             inicio=nueva_hora_ini,
@@ -200,27 +227,39 @@ def actualizar_turno(turno_id: int, turno_update: TurnoUpdate, db: Session = Dep
     for field, value in update_dict.items():
         setattr(turno_existente, field, value)
 
-    db.commit()
-    db.refresh(turno_existente)
-    return turno_existente
+    await db.commit()
+    # populate_existing: refresca las relaciones si cambió alguna FK
+    return await db.scalar(
+        select(Turno).options(*OPCIONES_TURNO).where(Turno.id == turno_id)
+        .execution_options(populate_existing=True)
+    )
 
 # ─────────────────────────────────────────────
 # ⚙️ Otros Endpoints
 # ─────────────────────────────────────────────
 
 @router.get("/{turno_id}", response_model=TurnoOut)
-def obtener_turno(turno_id: int, db: Session = Depends(get_db)):
-    turno = db.query(Turno).filter(Turno.id == turno_id).first()
+async def obtener_turno(
+    turno_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: AsyncSession = Depends(get_async_db_lectura)
+):
+    proyeccion = parsear_campos(fields, TurnoOut, Turno)
+    if proyeccion:
+        turno = await db.scalar(select(Turno).options(*proyeccion.opciones()).where(Turno.id == turno_id))
+    else:
+        turno = await obtener_turno_completo(db, turno_id)
     if not turno: raise HTTPException(status_code=404, detail="Turno no encontrado")
-    return turno
+    return respuesta_datos(proyeccion.a_dict(turno), request) if proyeccion else turno
 
 @router.patch("/{turno_id}/estado")
-def cambiar_estado(
+async def cambiar_estado(
     turno_id: int, 
     estado: str = Query(...), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    turno = db.query(Turno).filter(Turno.id == turno_id).first()
+    turno = await db.get(Turno, turno_id)
     if not turno: 
         raise HTTPException(status_code=404, detail="Turno no encontrado")
     
@@ -240,43 +279,51 @@ def cambiar_estado(
             )
 
     turno.estado = estado
-    db.commit()
+    await db.commit()
     return {"message": f"Estado del turno #{turno_id} actualizado a '{estado}'."}
 
 @router.delete("/{turno_id}")
-def eliminar_turno(turno_id: int, db: Session = Depends(get_db)):
-    turno = db.query(Turno).filter(Turno.id == turno_id).first()
+async def eliminar_turno(turno_id: int, db: AsyncSession = Depends(get_async_db)):
+    turno = await db.get(Turno, turno_id)
     if not turno: raise HTTPException(status_code=404, detail="Turno no encontrado")
-    db.delete(turno)
-    db.commit()
+    await db.delete(turno)
+    await db.commit()
     return {"message": f"Turno #{turno_id} eliminado correctamente."}
 
-@router.get("/calendario/", response_model=list[TurnoOut])
-def obtener_turnos_calendario(
+@router.get(
+    "/calendario/", response_model=list[TurnoOut], response_class=JSONBytesResponse,
+    dependencies=[Depends(limite_sentencia("consulta"))]
+)
+async def obtener_turnos_calendario(
+    request: Request,
     fecha_inicio: date, fecha_fin: date,
     kinesiologo_id: Optional[int] = None,
     sala_id: Optional[int] = None,
     estado: Optional[str] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: AsyncSession = Depends(get_async_db_reportes)
 ):
-    query = db.query(Turno).options(
-        joinedload(Turno.paciente).joinedload(Paciente.user),
-        joinedload(Turno.kinesiologo).joinedload(Kinesiologo.user),
-        joinedload(Turno.servicio),
-        joinedload(Turno.sala)
-    ).filter(Turno.fecha >= fecha_inicio, Turno.fecha <= fecha_fin)
+    proyeccion = parsear_campos(fields, TurnoOut, Turno)
+    query = (
+        select(Turno)
+        .options(*(proyeccion.opciones() if proyeccion else OPCIONES_TURNO))
+        .where(Turno.fecha >= fecha_inicio, Turno.fecha <= fecha_fin)
+    )
     
-    if kinesiologo_id: query = query.filter(Turno.kinesiologo_id == kinesiologo_id)
-    if sala_id: query = query.filter(Turno.sala_id == sala_id)
-    if estado: query = query.filter(Turno.estado == estado)
+    if kinesiologo_id: query = query.where(Turno.kinesiologo_id == kinesiologo_id)
+    if sala_id: query = query.where(Turno.sala_id == sala_id)
+    if estado: query = query.where(Turno.estado == estado)
     
-    return query.order_by(Turno.fecha, Turno.hora_inicio).all()
+    turnos = (await db.scalars(query.order_by(Turno.fecha, Turno.hora_inicio))).all()
+    if proyeccion:
+        return respuesta_datos(proyeccion.a_dicts(turnos), request)
+    return respuesta_lista(turnos, TurnoOut, request)
 
 @router.put("/{turno_id}/mover", response_model=TurnoOut)
-def mover_turno(
-    turno_id: int, nueva_fecha: date, nueva_hora_inicio: str, db: Session = Depends(get_db)
+async def mover_turno(
+    turno_id: int, nueva_fecha: date, nueva_hora_inicio: str, db: AsyncSession = Depends(get_async_db)
 ):
-    turno = db.query(Turno).filter(Turno.id == turno_id).first()
+    turno = await obtener_turno_completo(db, turno_id)
     if not turno: raise HTTPException(status_code=404, detail="Turno no encontrado")
     
     try:
@@ -290,7 +337,7 @@ def mover_turno(
     duracion = datetime.combine(date.min, turno.hora_fin) - datetime.combine(date.min, turno.hora_inicio)
     hora_fin_obj = (datetime.combine(date.today(), hora_inicio_obj) + duracion).time()
 
-    validar_superposicion(
+    await validar_superposicion(
         db=db,
         fecha=nueva_fecha,
         inicio=hora_inicio_obj,
@@ -305,6 +352,5 @@ def mover_turno(
     turno.hora_inicio = hora_inicio_obj
     turno.hora_fin = hora_fin_obj
     
-    db.commit()
-    db.refresh(turno)
+    await db.commit()
     return turno
\ No newline at end of file
@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.core.crud import user_crud
-from app.core.security import get_password_hash
+from typing import Optional
+from app.core.respuestas import JSONBytesResponse, respuesta_datos, respuesta_lista
+from app.core.campos import DESCRIPCION_FIELDS, parsear_campos
+from app.core.security import get_password_hash, hashear_passwords
+from app.core.permissions import role_required, role_required_async
 from app.schemas.user_schema import UserCreate, UserUpdate, UserOut
+from app.schemas.lote_schema import ActualizacionLote, CreacionLoteUsuarios, EliminacionLote, ResultadoLote
 from app.models.user import User
 
 router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
 
-@router.get("/", response_model=list[UserOut])
-def listar_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    # Cargar usuarios con sus roles
-    usuarios = db.query(User).options(joinedload(User.roles)).offset(skip).limit(limit).all()
-    return usuarios
+@router.get("/", response_model=list[UserOut], response_class=JSONBytesResponse)
+def listar_usuarios(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: Session = Depends(get_db)
+):
+    # Con ?fields= solo se leen las columnas pedidas (y roles solo si se piden)
+    proyeccion = parsear_campos(fields, UserOut, User)
+    if proyeccion:
+        usuarios = user_crud.get_multi(db, skip=skip, limit=limit, opciones=proyeccion.opciones())
+        return respuesta_datos(proyeccion.a_dicts(usuarios), request)
+    # Roles cargados con las loader options declaradas en user_crud
+    usuarios = user_crud.get_multi(db, skip=skip, limit=limit)
+    return respuesta_lista(usuarios, UserOut, request)
 
 @router.post("/", response_model=UserOut, status_code=201)
 def crear_usuario(user: UserCreate, db: Session = Depends(get_db)):
@@ -26,13 +43,37 @@ def crear_usuario(user: UserCreate, db: Session = Depends(get_db)):
     db.refresh(db_user)
     return db_user
 
+# 📦 Operaciones en lote (solo admin): alta masiva, activar/desactivar y baja de varios usuarios
+@router.post("/lote", response_model=ResultadoLote, status_code=201, dependencies=[Depends(role_required_async("admin"))])
+async def crear_usuarios_lote(lote: CreacionLoteUsuarios, db: AsyncSession = Depends(get_async_db)):
+    # Los hashes se calculan en paralelo antes de usar la sesión: no se retiene una conexión
+    # ni un hilo del threadpool mientras corre bcrypt (password -> password_hash)
+    hashes = await hashear_passwords([u.password for u in lote.items])
+    filas = [{**u.dict(exclude={"password"}), "password_hash": h} for u, h in zip(lote.items, hashes)]
+    return {"cantidad": await db.run_sync(user_crud.insertar_filas, filas)}
+
+@router.patch("/lote", response_model=ResultadoLote, dependencies=[Depends(role_required("admin"))])
+def actualizar_usuarios_lote(lote: ActualizacionLote[UserUpdate], db: Session = Depends(get_db)):
+    return {"cantidad": user_crud.update_many(db, lote.ids, lote.cambios)}
+
+@router.delete("/lote", response_model=ResultadoLote, dependencies=[Depends(role_required("admin"))])
+def eliminar_usuarios_lote(lote: EliminacionLote, db: Session = Depends(get_db)):
+    # Borra también sus filas de user_roles; los perfiles quedan sin usuario, igual que en la baja individual
+    return {"cantidad": user_crud.delete_many(db, lote.ids)}
+
 @router.get("/{user_id}", response_model=UserOut)
-def obtener_usuario(user_id: int, db: Session = Depends(get_db)):
-    # CRÍTICO: Cargar usuario CON sus roles usando joinedload
-    user = db.query(User).options(joinedload(User.roles)).filter(User.id == user_id).first()
+def obtener_usuario(
+    user_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=DESCRIPCION_FIELDS),
+    db: Session = Depends(get_db)
+):
+    # Usuario CON sus roles (opciones_detalle de user_crud), salvo que ?fields= no los pida
+    proyeccion = parsear_campos(fields, UserOut, User)
+    user = user_crud.get(db, user_id, proyeccion.opciones() if proyeccion else None)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    return user
+    return respuesta_datos(proyeccion.a_dict(user), request) if proyeccion else user
 
 @router.put("/{user_id}", response_model=UserOut)
 def actualizar_usuario(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Literal, Optional
+
+from app.core.config import BATCH_MAX_REQUESTS
+
+
+class SubRequest(BaseModel):
+    """
+    Request individual dentro de un batch. En la ruta y en los valores string
+    del body se puede referenciar el resultado de una sub-request anterior con
+    {{indice.campo}}, ej: {"paciente_id": "{{0.id}}"} o "/turnos/{{1.id}}/estado"
+    """
+    metodo: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    ruta: str = Field(..., pattern=r"^/")
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[SubRequest] = Field(..., min_length=1, max_length=BATCH_MAX_REQUESTS)
+    # Todo o nada: una sola transacción, se corta en el primer error (solo rutas async)
+    atomico: bool = False
+
+
+class ResultadoSubRequest(BaseModel):
+    codigo: int
+    body: Optional[Any] = None
+
+
+class BatchOut(BaseModel):
+    resultados: List[ResultadoSubRequest]
+    atomico: bool
+    # False si un batch atómico se revirtió (resultados llega hasta la sub-request que falló)
+    confirmado: bool
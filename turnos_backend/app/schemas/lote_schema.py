@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, TypeVar
+
+from app.core.config import LOTE_MAX_ITEMS, LOTE_MAX_USUARIOS
+from app.schemas.user_schema import UserCreate
+
+T = TypeVar("T")
+
+
+class CreacionLote(BaseModel, Generic[T]):
+    """Registros a crear con un solo INSERT (ej: CreacionLote[SalaCreate])"""
+    items: List[T] = Field(..., min_length=1, max_length=LOTE_MAX_ITEMS)
+
+
+class CreacionLoteUsuarios(CreacionLote[UserCreate]):
+    """Alta masiva de usuarios: cada item se hashea con bcrypt, así que el lote es más chico"""
+    items: List[UserCreate] = Field(..., min_length=1, max_length=LOTE_MAX_USUARIOS)
+
+
+class ActualizacionLote(BaseModel, Generic[T]):
+    """Mismos cambios aplicados a varios ids con un solo UPDATE"""
+    ids: List[int] = Field(..., min_length=1, max_length=LOTE_MAX_ITEMS)
+    cambios: T
+
+
+class EliminacionLote(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=LOTE_MAX_ITEMS)
+
+
+class ResultadoLote(BaseModel):
+    # Filas afectadas por la sentencia
+    cantidad: int
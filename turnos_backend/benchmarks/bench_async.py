@@ -0,0 +1,241 @@
+"""
+Benchmark: handlers sync (threadpool + Session) vs async (AsyncSession)
+
+Levanta uvicorn con una app mínima que expone el mismo endpoint dos veces:
+    GET /sync/turnos/{id}   def + get_db          (ocupa un hilo de AnyIO por request)
+    GET /async/turnos/{id}  async def + get_async_db  (espera en el event loop)
+
+Ambos cargan el turno con las relaciones de TurnoOut y, opcionalmente, agregan
+una espera del lado de la base (--latencia-ms: SELECT SLEEP en MySQL; en otros
+motores se simula la misma espera en el handler) para modelar consultas lentas.
+
+Para cada modo levanta un servidor nuevo (un worker) y carga con concurrencia
+creciente. Reporta throughput, p50 / p95 / p99, errores y, muestreando
+/proc/<pid>/status del servidor, el pico de memoria (VmHWM) e hilos: la idea es
+ver cuánta concurrencia sostiene cada modo con la misma memoria.
+
+Uso (desde turnos_backend/):
+    python -m benchmarks.bench_async --database-url mysql://... --latencia-ms 20 \\
+        --concurrencias 10,50,100,200,400 --requests 2000 --salida bench_async.json
+
+La base necesita turnos (ver scripts.generar_datos).
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+MODOS = ("sync", "async")
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# APP DE PRUEBA (se instancia dentro del servidor con --factory)
+# ══════════════════════════════════════════════════════════════════════════
+
+def crear_app_bench():
+    from fastapi import Depends, FastAPI, HTTPException
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.database import engine, get_async_db, get_db
+    from app.models.turno import Turno
+    from app.routers.turnos import OPCIONES_TURNO
+    from app.schemas.turno_schema import TurnoOut
+
+    latencia = float(os.getenv("BENCH_LATENCIA_MS", 0)) / 1000
+    sleep_en_base = engine.dialect.name == "mysql"
+    consulta = lambda turno_id: select(Turno).options(*OPCIONES_TURNO).where(Turno.id == turno_id)
+
+    app_bench = FastAPI()
+
+    @app_bench.get("/sync/turnos/{turno_id}", response_model=TurnoOut)
+    def turno_sync(turno_id: int, db: Session = Depends(get_db)):
+        if latencia:
+            if sleep_en_base:
+                db.execute(select(func.sleep(latencia)))
+            else:
+                time.sleep(latencia)
+        turno = db.scalar(consulta(turno_id))
+        if not turno: raise HTTPException(status_code=404, detail="Turno no encontrado")
+        return turno
+
+    @app_bench.get("/async/turnos/{turno_id}", response_model=TurnoOut)
+    async def turno_async(turno_id: int, db: AsyncSession = Depends(get_async_db)):
+        if latencia:
+            if sleep_en_base:
+                await db.execute(select(func.sleep(latencia)))
+            else:
+                await asyncio.sleep(latencia)
+        turno = await db.scalar(consulta(turno_id))
+        if not turno: raise HTTPException(status_code=404, detail="Turno no encontrado")
+        return turno
+
+    @app_bench.get("/")
+    def salud():
+        return {"ok": True}
+
+    return app_bench
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# SERVIDOR Y MUESTREO DE RECURSOS
+# ══════════════════════════════════════════════════════════════════════════
+
+def lanzar_servidor(database_url: str, puerto: int, latencia_ms: float) -> subprocess.Popen:
+    import httpx
+
+    entorno = dict(os.environ, DATABASE_URL=database_url, BENCH_LATENCIA_MS=str(latencia_ms))
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.bench_async:crear_app_bench", "--factory",
+         "--port", str(puerto), "--log-level", "warning"],
+        env=entorno,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{puerto}/", timeout=1).status_code == 200:
+                return proceso
+        except httpx.HTTPError:
+            pass
+        if proceso.poll() is not None:
+            break
+        time.sleep(0.2)
+    proceso.terminate()
+    raise SystemExit("No se pudo levantar el servidor")
+
+
+def estado_proceso(pid: int) -> dict:
+    """Memoria residente actual y pico (MB) e hilos del proceso, según /proc"""
+    valores = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linea in f:
+                clave, _, valor = linea.partition(":")
+                if clave in ("VmRSS", "VmHWM"):
+                    valores[clave] = int(valor.split()[0]) / 1024
+                elif clave == "Threads":
+                    valores[clave] = int(valor)
+    except FileNotFoundError:
+        pass
+    return {"rss_mb": valores.get("VmRSS"), "pico_rss_mb": valores.get("VmHWM"), "hilos": valores.get("Threads")}
+
+
+async def muestrear(pid: int, muestras: list, fin: asyncio.Event):
+    while not fin.is_set():
+        muestras.append(estado_proceso(pid))
+        await asyncio.sleep(0.05)
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# CARGA
+# ══════════════════════════════════════════════════════════════════════════
+
+async def cargar(url: str, modo: str, ids: list, concurrencia: int, total: int, pid: int) -> dict:
+    import httpx
+
+    limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+    latencias, errores = [], 0
+    muestras, fin = [], asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=120) as http:
+        pendientes = iter(range(total))
+
+        async def cliente():
+            nonlocal errores
+            for i in pendientes:
+                t0 = time.perf_counter()
+                try:
+                    respuesta = await http.get(f"/{modo}/turnos/{ids[i % len(ids)]}")
+                    if respuesta.status_code != 200:
+                        errores += 1
+                except httpx.HTTPError:
+                    errores += 1
+                latencias.append((time.perf_counter() - t0) * 1000)
+
+        tarea_muestreo = asyncio.create_task(muestrear(pid, muestras, fin))
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+        duracion = time.perf_counter() - inicio
+        fin.set()
+        await tarea_muestreo
+
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    hilos = [m["hilos"] for m in muestras if m["hilos"]]
+    return {
+        "concurrencia": concurrencia,
+        "requests": total,
+        "rps": round(total / duracion, 1),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "errores": errores,
+        "pico_rss_mb": round(max((m["pico_rss_mb"] or 0) for m in muestras), 1) if muestras else None,
+        "max_hilos": max(hilos) if hilos else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--puerto", type=int, default=8767)
+    parser.add_argument("--latencia-ms", type=float, default=10.0, help="Espera extra por request del lado de la base")
+    parser.add_argument("--concurrencias", default="10,50,100,200", help="Niveles de concurrencia separados por coma")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests por nivel")
+    parser.add_argument("--modos", default="sync,async")
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("Falta --database-url (o DATABASE_URL)")
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from app.database import SessionLocal
+    from app.models.turno import Turno
+
+    db = SessionLocal()
+    try:
+        ids = [id_ for (id_,) in db.query(Turno.id).order_by(Turno.id).limit(500)]
+    finally:
+        db.close()
+    if not ids:
+        raise SystemExit("La base no tiene turnos (ver scripts.generar_datos)")
+
+    concurrencias = [int(c) for c in args.concurrencias.split(",")]
+    url = f"http://127.0.0.1:{args.puerto}"
+    resultados = {"latencia_ms": args.latencia_ms, "modos": {}}
+
+    for modo in args.modos.split(","):
+        if modo not in MODOS:
+            parser.error(f"Modo desconocido: {modo}")
+        # Servidor nuevo por modo: el pico de memoria no arrastra la corrida anterior
+        servidor = lanzar_servidor(args.database_url, args.puerto, args.latencia_ms)
+        try:
+            niveles = []
+            for concurrencia in concurrencias:
+                nivel = asyncio.run(cargar(url, modo, ids, concurrencia, args.requests, servidor.pid))
+                niveles.append(nivel)
+                print(
+                    f"{modo:>5} c={concurrencia:<4} {nivel['rps']:>8} rps  p50 {nivel['p50_ms']:>8} ms  "
+                    f"p95 {nivel['p95_ms']:>8} ms  errores {nivel['errores']:<4} "
+                    f"rss {nivel['pico_rss_mb']} MB  hilos {nivel['max_hilos']}",
+                    file=sys.stderr,
+                )
+            resultados["modos"][modo] = niveles
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    salida = json.dumps(resultados, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida)
+    print(salida)
+
+
+if __name__ == "__main__":
+    main()
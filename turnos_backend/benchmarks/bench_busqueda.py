@@ -0,0 +1,124 @@
+"""
+Benchmark de la búsqueda de texto en historias (app/core/busqueda.py)
+
+Siembra un índice invertido sintético (tabla historia_terminos) con términos de
+frecuencias muy distintas (de "dolor", en el 30% de las historias, a
+"tendinitis", en el 0,01%) más ~10 términos de relleno por historia, y mide
+p50 / p95 de buscar_historias con y sin tope de candidatos por término
+(BUSQUEDA_MAX_CANDIDATOS_TERMINO; "sin tope" reproduce la agregación sobre
+todos los postings).
+
+Uso (desde turnos_backend/):
+    python -m benchmarks.bench_busqueda --historias 1000000 --repeticiones 20
+
+Sin --database-url se usa una base SQLite temporal; con --database-url y
+--sembrar se crea y siembra la tabla del índice en esa base.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+# (palabra, fracción de historias que la contienen)
+VOCABULARIO = (
+    ("dolor", 0.30),
+    ("lumbar", 0.10),
+    ("rodilla", 0.05),
+    ("esguince", 0.01),
+    ("fractura", 0.001),
+    ("tendinitis", 0.0001),
+)
+TERMINOS_RELLENO = 10
+TAMANO_RELLENO = 5000
+
+CONSULTAS = (
+    "dolor",
+    "dolor lumbar",
+    "dolor rodilla lumbar",
+    "esguince rodilla",
+    "dolor fractura",
+    "tendinitis",
+)
+
+
+def sembrar_indice(engine, historias: int):
+    """Inserta los postings con SQL (CTE recursiva): no pasa por Python fila por fila"""
+    from sqlalchemy import text
+    from app.database import Base
+    from app.core.busqueda import normalizar_terminos
+    from app.models.historia_termino import HistoriaTermino
+
+    Base.metadata.create_all(bind=engine, tables=[HistoriaTermino.__table__])
+    secuencia = "WITH RECURSIVE h(id) AS (SELECT 1 UNION ALL SELECT id + 1 FROM h WHERE id < :n) "
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM historia_terminos"))
+        for palabra, fraccion in VOCABULARIO:
+            termino = normalizar_terminos(palabra)[0]
+            conn.execute(text(
+                "INSERT INTO historia_terminos (historia_id, termino, frecuencia) " + secuencia +
+                "SELECT id, :termino, 1 + abs(random()) % 3 FROM h WHERE abs(random()) % 1000000 < :umbral"
+            ), {"n": historias, "termino": termino, "umbral": int(fraccion * 1_000_000)})
+        for _ in range(TERMINOS_RELLENO):
+            conn.execute(text(
+                "INSERT INTO historia_terminos (historia_id, termino, frecuencia) " + secuencia +
+                "SELECT id, 'r' || (abs(random()) % :vocabulario), 1 FROM h"
+            ), {"n": historias, "vocabulario": TAMANO_RELLENO})
+
+
+def medir(db, consulta: str, repeticiones: int) -> dict:
+    from app.core import busqueda
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultados = busqueda.buscar_historias(db, consulta, limit=20)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "p50": statistics.median(tiempos),
+        "p95": sorted(tiempos)[max(0, int(len(tiempos) * 0.95) - 1)],
+        "resultados": len(resultados),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--historias", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--database-url", help="Base a usar (por defecto, SQLite temporal sembrada)")
+    parser.add_argument("--sembrar", action="store_true", help="Sembrar el índice en la base de --database-url")
+    parser.add_argument("--sin-comparar", action="store_true", help="No medir la variante sin tope (lenta)")
+    args = parser.parse_args()
+
+    sembrar = args.sembrar or not args.database_url
+    if not args.database_url:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'busqueda.db')}"
+    # La app lee DATABASE_URL al importarse
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from app.database import SessionLocal, engine
+    from app.core import busqueda
+
+    if sembrar:
+        inicio = time.perf_counter()
+        sembrar_indice(engine, args.historias)
+        print(f"Índice sembrado ({args.historias} historias) en {time.perf_counter() - inicio:.1f}s")
+
+    tope = busqueda.BUSQUEDA_MAX_CANDIDATOS_TERMINO
+    variantes = [(f"tope {tope}", tope)]
+    if not args.sin_comparar:
+        variantes.append(("sin tope", 10 ** 12))
+
+    print(f"{'consulta':<24}{'variante':<14}{'p50 ms':>10}{'p95 ms':>10}{'resultados':>12}")
+    with SessionLocal() as db:
+        for consulta in CONSULTAS:
+            for nombre, valor in variantes:
+                busqueda.BUSQUEDA_MAX_CANDIDATOS_TERMINO = valor
+                medir(db, consulta, 1)  # calentamiento (caché de páginas)
+                r = medir(db, consulta, args.repeticiones)
+                print(f"{consulta:<24}{nombre:<14}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['resultados']:>12}")
+    busqueda.BUSQUEDA_MAX_CANDIDATOS_TERMINO = tope
+
+
+if __name__ == "__main__":
+    main()
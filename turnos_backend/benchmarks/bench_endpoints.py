@@ -0,0 +1,368 @@
+"""
+Benchmark de los endpoints más usados (app ASGI en proceso)
+
+Levanta la app con httpx.ASGITransport (sin servidor ni red) contra una base
+sembrada y mide throughput y latencias p50 / p95 / p99 de:
+    POST /turnos/, PUT /turnos/{id}/mover, GET /turnos/calendario/,
+    GET /recepcion/turnos-hoy, GET /recepcion/buscar-paciente,
+    POST /auth/login, GET /historias-clinicas/ y /historias-clinicas/paciente/{id}
+
+El resultado se escribe como JSON y puede compararse contra una baseline
+guardada: el proceso termina con código 1 si algún escenario empeora más que
+el umbral (p95 más alto o throughput más bajo).
+
+Uso (desde turnos_backend/):
+    python -m benchmarks.bench_endpoints --pacientes 2000 --salida resultado.json
+    python -m benchmarks.bench_endpoints --baseline baseline.json --umbral 0.2
+
+Sin --database-url se usa una base SQLite temporal sembrada en el momento.
+Con --database-url se usa esa base tal cual (por ejemplo, sembrada con
+scripts/generar_datos.py, pasando su admin con --admin-email / --admin-password);
+agregar --sembrar para crear las tablas y sembrarla.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from itertools import chain, islice
+from datetime import date, datetime, timedelta, time as dtime
+from typing import Callable, Optional
+
+import numpy as np
+
+ADMIN_EMAIL = "bench.admin@example.com"
+ADMIN_PASSWORD = "Bench1234"
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# DATOS
+# ══════════════════════════════════════════════════════════════════════════
+
+def proximo_dia_habil(desde: date) -> date:
+    while desde.weekday() >= 5:
+        desde += timedelta(days=1)
+    return desde
+
+
+def agenda(inicio: date, kinesiologos: list, pacientes: list, duracion: int = 30):
+    """
+    Genera turnos libres de superposición: recorre los horarios de días hábiles
+    (08:00 a 21:30) y en cada horario asigna un turno por kinesiólogo, con
+    pacientes distintos dentro del mismo horario.
+
+    Yields:
+        Tuplas (fecha, hora_inicio, hora_fin, kinesiologo_id, paciente_id)
+    """
+    horarios_por_dia = (22 * 60 - 8 * 60) // duracion
+    fecha, slot, i = proximo_dia_habil(inicio), 0, 0
+    while True:
+        minutos = 8 * 60 + slot * duracion
+        hora_inicio = dtime(minutos // 60, minutos % 60)
+        hora_fin = dtime((minutos + duracion) // 60, (minutos + duracion) % 60)
+        for kine_id in kinesiologos:
+            yield fecha, hora_inicio, hora_fin, kine_id, pacientes[i % len(pacientes)]
+            i += 1
+        slot += 1
+        if slot == horarios_por_dia:
+            fecha, slot = proximo_dia_habil(fecha + timedelta(days=1)), 0
+
+
+def sembrar(db, pacientes: int, kinesiologos: int, historias_por_paciente: int, dias_turnos: int):
+    """Crea roles, un admin, kinesiólogos, pacientes, turnos de hoy y del pasado e historias"""
+    from sqlalchemy import insert
+    from app.core.security import get_password_hash
+    from app.models import (
+        Role, User, UserRole, Paciente, Kinesiologo, Servicio, Sala, Turno, HistoriaClinica
+    )
+
+    roles = {}
+    for nombre in ("admin", "paciente", "kinesiologo", "recepcionista"):
+        rol = db.query(Role).filter(Role.name == nombre).first() or Role(name=nombre)
+        db.add(rol)
+        roles[nombre] = rol
+    db.flush()
+
+    password_hash = get_password_hash(ADMIN_PASSWORD)
+    db.add(User(nombre="Bench Admin", email=ADMIN_EMAIL, password_hash=password_hash, activo=True, roles=[roles["admin"]]))
+    servicio = Servicio(nombre="Kinesiología", duracion_minutos=30)
+    db.add_all([servicio, Sala(nombre="Sala Bench")])
+    db.flush()
+
+    def crear_usuarios(prefijo: str, cantidad: int, rol: str) -> list:
+        db.execute(insert(User), [
+            {"nombre": f"{prefijo.title()} {i}", "email": f"{prefijo}{i}@bench.com", "password_hash": password_hash, "activo": True}
+            for i in range(cantidad)
+        ])
+        ids = [id_ for (id_,) in db.query(User.id).filter(User.email.like(f"{prefijo}%@bench.com")).order_by(User.id)]
+        db.execute(insert(UserRole), [{"user_id": id_, "role_id": roles[rol].id} for id_ in ids])
+        return ids
+
+    db.execute(insert(Kinesiologo), [
+        {"user_id": user_id, "matricula_profesional": f"MP{i:05d}", "especialidad": "Deportiva"}
+        for i, user_id in enumerate(crear_usuarios("kine", kinesiologos, "kinesiologo"))
+    ])
+    db.execute(insert(Paciente), [
+        {"user_id": user_id, "dni": str(20_000_000 + i), "telefono": f"379{4_000_000 + i}"}
+        for i, user_id in enumerate(crear_usuarios("paciente", pacientes, "paciente"))
+    ])
+    kine_ids = [id_ for (id_,) in db.query(Kinesiologo.id).order_by(Kinesiologo.id)]
+    paciente_ids = [id_ for (id_,) in db.query(Paciente.id).order_by(Paciente.id)]
+
+    # Turnos: los de hoy (recepción) y un historial hacia atrás (calendario)
+    hoy = islice(agenda(date.today(), kine_ids, paciente_ids), len(kine_ids) * 20)
+    pasados = islice(agenda(date.today() - timedelta(days=dias_turnos), kine_ids, paciente_ids), dias_turnos * len(kine_ids) * 10)
+    turnos = [
+        {
+            "fecha": fecha, "hora_inicio": inicio, "hora_fin": fin, "estado": "pendiente",
+            "paciente_id": paciente_id, "kinesiologo_id": kine_id, "servicio_id": servicio.id,
+        }
+        for fecha, inicio, fin, kine_id, paciente_id in chain(hoy, pasados)
+    ]
+    db.execute(insert(Turno), turnos)
+
+    db.execute(insert(HistoriaClinica), [
+        {
+            "paciente_id": paciente_id, "kinesiologo_id": kine_ids[i % len(kine_ids)],
+            "fecha_consulta": datetime(2023, 1, 1) + timedelta(days=7 * j, hours=i % 10),
+            "motivo_consulta": "Dolor lumbar", "diagnostico": "Lumbalgia mecánica",
+            "tratamiento": "Ejercicios de estabilización", "peso": 70 + j % 5,
+            "presion_arterial": "120/80", "frecuencia_cardiaca": 70, "temperatura": 36.5,
+        }
+        for i, paciente_id in enumerate(paciente_ids)
+        for j in range(historias_por_paciente)
+    ])
+    db.commit()
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# ESCENARIOS
+# ══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class Escenario:
+    nombre: str
+    metodo: str
+    # Recibe el número de iteración y devuelve (url, params, json)
+    construir: Callable[[int], tuple]
+    autenticado: bool = True
+
+
+def armar_escenarios(db, total_iteraciones: int, admin_email: str = ADMIN_EMAIL, admin_password: str = ADMIN_PASSWORD) -> list:
+    """Arma los escenarios con ids reales de la base"""
+    from sqlalchemy import insert
+    from app.models import Paciente, Kinesiologo, Servicio, Turno, HistoriaClinica
+
+    kine_ids = [id_ for (id_,) in db.query(Kinesiologo.id).order_by(Kinesiologo.id)]
+    paciente_ids = [id_ for (id_,) in db.query(Paciente.id).order_by(Paciente.id).limit(5000)]
+    servicio = db.query(Servicio).filter(Servicio.duracion_minutos == 30).first() or db.query(Servicio).first()
+    servicio_id, duracion = servicio.id, servicio.duracion_minutos
+    con_historias = [id_ for (id_,) in db.query(HistoriaClinica.paciente_id).distinct().limit(500)] or paciente_ids
+    dnis = [dni for (dni,) in db.query(Paciente.dni).filter(Paciente.dni.isnot(None)).limit(500)] or ["2000"]
+
+    # Turnos propios del benchmark, lejos en el futuro para no chocar con datos existentes
+    base_crear = date.today() + timedelta(days=3 * 365)
+    base_mover_origen = date.today() + timedelta(days=4 * 365)
+    base_mover_destino = date.today() + timedelta(days=5 * 365)
+
+    crear = agenda(base_crear, kine_ids, paciente_ids, duracion)
+    origen = agenda(base_mover_origen, kine_ids, paciente_ids, duracion)
+    destino = agenda(base_mover_destino, kine_ids, paciente_ids, duracion)
+
+    a_mover = list(islice(origen, total_iteraciones))
+    db.execute(insert(Turno), [
+        {"fecha": f, "hora_inicio": hi, "hora_fin": hf, "estado": "pendiente",
+         "paciente_id": p, "kinesiologo_id": k, "servicio_id": servicio_id}
+        for f, hi, hf, k, p in a_mover
+    ])
+    db.commit()
+    ids_a_mover = [
+        id_ for (id_,) in db.query(Turno.id).filter(Turno.fecha >= base_mover_origen, Turno.fecha < base_mover_destino)
+        .order_by(Turno.fecha, Turno.hora_inicio, Turno.kinesiologo_id)
+    ]
+
+    def crear_turno(_):
+        fecha, inicio, _, kine_id, paciente_id = next(crear)
+        return "/turnos/", None, {
+            "fecha": fecha.isoformat(), "hora_inicio": inicio.isoformat(), "estado": "pendiente",
+            "paciente_id": paciente_id, "kinesiologo_id": kine_id, "servicio_id": servicio_id,
+        }
+
+    def mover_turno(i):
+        fecha, inicio, *_ = next(destino)
+        return f"/turnos/{ids_a_mover[i]}/mover", {"nueva_fecha": fecha.isoformat(), "nueva_hora_inicio": inicio.strftime("%H:%M")}, None
+
+    def calendario(i):
+        desde = date.today() - timedelta(days=7 * (i % 8) + 7)
+        return "/turnos/calendario/", {"fecha_inicio": desde.isoformat(), "fecha_fin": (desde + timedelta(days=6)).isoformat()}, None
+
+    return [
+        Escenario("POST /turnos/", "POST", crear_turno),
+        Escenario("PUT /turnos/{id}/mover", "PUT", mover_turno),
+        Escenario("GET /turnos/calendario/", "GET", calendario),
+        Escenario("GET /recepcion/turnos-hoy", "GET", lambda i: ("/recepcion/turnos-hoy", None, None)),
+        Escenario("GET /recepcion/buscar-paciente", "GET",
+                  lambda i: ("/recepcion/buscar-paciente", {"query": dnis[i % len(dnis)][:5]}, None)),
+        Escenario("POST /auth/login", "POST",
+                  lambda i: ("/auth/login", None, {"email": admin_email, "password": admin_password}), autenticado=False),
+        Escenario("GET /historias-clinicas/", "GET", lambda i: ("/historias-clinicas/", {"limit": 100}, None)),
+        Escenario("GET /historias-clinicas/paciente/{id}", "GET",
+                  lambda i: (f"/historias-clinicas/paciente/{con_historias[i % len(con_historias)]}", None, None)),
+    ]
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# MEDICIÓN
+# ══════════════════════════════════════════════════════════════════════════
+
+async def medir_escenario(cliente, escenario: Escenario, headers: dict, calentamiento: int,
+                          repeticiones: int, concurrencia: int, inicio_iteracion: int) -> dict:
+    latencias, errores = [], 0
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async def una(i: int, registrar: bool):
+        nonlocal errores
+        url, params, cuerpo = escenario.construir(inicio_iteracion + i)
+        async with semaforo:
+            t0 = time.perf_counter()
+            respuesta = await cliente.request(
+                escenario.metodo, url, params=params, json=cuerpo,
+                headers=headers if escenario.autenticado else None
+            )
+            transcurrido = (time.perf_counter() - t0) * 1000
+        if registrar:
+            latencias.append(transcurrido)
+            if respuesta.status_code >= 400:
+                errores += 1
+
+    await asyncio.gather(*(una(i, False) for i in range(calentamiento)))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(una(calentamiento + i, True) for i in range(repeticiones)))
+    duracion = time.perf_counter() - t0
+
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    return {
+        "requests": repeticiones,
+        "errores": errores,
+        "rps": round(repeticiones / duracion, 2),
+        "media_ms": round(float(np.mean(latencias)), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+def comparar(actual: dict, baseline: dict, umbral: float) -> list:
+    """
+    Compara contra la baseline; devuelve la lista de regresiones
+    (p95 mayor a baseline * (1 + umbral) o rps menor a baseline * (1 - umbral))
+    """
+    regresiones = []
+    for nombre, base in baseline.get("escenarios", {}).items():
+        medido = actual["escenarios"].get(nombre)
+        if not medido:
+            continue
+        if medido["p95_ms"] > base["p95_ms"] * (1 + umbral):
+            regresiones.append(f"{nombre}: p95 {base['p95_ms']:.2f} -> {medido['p95_ms']:.2f} ms")
+        if medido["rps"] < base["rps"] * (1 - umbral):
+            regresiones.append(f"{nombre}: rps {base['rps']:.1f} -> {medido['rps']:.1f}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Base a usar (por defecto, SQLite temporal sembrada)")
+    parser.add_argument("--sembrar", action="store_true", help="Crear tablas y sembrar la base de --database-url")
+    parser.add_argument("--admin-email", default=ADMIN_EMAIL, help="Admin existente (con --database-url sin --sembrar)")
+    parser.add_argument("--admin-password", default=ADMIN_PASSWORD)
+    parser.add_argument("--pacientes", type=int, default=1000)
+    parser.add_argument("--kinesiologos", type=int, default=10)
+    parser.add_argument("--historias-por-paciente", type=int, default=5)
+    parser.add_argument("--dias-turnos", type=int, default=90, help="Días de turnos pasados a sembrar")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--calentamiento", type=int, default=20)
+    parser.add_argument("--concurrencia", type=int, default=1)
+    parser.add_argument("--solo", action="append", help="Correr solo los escenarios que contengan este texto")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--baseline", help="Resultado JSON previo contra el cual comparar")
+    parser.add_argument("--umbral", type=float, default=0.2, help="Regresión tolerada (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sembrar_base = args.sembrar or not args.database_url
+    if not args.database_url:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_'), 'bench.db')}"
+    # La app lee DATABASE_URL al importarse
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("COMPRESION_HABILITADA", "false")
+
+    import httpx
+    from app.main import app
+    from app.database import Base, SessionLocal, engine
+    from app.core.security import create_access_token
+
+    db = SessionLocal()
+    try:
+        if sembrar_base:
+            Base.metadata.create_all(engine)
+            t0 = time.perf_counter()
+            sembrar(db, args.pacientes, args.kinesiologos, args.historias_por_paciente, args.dias_turnos)
+            print(f"Base sembrada en {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+        escenarios = armar_escenarios(db, args.calentamiento + args.repeticiones, args.admin_email, args.admin_password)
+        if args.solo:
+            escenarios = [e for e in escenarios if any(texto in e.nombre for texto in args.solo)]
+    finally:
+        db.close()
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": args.admin_email})}
+
+    async def correr() -> dict:
+        resultados = {}
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+            for escenario in escenarios:
+                resultados[escenario.nombre] = await medir_escenario(
+                    cliente, escenario, headers, args.calentamiento, args.repeticiones, args.concurrencia, 0
+                )
+                r = resultados[escenario.nombre]
+                print(f"{escenario.nombre:<40} {r['rps']:>9.1f} req/s  p50 {r['p50_ms']:>8.2f}  "
+                      f"p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  errores {r['errores']}", file=sys.stderr)
+        return resultados
+
+    resultado = {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "motor": args.database_url.split(":", 1)[0],
+            "pacientes": args.pacientes if sembrar_base else None,
+            "kinesiologos": args.kinesiologos if sembrar_base else None,
+            "repeticiones": args.repeticiones,
+            "concurrencia": args.concurrencia,
+        },
+        "escenarios": asyncio.run(correr()),
+    }
+
+    salida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida)
+    else:
+        print(salida)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regresiones = comparar(resultado, json.load(f), args.umbral)
+        if regresiones:
+            print("Regresiones respecto de la baseline:", file=sys.stderr)
+            for regresion in regresiones:
+                print(f"  - {regresion}", file=sys.stderr)
+            sys.exit(1)
+        print("Sin regresiones respecto de la baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
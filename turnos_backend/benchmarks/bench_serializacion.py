@@ -0,0 +1,88 @@
+"""
+Benchmark de serialización de listados (antes / después)
+
+Compara el camino estándar de FastAPI (validación con response_model +
+jsonable + json.dumps) contra el camino rápido de app.core.respuestas
+(TypeAdapter cacheado + dump_json) sobre objetos con la forma de TurnoOut.
+
+Uso (desde turnos_backend/):
+    python -m benchmarks.bench_serializacion --filas 500 --repeticiones 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, time as dtime
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.respuestas import serializar_lista
+from app.schemas.turno_schema import TurnoOut
+
+
+def generar_turnos(filas: int) -> list:
+    """Genera objetos con atributos equivalentes a filas ORM de Turno"""
+    roles = [SimpleNamespace(id=2, name="paciente")]
+    turnos = []
+    for i in range(filas):
+        user_pac = SimpleNamespace(id=i, nombre=f"Paciente {i}", email=f"p{i}@mail.com", activo=True, roles=roles)
+        user_kine = SimpleNamespace(id=10_000 + i % 8, nombre=f"Kine {i % 8}", email=f"k{i % 8}@mail.com", activo=True, roles=[])
+        turnos.append(SimpleNamespace(
+            id=i, fecha=date(2025, 3, 1 + i % 28), hora_inicio=dtime(9, 0), hora_fin=dtime(9, 45),
+            estado="pendiente", motivo="Control", observaciones=None,
+            paciente_id=i, kinesiologo_id=i % 8, servicio_id=1, sala_id=1,
+            paciente=SimpleNamespace(id=i, user_id=i, dni=str(30_000_000 + i), telefono="3794000000",
+                                     obra_social="Osde", historial_medico=None, direccion="Junin 123", user=user_pac),
+            kinesiologo=SimpleNamespace(id=i % 8, user_id=10_000 + i % 8, especialidad="Deportiva",
+                                        matricula_profesional=f"MP{i % 8:03d}", user=user_kine),
+            servicio=SimpleNamespace(id=1, nombre="Kinesiología", description=None, duracion_minutos=45),
+            sala=SimpleNamespace(id=1, nombre="Sala 1", ubicacion="Planta baja"),
+        ))
+    return turnos
+
+
+def camino_fastapi(field, turnos) -> bytes:
+    contenido = asyncio.run(serialize_response(field=field, response_content=turnos, is_coroutine=False))
+    return JSONResponse(content=contenido).body
+
+
+def camino_rapido(turnos) -> bytes:
+    return serializar_lista(turnos, TurnoOut)
+
+
+def medir(funcion, repeticiones: int) -> list:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    turnos = generar_turnos(args.filas)
+    field = create_model_field(name="Response_listar_turnos", type_=List[TurnoOut], mode="serialization")
+
+    # Calentamiento (construye los validadores y el TypeAdapter)
+    antes, despues = camino_fastapi(field, turnos), camino_rapido(turnos)
+
+    t_antes = medir(lambda: camino_fastapi(field, turnos), args.repeticiones)
+    t_despues = medir(lambda: camino_rapido(turnos), args.repeticiones)
+
+    print(f"Filas: {args.filas} | Repeticiones: {args.repeticiones}")
+    print(f"Antes   (FastAPI):     mediana {statistics.median(t_antes):7.2f} ms | {len(antes):>9} bytes")
+    print(f"Después (TypeAdapter): mediana {statistics.median(t_despues):7.2f} ms | {len(despues):>9} bytes")
+    print(f"Mejora: x{statistics.median(t_antes) / statistics.median(t_despues):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark de validaciones (valor por valor vs. en lote)
+
+Compara tres formas de validar las mismas filas (email, DNI, teléfono y
+contraseña), con un porcentaje configurable de valores inválidos:
+- original: los validadores como eran antes (TypeAdapter(EmailStr) creado en
+  cada llamada y regex sin precompilar), un try/except por valor
+- valor por valor: los validadores actuales (wrappers finos sobre los chequeos)
+- en lote: validar_lote de app.core.validaciones
+
+Uso (desde turnos_backend/):
+    python -m benchmarks.bench_validaciones --filas 10000 --repeticiones 20
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+
+from fastapi import HTTPException
+from pydantic import EmailStr, TypeAdapter, ValidationError
+
+from app.core.validaciones import (
+    validar_email_formato, validar_dni, validar_telefono, validar_password_fuerte,
+    validar_lote
+)
+
+CAMPOS = ("email", "dni", "telefono", "password")
+
+
+def generar_registros(filas: int, invalidos: float, semilla: int = 42) -> list:
+    """Genera filas tipo formulario; una fracción `invalidos` trae algún campo mal"""
+    azar = random.Random(semilla)
+    registros = []
+    for i in range(filas):
+        registro = {
+            "email": f"Paciente.{i}@Mail.com ",
+            "dni": f"{azar.randint(20, 45)}.{azar.randint(100, 999)}.{azar.randint(100, 999)}",
+            "telefono": f"+54 379 {azar.randint(4000000, 4999999)}",
+            "password": f"Clave{i:04d}x",
+        }
+        if azar.random() < invalidos:
+            campo = azar.choice(CAMPOS)
+            registro[campo] = {"email": "sin-arroba", "dni": "12a", "telefono": "abc", "password": "corta"}[campo]
+        registros.append(registro)
+    return registros
+
+
+def _email_original(email: str):
+    email_limpio = email.strip().lower()
+    try:
+        TypeAdapter(EmailStr).validate_python(email_limpio)
+    except ValidationError:
+        raise ValueError("email")
+
+
+def _dni_original(dni: str):
+    dni_limpio = dni.replace(".", "").replace(" ", "").strip()
+    if not dni_limpio.isdigit() or not 6 <= len(dni_limpio) <= 10:
+        raise ValueError("dni")
+
+
+def _telefono_original(telefono: str):
+    if not re.match(r'^[\d\+\-\s()]+$', telefono) or len(re.sub(r'\D', '', telefono)) < 6:
+        raise ValueError("telefono")
+
+
+def _password_original(v: str):
+    if len(v) < 8 or not re.search(r"\d", v) or not re.search(r"[A-Z]", v):
+        raise ValueError("password")
+
+
+def original(registros: list) -> int:
+    validadores = {
+        "email": _email_original, "dni": _dni_original,
+        "telefono": _telefono_original, "password": _password_original,
+    }
+    errores = 0
+    for registro in registros:
+        for campo, validador in validadores.items():
+            try:
+                validador(registro[campo])
+            except ValueError:
+                errores += 1
+    return errores
+
+
+def valor_por_valor(registros: list) -> int:
+    validadores = {
+        "email": validar_email_formato, "dni": validar_dni,
+        "telefono": validar_telefono, "password": validar_password_fuerte,
+    }
+    errores = 0
+    for registro in registros:
+        for campo, validador in validadores.items():
+            try:
+                validador(registro[campo])
+            except (ValueError, HTTPException):
+                errores += 1
+    return errores
+
+
+def en_lote(registros: list) -> int:
+    _, errores = validar_lote(registros, CAMPOS)
+    return len(errores)
+
+
+def medir(funcion, registros, repeticiones: int) -> list:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(registros)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--invalidos", type=float, default=0.05, help="Fracción de filas con errores")
+    args = parser.parse_args()
+
+    registros = generar_registros(args.filas, args.invalidos)
+    variantes = (("original", original), ("valor por valor", valor_por_valor), ("en lote", en_lote))
+    cantidades = {nombre: funcion(registros) for nombre, funcion in variantes}
+    assert len(set(cantidades.values())) == 1, f"Cantidad de errores distinta: {cantidades}"
+
+    print(f"{args.filas} filas x {len(CAMPOS)} campos, {args.repeticiones} repeticiones, "
+          f"{cantidades['original']} errores")
+    for nombre, funcion in variantes:
+        tiempos = medir(funcion, registros, args.repeticiones)
+        print(f"  {nombre:<16} mediana {statistics.median(tiempos):8.2f} ms   "
+              f"min {min(tiempos):8.2f} ms   {args.filas / statistics.median(tiempos) * 1000:10.0f} filas/s")
+
+
+if __name__ == "__main__":
+    main()
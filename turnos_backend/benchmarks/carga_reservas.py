@@ -0,0 +1,304 @@
+"""
+Prueba de carga: reservas concurrentes sobre los mismos horarios
+
+Simula la apertura de agenda de un kinesiólogo muy pedido: muchos clientes
+concurrentes reservan (POST /turnos/) y reprograman (PUT /turnos/{id}/mover)
+sobre un mismo día y horarios que se superponen entre sí.
+
+Al terminar reporta throughput, latencias, tasas de 4xx / 5xx, esperas de lock
+y deadlocks (MySQL) y, sobre todo, la cantidad de DOBLES RESERVAS encontradas
+escaneando superposiciones en la base (por kinesiólogo, sala y paciente).
+Termina con código 1 si encontró alguna, así que sirve para validar cualquier
+cambio en validar_superposicion bajo contención.
+
+Uso (desde turnos_backend/):
+    # Contra un servidor ya levantado (misma base que --database-url)
+    python -m benchmarks.carga_reservas --url http://127.0.0.1:8000 --database-url mysql://...
+
+    # Levantando uvicorn con varios workers sobre esa base
+    python -m benchmarks.carga_reservas --lanzar-servidor --workers 4 --database-url mysql://...
+
+    # Base de prueba
+    python -m scripts.generar_datos --escala 0.2 --limpiar
+
+Los turnos se crean en un día hábil libre lejano (o --fecha), así que no se
+mezclan con datos reales y cada corrida empieza con la agenda vacía.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, time as dtime
+
+import numpy as np
+
+from benchmarks.bench_endpoints import proximo_dia_habil
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# PREPARACIÓN Y VERIFICACIÓN (acceso directo a la base)
+# ══════════════════════════════════════════════════════════════════════════
+
+def preparar(db, kinesiologo_id, cantidad_pacientes: int, fecha) -> dict:
+    """Elige kinesiólogo, servicio, sala, pacientes y un día sin turnos para ese kinesiólogo"""
+    from app.models import Kinesiologo, Paciente, Servicio, Sala, Turno
+
+    kinesiologo_id = kinesiologo_id or db.query(Kinesiologo.id).order_by(Kinesiologo.id).limit(1).scalar()
+    servicio = db.query(Servicio).filter(Servicio.duracion_minutos == 30).first() or db.query(Servicio).first()
+    sala_id = db.query(Sala.id).order_by(Sala.id).limit(1).scalar()
+    pacientes = [id_ for (id_,) in db.query(Paciente.id).order_by(Paciente.id).limit(cantidad_pacientes)]
+    if not (kinesiologo_id and servicio and pacientes):
+        raise SystemExit("La base necesita al menos un kinesiólogo, un servicio y pacientes (ver scripts.generar_datos)")
+
+    if fecha is None:
+        fecha = proximo_dia_habil(date.today() + timedelta(days=400))
+        while db.query(Turno.id).filter(Turno.fecha == fecha, Turno.kinesiologo_id == kinesiologo_id).first():
+            fecha = proximo_dia_habil(fecha + timedelta(days=1))
+
+    return {
+        "kinesiologo_id": kinesiologo_id, "servicio_id": servicio.id, "duracion": servicio.duracion_minutos,
+        "sala_id": sala_id, "pacientes": pacientes, "fecha": fecha,
+    }
+
+
+def contar_dobles_reservas(db, fecha) -> dict:
+    """
+    Busca pares de turnos no cancelados que se superponen en el día,
+    por kinesiólogo, por sala y por paciente.
+    """
+    from sqlalchemy import func
+    from sqlalchemy.orm import aliased
+    from app.models import Turno
+
+    a, b = aliased(Turno), aliased(Turno)
+    resultado = {}
+    for columna in ("kinesiologo_id", "sala_id", "paciente_id"):
+        resultado[columna] = (
+            db.query(func.count())
+            .select_from(a)
+            .join(b, (getattr(a, columna) == getattr(b, columna)) & (a.id < b.id))
+            .filter(
+                a.fecha == fecha, b.fecha == fecha,
+                getattr(a, columna).isnot(None),
+                a.estado != "cancelado", b.estado != "cancelado",
+                a.hora_inicio < b.hora_fin, a.hora_fin > b.hora_inicio,
+            )
+            .scalar()
+        )
+    return resultado
+
+
+def estado_locks(db) -> dict:
+    """Contadores de InnoDB (solo MySQL); None en otros motores"""
+    if db.bind.dialect.name != "mysql":
+        return None
+    from sqlalchemy import text
+    estado = {
+        nombre: int(valor)
+        for nombre, valor in db.execute(text("SHOW GLOBAL STATUS WHERE Variable_name IN ('Innodb_row_lock_waits', 'Innodb_row_lock_time')"))
+    }
+    deadlocks = db.execute(text("SELECT COUNT FROM information_schema.INNODB_METRICS WHERE NAME = 'lock_deadlocks'")).scalar()
+    estado["deadlocks"] = int(deadlocks or 0)
+    return estado
+
+
+def diferencia_locks(antes, despues) -> dict:
+    if antes is None or despues is None:
+        return None
+    return {
+        "esperas_de_lock": despues.get("Innodb_row_lock_waits", 0) - antes.get("Innodb_row_lock_waits", 0),
+        "tiempo_en_locks_ms": despues.get("Innodb_row_lock_time", 0) - antes.get("Innodb_row_lock_time", 0),
+        "deadlocks": despues["deadlocks"] - antes["deadlocks"],
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# CARGA
+# ══════════════════════════════════════════════════════════════════════════
+
+def horarios_en_disputa(cantidad: int, paso: int) -> list:
+    """Horarios de inicio desde las 09:00 cada `paso` minutos (con paso < duración se superponen)"""
+    return [dtime(9 + (i * paso) // 60, (i * paso) % 60) for i in range(cantidad)]
+
+
+async def cliente(http, numero: int, datos: dict, horarios: list, intentos: int,
+                  proporcion_mover: float, azar: random.Random, mediciones: dict):
+    """Un paciente que intenta reservar y, si consigue turno, a veces lo reprograma"""
+    paciente_id = datos["pacientes"][numero % len(datos["pacientes"])]
+    mis_turnos = []
+
+    async def registrar(endpoint: str, coro):
+        t0 = time.perf_counter()
+        try:
+            respuesta = await coro
+            codigo = respuesta.status_code
+        except Exception:
+            respuesta, codigo = None, "error_red"
+        mediciones[endpoint]["latencias"].append((time.perf_counter() - t0) * 1000)
+        mediciones[endpoint]["codigos"][codigo] += 1
+        return respuesta
+
+    for _ in range(intentos):
+        hora = azar.choice(horarios)
+        if mis_turnos and azar.random() < proporcion_mover:
+            respuesta = await registrar("PUT /turnos/{id}/mover", http.put(
+                f"/turnos/{azar.choice(mis_turnos)}/mover",
+                params={"nueva_fecha": datos["fecha"].isoformat(), "nueva_hora_inicio": hora.strftime("%H:%M")},
+            ))
+        else:
+            respuesta = await registrar("POST /turnos/", http.post("/turnos/", json={
+                "fecha": datos["fecha"].isoformat(), "hora_inicio": hora.isoformat(), "estado": "pendiente",
+                "paciente_id": paciente_id, "kinesiologo_id": datos["kinesiologo_id"],
+                "servicio_id": datos["servicio_id"], "sala_id": datos["sala_id"],
+            }))
+            if respuesta is not None and respuesta.status_code == 201:
+                mis_turnos.append(respuesta.json()["id"])
+
+
+def resumir(medicion: dict, duracion: float) -> dict:
+    latencias, codigos = medicion["latencias"], medicion["codigos"]
+    total = len(latencias)
+    if not total:
+        return {"requests": 0}
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    contar = lambda desde, hasta: sum(n for c, n in codigos.items() if isinstance(c, int) and desde <= c < hasta)
+    return {
+        "requests": total,
+        "rps": round(total / duracion, 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "exitosos": contar(200, 300),
+        "tasa_4xx": round(contar(400, 500) / total, 4),
+        "tasa_5xx": round(contar(500, 600) / total, 4),
+        "codigos": {str(c): n for c, n in sorted(codigos.items(), key=lambda x: str(x[0]))},
+    }
+
+
+def lanzar_servidor(database_url: str, workers: int, puerto: int) -> subprocess.Popen:
+    import httpx
+
+    entorno = dict(os.environ, DATABASE_URL=database_url)
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(puerto), "--workers", str(workers), "--log-level", "warning"],
+        env=entorno,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{puerto}/", timeout=1).status_code == 200:
+                return proceso
+        except httpx.HTTPError:
+            pass
+        if proceso.poll() is not None:
+            break
+        time.sleep(0.2)
+    proceso.terminate()
+    raise SystemExit("No se pudo levantar el servidor")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="Base del servidor (para preparar y verificar)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Servidor a cargar")
+    parser.add_argument("--lanzar-servidor", action="store_true", help="Levantar uvicorn sobre --database-url")
+    parser.add_argument("--workers", type=int, default=4, help="Workers de uvicorn (con --lanzar-servidor)")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--clientes", type=int, default=50, help="Clientes concurrentes")
+    parser.add_argument("--intentos", type=int, default=10, help="Requests por cliente")
+    parser.add_argument("--horarios", type=int, default=12, help="Horarios de inicio en disputa")
+    parser.add_argument("--paso", type=int, default=15, help="Minutos entre horarios (menor a la duración = superpuestos)")
+    parser.add_argument("--proporcion-mover", type=float, default=0.3)
+    parser.add_argument("--kinesiologo-id", type=int)
+    parser.add_argument("--fecha", type=date.fromisoformat, help="Día a usar (por defecto, uno libre lejano)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("Falta --database-url (o DATABASE_URL)")
+    os.environ["DATABASE_URL"] = args.database_url
+
+    import httpx
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        datos = preparar(db, args.kinesiologo_id, args.clientes, args.fecha)
+        locks_antes = estado_locks(db)
+    finally:
+        db.close()
+
+    servidor = None
+    url = args.url
+    if args.lanzar_servidor:
+        servidor = lanzar_servidor(args.database_url, args.workers, args.puerto)
+        url = f"http://127.0.0.1:{args.puerto}"
+
+    horarios = horarios_en_disputa(args.horarios, args.paso)
+    mediciones = {
+        endpoint: {"latencias": [], "codigos": Counter()}
+        for endpoint in ("POST /turnos/", "PUT /turnos/{id}/mover")
+    }
+
+    async def correr() -> float:
+        limites = httpx.Limits(max_connections=args.clientes, max_keepalive_connections=args.clientes)
+        async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as http:
+            t0 = time.perf_counter()
+            await asyncio.gather(*(
+                cliente(http, i, datos, horarios, args.intentos, args.proporcion_mover,
+                        random.Random(args.semilla + i), mediciones)
+                for i in range(args.clientes)
+            ))
+            return time.perf_counter() - t0
+
+    try:
+        duracion = asyncio.run(correr())
+    finally:
+        if servidor:
+            servidor.terminate()
+            servidor.wait()
+
+    db = SessionLocal()
+    try:
+        dobles = contar_dobles_reservas(db, datos["fecha"])
+        locks = diferencia_locks(locks_antes, estado_locks(db))
+    finally:
+        db.close()
+
+    total_requests = sum(len(m["latencias"]) for m in mediciones.values())
+    resultado = {
+        "meta": {
+            "fecha_prueba": datos["fecha"].isoformat(),
+            "kinesiologo_id": datos["kinesiologo_id"],
+            "clientes": args.clientes,
+            "intentos_por_cliente": args.intentos,
+            "horarios_en_disputa": [h.strftime("%H:%M") for h in horarios],
+            "workers": args.workers if args.lanzar_servidor else None,
+            "motor": args.database_url.split(":", 1)[0],
+            "ejecutado": datetime.now().isoformat(timespec="seconds"),
+        },
+        "duracion_s": round(duracion, 2),
+        "rps_total": round(total_requests / duracion, 2),
+        "endpoints": {endpoint: resumir(m, duracion) for endpoint, m in mediciones.items()},
+        "locks": locks,
+        "dobles_reservas": dobles,
+    }
+
+    salida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida)
+    print(salida)
+
+    if any(dobles.values()):
+        print(f"DOBLES RESERVAS DETECTADAS: {dobles}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
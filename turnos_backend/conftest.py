@@ -0,0 +1,74 @@
+"""
+Configuración de pytest para los tests en proceso (test_consultas_listados.py, ...)
+La app lee DATABASE_URL al importarse: se apunta a un SQLite temporal antes de
+que los tests importen app.*. test_validaciones.py no usa esto (va contra un
+servidor levantado).
+
+Hay réplica de lectura: otro archivo SQLite, copia del primario después de
+sembrarlo. Lo que se escribe en los tests queda solo en el primario, como una
+réplica que todavía no se puso al día.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_DIRECTORIO = tempfile.mkdtemp(prefix="turnos_tests_")
+_PRIMARIO = os.path.join(_DIRECTORIO, "primario.db")
+_REPLICA = os.path.join(_DIRECTORIO, "replica.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_PRIMARIO}"
+os.environ["DATABASE_URL_LECTURA"] = f"sqlite:///{_REPLICA}"
+os.environ.setdefault("SECRET_KEY", "clave-de-tests")
+os.environ["ADMISION_HABILITADA"] = "false"
+os.environ["CAPTURA_HABILITADA"] = "false"
+
+# Hash fijo de "Admin123" (bcrypt con costo 4): hashear cada usuario sembrado haría lentos los tests
+PASSWORD_HASH = "$2b$04$hItmyBImbwMaUbqay7pYBehmghFYzEsMhdoE.dA5u1.9XR2Ik4ioK"
+
+
+@pytest.fixture(scope="session")
+def bd():
+    """Crea las tablas y siembra usuarios, pacientes y kinesiólogos (100 de cada uno)"""
+    from app.database import Base, SessionLocal, engine
+    import app.models as m
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    roles = {nombre: m.Role(name=nombre) for nombre in ["admin", "paciente", "kinesiologo", "recepcionista"]}
+    db.add_all(roles.values())
+    db.add(m.User(nombre="Admin", email="admin@example.com", password_hash=PASSWORD_HASH, roles=[roles["admin"]]))
+    for i in range(100):
+        db.add(m.Paciente(
+            dni=f"{30000000 + i}",
+            user=m.User(nombre=f"Paciente {i}", email=f"p{i}@example.com", password_hash=PASSWORD_HASH,
+                        roles=[roles["paciente"], roles["recepcionista"]]),
+        ))
+        db.add(m.Kinesiologo(
+            matricula_profesional=f"MP{i:04d}",
+            user=m.User(nombre=f"Kine {i}", email=f"k{i}@example.com", password_hash=PASSWORD_HASH,
+                        roles=[roles["kinesiologo"], roles["recepcionista"]]),
+        ))
+    db.commit()
+    db.close()
+    shutil.copyfile(_PRIMARIO, _REPLICA)
+    yield engine
+
+
+@pytest.fixture(scope="session")
+def cliente(bd):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def encabezados():
+    """Headers con un token válido para el email dado (ej: encabezados("admin@example.com"))"""
+    from app.core.security import create_access_token
+
+    def _encabezados(email: str, **extra) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': email})}", **extra}
+
+    return _encabezados
@@ -0,0 +1,445 @@
+"""
+Generador de datos sintéticos para pruebas de escala
+
+Llena el esquema con datos realistas y reproducibles (misma semilla, mismos datos):
+kinesiólogos con horarios semanales (HorarioKinesiologo), salas, servicios con
+duraciones reales, pacientes con DNI y teléfono válidos, años de turnos sin
+superposición (por kinesiólogo, sala y paciente) con distribución real de
+estados, e historias clínicas vinculadas a los turnos atendidos.
+
+Las inserciones van en bloques (executemany con ids explícitos), sin pasar por
+el ORM, así que 10 millones de turnos cargan en minutos.
+
+Tamaños de referencia (--escala multiplica kinesiólogos y pacientes):
+    1x   ->  15 kinesiólogos,   4.000 pacientes,  ~90 mil turnos en 3 años
+    10x  -> 150 kinesiólogos,  40.000 pacientes, ~900 mil turnos
+    100x -> 1500 kinesiólogos, 400.000 pacientes,  ~9 millones de turnos
+
+Uso (desde turnos_backend/):
+    python -m scripts.generar_datos --escala 10 --semilla 42 --limpiar
+    python -m scripts.generar_datos --kinesiologos 5 --pacientes 300 --anios 1 --indexar
+
+Todos los usuarios generados tienen la contraseña de --password.
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta, time as dtime
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from app.database import Base, SessionLocal, engine
+from app.core.security import get_password_hash
+from app.models import (
+    Role, User, UserRole, Paciente, Kinesiologo, Servicio, Sala, Turno, HorarioKinesiologo, HistoriaClinica
+)
+
+
+KINESIOLOGOS_1X = 15
+PACIENTES_1X = 4000
+
+DIAS_SEMANA = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes")
+TURNOS_DEL_DIA = {"mañana": (dtime(8, 0), dtime(14, 0)), "tarde": (dtime(14, 0), dtime(20, 0))}
+
+SERVICIOS = (
+    ("Kinesiología general", 30),
+    ("Rehabilitación traumatológica", 45),
+    ("Kinesiología deportiva", 45),
+    ("Reeducación postural global", 60),
+    ("Drenaje linfático", 60),
+    ("Fisioterapia respiratoria", 30),
+)
+# Probabilidad de cada servicio (mismo orden que SERVICIOS)
+PESOS_SERVICIOS = (0.35, 0.25, 0.15, 0.1, 0.05, 0.1)
+
+ESPECIALIDADES = ("Traumatología", "Deportiva", "Neurológica", "Respiratoria", "Pediátrica", "Geriátrica")
+
+# Distribución de estados: turnos pasados y futuros
+ESTADOS_PASADOS = (("completado", 0.72), ("finalizado", 0.06), ("cancelado", 0.14), ("pendiente", 0.05), ("confirmado", 0.03))
+ESTADOS_FUTUROS = (("pendiente", 0.62), ("confirmado", 0.28), ("cancelado", 0.10))
+# Fracción de horarios disponibles que terminan ocupados
+OCUPACION = 0.78
+
+NOMBRES = (
+    "Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Jorge", "Sofía", "Diego", "Valentina", "Pablo",
+    "Camila", "Martín", "Lucía", "Sergio", "Florencia", "Nicolás", "Julieta", "Gustavo", "Agustina",
+    "Ricardo", "Paula", "Fernando", "Carolina", "Hernán", "Micaela", "Marcelo", "Gabriela", "Tomás", "Rocío",
+)
+APELLIDOS = (
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez", "Flores", "Benítez", "Acosta", "Medina",
+    "Herrera", "Suárez", "Aguirre", "Giménez", "Gutiérrez", "Pereyra", "Molina", "Castro", "Ortiz", "Silva",
+)
+OBRAS_SOCIALES = ("Osde", "Swiss Medical", "Galeno", "Pami", "Ioma", "Osdepym", "Medifé", "Omint", None)
+CALLES = ("San Martín", "Belgrano", "Rivadavia", "Mitre", "Sarmiento", "Junín", "Córdoba", "9 De Julio", "Moreno")
+CODIGOS_AREA = ("11", "379", "351", "341", "261", "381", "223")
+
+# Cuadros clínicos: (motivo, diagnóstico, tratamiento, evoluciones posibles)
+CUADROS = (
+    ("Dolor lumbar", "Lumbalgia mecánica", "Ejercicios de estabilización lumbar y fisioterapia analgésica",
+     ("Disminución del dolor", "Mejora de la movilidad", "Sin cambios significativos")),
+    ("Dolor de rodilla post esguince", "Esguince de ligamento colateral medial", "Crioterapia, fortalecimiento de cuádriceps",
+     ("Mejora de la estabilidad", "Persiste edema leve", "Alta deportiva próxima")),
+    ("Rehabilitación post quirúrgica de LCA", "Postoperatorio de plástica de LCA", "Protocolo de rehabilitación de LCA fase 2",
+     ("Recupera extensión completa", "Flexión de 110 grados", "Inicia trote")),
+    ("Dolor cervical", "Cervicalgia tensional", "Terapia manual, elongación y corrección postural",
+     ("Disminución de contracturas", "Mejora del rango cervical", "Cefaleas menos frecuentes")),
+    ("Dolor de hombro", "Tendinopatía del supraespinoso", "Ejercicios excéntricos y ultrasonido",
+     ("Mejora la elevación del brazo", "Dolor nocturno disminuido", "Sin dolor en actividades diarias")),
+    ("Esguince de tobillo", "Esguince de tobillo grado II", "Propiocepción, fortalecimiento de peroneos",
+     ("Marcha sin claudicación", "Mejora del equilibrio monopodal", "Persiste inestabilidad leve")),
+    ("Dificultad respiratoria", "EPOC moderado", "Kinesiología respiratoria y entrenamiento aeróbico",
+     ("Mejora la tolerancia al esfuerzo", "Disminuye la disnea", "Saturación estable")),
+)
+
+
+def escalar(args):
+    """Resuelve kinesiólogos / pacientes a partir de --escala cuando no se pasan explícitos"""
+    kinesiologos = args.kinesiologos or round(KINESIOLOGOS_1X * args.escala)
+    pacientes = args.pacientes or round(PACIENTES_1X * args.escala)
+    return max(kinesiologos, 1), max(pacientes, 1)
+
+
+def siguiente_id(conn, tabla) -> int:
+    return (conn.execute(select(func.max(tabla.c.id))).scalar() or 0) + 1
+
+
+def insertar_en_bloques(tabla, filas, lote: int) -> int:
+    """Inserta un iterable de dicts con executemany, un commit por bloque"""
+    total, bloque = 0, []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) >= lote:
+            with engine.begin() as conn:
+                conn.execute(insert(tabla), bloque)
+            total += len(bloque)
+            bloque = []
+    if bloque:
+        with engine.begin() as conn:
+            conn.execute(insert(tabla), bloque)
+        total += len(bloque)
+    return total
+
+
+def asegurar_roles(db) -> dict:
+    roles = {}
+    for nombre in ("admin", "paciente", "kinesiologo", "recepcionista"):
+        rol = db.query(Role).filter(Role.name == nombre).first()
+        if not rol:
+            rol = Role(name=nombre)
+            db.add(rol)
+            db.flush()
+        roles[nombre] = rol.id
+    db.commit()
+    return roles
+
+
+def nombre_completo(rng) -> str:
+    return f"{NOMBRES[rng.integers(len(NOMBRES))]} {APELLIDOS[rng.integers(len(APELLIDOS))]}"
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# CATÁLOGOS Y PERSONAS
+# ══════════════════════════════════════════════════════════════════════════
+
+def generar_catalogos(cantidad_salas: int) -> tuple:
+    """Servicios y salas; devuelve (servicios [(id, duracion)], ids de salas)"""
+    with engine.begin() as conn:
+        primer_servicio = siguiente_id(conn, Servicio.__table__)
+        conn.execute(insert(Servicio.__table__), [
+            {"id": primer_servicio + i, "nombre": nombre, "duracion_minutos": duracion}
+            for i, (nombre, duracion) in enumerate(SERVICIOS)
+        ])
+        primera_sala = siguiente_id(conn, Sala.__table__)
+        conn.execute(insert(Sala.__table__), [
+            {"id": primera_sala + i, "nombre": f"Box {i + 1}", "ubicacion": "Planta baja" if i % 2 == 0 else "Primer piso"}
+            for i in range(cantidad_salas)
+        ])
+    servicios = [(primer_servicio + i, duracion) for i, (_, duracion) in enumerate(SERVICIOS)]
+    return servicios, list(range(primera_sala, primera_sala + cantidad_salas))
+
+
+def generar_usuarios(rng, cantidad: int, rol_id: int, dominio: str, password_hash: str, lote: int) -> int:
+    """Inserta usuarios + user_roles con ids explícitos; devuelve el primer id"""
+    with engine.connect() as conn:
+        primer_id = siguiente_id(conn, User.__table__)
+    nombres = [nombre_completo(rng) for _ in range(cantidad)]
+
+    def usuarios():
+        for i, nombre in enumerate(nombres):
+            user_id = primer_id + i
+            usuario = nombre.lower().replace(" ", ".").translate(str.maketrans("áéíóú", "aeiou"))
+            yield {"id": user_id, "nombre": nombre, "email": f"{usuario}.{user_id}@{dominio}",
+                   "password_hash": password_hash, "activo": True}
+
+    insertar_en_bloques(User.__table__, usuarios(), lote)
+    insertar_en_bloques(UserRole.__table__, ({"user_id": primer_id + i, "role_id": rol_id} for i in range(cantidad)), lote)
+    return primer_id
+
+
+def generar_kinesiologos(rng, cantidad: int, roles: dict, password_hash: str, salas: list, lote: int) -> list:
+    """
+    Cada sala se comparte entre dos kinesiólogos, uno de mañana y otro de tarde,
+    así los turnos nunca se superponen por sala.
+
+    Returns:
+        Lista de (kinesiologo_id, sala_id, dias_que_atiende, hora_inicio, hora_fin)
+    """
+    primer_user = generar_usuarios(rng, cantidad, roles["kinesiologo"], "kinesiologos.demo.com.ar", password_hash, lote)
+    with engine.connect() as conn:
+        primer_id = siguiente_id(conn, Kinesiologo.__table__)
+
+    kinesiologos, horarios = [], []
+    for i in range(cantidad):
+        kine_id = primer_id + i
+        turno_del_dia = "mañana" if i % 2 == 0 else "tarde"
+        inicio, fin = TURNOS_DEL_DIA[turno_del_dia]
+        # La mayoría atiende los 5 días; algunos libran un día fijo
+        dias = [d for d in range(5) if not (rng.random() < 0.3 and d == rng.integers(5))]
+        kinesiologos.append((kine_id, salas[(i // 2) % len(salas)], frozenset(dias), inicio, fin))
+        horarios.extend(
+            {"kinesiologo_id": kine_id, "dia_semana": DIAS_SEMANA[d], "hora_inicio": inicio, "hora_fin": fin} for d in dias
+        )
+
+    insertar_en_bloques(Kinesiologo.__table__, (
+        {"id": primer_id + i, "user_id": primer_user + i, "matricula_profesional": f"MP-{primer_id + i:06d}",
+         "especialidad": ESPECIALIDADES[rng.integers(len(ESPECIALIDADES))]}
+        for i in range(cantidad)
+    ), lote)
+    insertar_en_bloques(HorarioKinesiologo.__table__, horarios, lote)
+    return kinesiologos
+
+
+def generar_pacientes(rng, cantidad: int, roles: dict, password_hash: str, lote: int) -> tuple:
+    """
+    Pacientes con DNI único (derivado del id, 8 dígitos) y teléfono válido.
+
+    Returns:
+        (primer_paciente_id, cuadro clínico de cada paciente, peso base, altura)
+    """
+    primer_user = generar_usuarios(rng, cantidad, roles["paciente"], "pacientes.demo.com.ar", password_hash, lote)
+    with engine.connect() as conn:
+        primer_id = siguiente_id(conn, Paciente.__table__)
+
+    def pacientes():
+        for i in range(cantidad):
+            paciente_id = primer_id + i
+            yield {
+                "id": paciente_id,
+                "user_id": primer_user + i,
+                "dni": str(10_000_000 + paciente_id * 7 + int(rng.integers(7))),
+                "telefono": f"+54 {CODIGOS_AREA[rng.integers(len(CODIGOS_AREA))]} {rng.integers(4_000_000, 4_999_999)}",
+                "obra_social": OBRAS_SOCIALES[rng.integers(len(OBRAS_SOCIALES))],
+                "direccion": f"{CALLES[rng.integers(len(CALLES))]} {rng.integers(100, 3000)}",
+            }
+
+    insertar_en_bloques(Paciente.__table__, pacientes(), lote)
+    cuadros = rng.integers(len(CUADROS), size=cantidad)
+    pesos = rng.normal(72, 13, size=cantidad).clip(40, 140)
+    alturas = rng.normal(168, 9, size=cantidad).clip(145, 200)
+    return primer_id, cuadros, pesos, alturas
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# TURNOS E HISTORIAS
+# ══════════════════════════════════════════════════════════════════════════
+
+def sumar_minutos(hora: dtime, minutos: int) -> dtime:
+    total = hora.hour * 60 + hora.minute + minutos
+    return dtime(total // 60, total % 60)
+
+
+def generar_turnos(rng, kinesiologos: list, servicios: list, primer_paciente: int, cantidad_pacientes: int,
+                   desde: date, hasta: date, datos_pacientes: tuple, proporcion_historias: float, lote: int) -> tuple:
+    """
+    Recorre cada día hábil y cada kinesiólogo llenando su franja horaria con
+    turnos consecutivos (con huecos según OCUPACION). Un paciente tiene como
+    máximo un turno por día, así que tampoco hay superposición por paciente.
+    La frecuencia de pacientes sigue una distribución de cola larga.
+
+    Returns:
+        (turnos insertados, historias insertadas)
+    """
+    cuadros, pesos, alturas = datos_pacientes
+    hoy = date.today()
+    with engine.connect() as conn:
+        siguiente_turno = siguiente_id(conn, Turno.__table__)
+
+    ids_servicios = np.array([s[0] for s in servicios])
+    duraciones = {s[0]: s[1] for s in servicios}
+    pesos_servicios = np.array(PESOS_SERVICIOS) / sum(PESOS_SERVICIOS)
+    # Cola larga: unos pocos pacientes concentran muchos turnos
+    peso_pacientes = 1.0 / np.arange(1, cantidad_pacientes + 1) ** 0.6
+    peso_pacientes /= peso_pacientes.sum()
+    orden_pacientes = rng.permutation(cantidad_pacientes)
+
+    estados_pasados, prob_pasados = zip(*ESTADOS_PASADOS)
+    estados_futuros, prob_futuros = zip(*ESTADOS_FUTUROS)
+
+    historias = []
+    contador = {"turnos": 0, "historias": 0}
+
+    def volcar_historias():
+        contador["historias"] += insertar_en_bloques(HistoriaClinica.__table__, historias, lote)
+        historias.clear()
+
+    def turnos():
+        nonlocal siguiente_turno
+        # Intentos máximos por kinesiólogo y día: franja de 6 h en pasos de 15 min, más el corte
+        intentos = len(kinesiologos) * 26
+        dia = desde
+        while dia <= hasta:
+            if dia.weekday() < 5:
+                pasado = dia < hoy
+                estados, probabilidades = (estados_pasados, prob_pasados) if pasado else (estados_futuros, prob_futuros)
+                ocupados_hoy = set()
+                # Sorteos del día en bloque (mucho más rápido que de a uno)
+                candidatos = iter(orden_pacientes[rng.choice(cantidad_pacientes, size=len(kinesiologos) * 20, p=peso_pacientes)].tolist())
+                servicios_dia = rng.choice(ids_servicios, size=intentos, p=pesos_servicios).tolist()
+                ocupa = (rng.random(intentos) < OCUPACION).tolist()
+                estados_dia = rng.choice(len(estados), size=intentos, p=probabilidades).tolist()
+                con_historia = (rng.random(intentos) < proporcion_historias).tolist()
+                ruido = rng.normal(size=(intentos, 4)).tolist()
+                relacion_diastolica = rng.uniform(0.6, 0.7, size=intentos).tolist()
+                evolucion = rng.integers(3, size=intentos).tolist()
+                j = 0
+
+                for kine_id, sala_id, dias, inicio, fin in kinesiologos:
+                    if dia.weekday() not in dias:
+                        continue
+                    hora = inicio
+                    while True:
+                        servicio_id = servicios_dia[j]
+                        j += 1
+                        hora_fin = sumar_minutos(hora, duraciones[servicio_id])
+                        if hora_fin > fin:
+                            break
+                        if not ocupa[j]:
+                            hora = sumar_minutos(hora, 15)
+                            continue
+
+                        indice = next(candidatos, None)
+                        while indice is not None and indice in ocupados_hoy:
+                            indice = next(candidatos, None)
+                        if indice is None:
+                            break
+                        ocupados_hoy.add(indice)
+
+                        turno_id = siguiente_turno
+                        siguiente_turno += 1
+                        estado = estados[estados_dia[j]]
+                        motivo, diagnostico, tratamiento, evoluciones = CUADROS[cuadros[indice]]
+                        yield {
+                            "id": turno_id, "fecha": dia, "hora_inicio": hora, "hora_fin": hora_fin, "estado": estado,
+                            "motivo": motivo, "paciente_id": primer_paciente + indice,
+                            "kinesiologo_id": kine_id, "servicio_id": servicio_id, "sala_id": sala_id,
+                        }
+
+                        if estado in ("completado", "finalizado") and con_historia[j]:
+                            # Signos vitales con deriva lenta alrededor de la base del paciente
+                            r_peso, r_sistolica, r_fc, r_temp = ruido[j]
+                            pesos[indice] += 0.4 * r_peso
+                            sistolica = int(122 + 10 * r_sistolica)
+                            historias.append({
+                                "paciente_id": primer_paciente + indice, "kinesiologo_id": kine_id, "turno_id": turno_id,
+                                "fecha_consulta": datetime.combine(dia, hora),
+                                "peso": round(float(pesos[indice]), 1), "altura": round(float(alturas[indice]), 1),
+                                "presion_arterial": f"{sistolica}/{int(sistolica * relacion_diastolica[j])}",
+                                "frecuencia_cardiaca": int(74 + 9 * r_fc), "temperatura": round(36.5 + 0.3 * r_temp, 1),
+                                "motivo_consulta": motivo, "diagnostico": diagnostico, "tratamiento": tratamiento,
+                                "evolucion": evoluciones[evolucion[j]],
+                                "created_at": datetime.combine(dia, hora_fin), "updated_at": datetime.combine(dia, hora_fin),
+                            })
+                        hora = hora_fin
+
+                # Las historias referencian turnos: se insertan cuando sus turnos ya se volcaron
+                if len(historias) >= lote:
+                    yield None
+            dia += timedelta(days=1)
+        yield None
+
+    bloque = []
+    for fila in turnos():
+        if fila is not None:
+            bloque.append(fila)
+        if fila is None or len(bloque) >= lote:
+            if bloque:
+                contador["turnos"] += insertar_en_bloques(Turno.__table__, bloque, lote)
+                bloque = []
+            if fila is None and historias:
+                volcar_historias()
+    return contador["turnos"], contador["historias"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=float, default=1.0, help="Multiplicador sobre el tamaño de producción (1x)")
+    parser.add_argument("--kinesiologos", type=int, help=f"Cantidad de kinesiólogos (por defecto {KINESIOLOGOS_1X} x escala)")
+    parser.add_argument("--pacientes", type=int, help=f"Cantidad de pacientes (por defecto {PACIENTES_1X} x escala)")
+    parser.add_argument("--anios", type=float, default=3, help="Años de turnos hacia atrás")
+    parser.add_argument("--meses-futuro", type=int, default=2, help="Meses de turnos ya agendados hacia adelante")
+    parser.add_argument("--historias", type=float, default=0.85, help="Fracción de turnos atendidos con historia clínica")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=10_000, help="Filas por INSERT")
+    parser.add_argument("--password", default="Clinica123", help="Contraseña de todos los usuarios generados")
+    parser.add_argument("--admin-email", default="admin@clinica.demo.com.ar", help="Admin a crear si no existe")
+    parser.add_argument("--limpiar", action="store_true", help="Borra y recrea TODAS las tablas antes de generar")
+    parser.add_argument("--indexar", action="store_true", help="Reconstruye el índice de búsqueda de historias al final")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.semilla)
+    cantidad_kines, cantidad_pacientes = escalar(args)
+    inicio_total = time.perf_counter()
+
+    if args.limpiar:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    password_hash = get_password_hash(args.password)
+    db = SessionLocal()
+    try:
+        roles = asegurar_roles(db)
+        if not db.query(User.id).filter(User.email == args.admin_email).first():
+            db.execute(insert(User.__table__).values(nombre="Administrador", email=args.admin_email, password_hash=password_hash, activo=True))
+            admin_id = db.query(User.id).filter(User.email == args.admin_email).scalar()
+            db.execute(insert(UserRole.__table__).values(user_id=admin_id, role_id=roles["admin"]))
+            db.commit()
+    finally:
+        db.close()
+
+    def paso(descripcion: str, inicio: float):
+        print(f"{descripcion} ({time.perf_counter() - inicio:.1f}s)")
+
+    t = time.perf_counter()
+    servicios, salas = generar_catalogos(max(1, (cantidad_kines + 1) // 2))
+    kinesiologos = generar_kinesiologos(rng, cantidad_kines, roles, password_hash, salas, args.lote)
+    paso(f"{cantidad_kines} kinesiólogos, {len(salas)} salas, {len(servicios)} servicios", t)
+
+    t = time.perf_counter()
+    primer_paciente, *datos_pacientes = generar_pacientes(rng, cantidad_pacientes, roles, password_hash, args.lote)
+    paso(f"{cantidad_pacientes} pacientes", t)
+
+    t = time.perf_counter()
+    hoy = date.today()
+    total_turnos, total_historias = generar_turnos(
+        rng, kinesiologos, servicios, primer_paciente, cantidad_pacientes,
+        hoy - timedelta(days=round(365 * args.anios)), hoy + timedelta(days=30 * args.meses_futuro),
+        tuple(datos_pacientes), args.historias, args.lote,
+    )
+    paso(f"{total_turnos} turnos y {total_historias} historias clínicas", t)
+
+    if args.indexar:
+        from app.core.busqueda import reindexar_todo
+        t = time.perf_counter()
+        db = SessionLocal()
+        try:
+            reindexar_todo(db)
+        finally:
+            db.close()
+        paso("Índice de búsqueda reconstruido", t)
+
+    print(f"Listo en {time.perf_counter() - inicio_total:.1f}s. Admin: {args.admin_email} / contraseña de todos los usuarios: {args.password}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Reconstruye el índice de búsqueda de historias clínicas (tabla historia_terminos)
+
+Uso (desde turnos_backend/):
+    python -m scripts.reindexar_historias --lote 1000
+"""
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.core.busqueda import reindexar_todo
+from app.core.esquema import crear_tablas_agregadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=1000, help="Historias por commit")
+    args = parser.parse_args()
+
+    # Crea la tabla del índice si todavía no existe
+    crear_tablas_agregadas()
+
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        total = reindexar_todo(db, lote=args.lote)
+        print(f"Historias indexadas: {total} en {time.perf_counter() - inicio:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Reproduce tráfico capturado (CAPTURA_HABILITADA=true) contra una instancia de staging
+
+Re-emite cada request del archivo NDJSON respetando los tiempos entre llegadas
+(acelerados por --velocidad, de 1x a 10x) y, por lo tanto, la concurrencia
+original. Como la captura está anonimizada, los textos y bodies se sintetizan
+a partir de su forma (mismo tipo y largo); los ids de la ruta y los query params
+no sensibles se usan tal cual.
+
+Al final compara, por ruta, la distribución de latencias original contra la
+reproducida (p50 / p95 / p99), el mix de códigos de respuesta y la concurrencia
+máxima alcanzada.
+
+Uso (desde turnos_backend/):
+    python -m scripts.reproducir_trafico captura_trafico.ndjson --url http://staging:8000 \\
+        --email admin@clinica.com --password ... --velocidad 3 --salida comparacion.json
+
+Por defecto solo se reproducen GET; --incluir-escrituras agrega POST / PUT /
+PATCH / DELETE (usar solo contra bases descartables).
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+
+
+METODOS_LECTURA = ("GET", "HEAD")
+
+
+def leer_captura(archivo: str, incluir_escrituras: bool, limite: int = None) -> list:
+    eventos = []
+    with open(archivo, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            evento = json.loads(linea)
+            if evento["ruta"] == "<sin_ruta>":
+                continue
+            if not incluir_escrituras and evento["metodo"] not in METODOS_LECTURA:
+                continue
+            eventos.append(evento)
+            if limite and len(eventos) >= limite:
+                break
+    eventos.sort(key=lambda e: e["ts"])
+    return eventos
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# SÍNTESIS DE VALORES ANONIMIZADOS
+# ══════════════════════════════════════════════════════════════════════════
+
+def _fecha_sintetica() -> str:
+    fecha = date.today() + timedelta(days=30)
+    while fecha.weekday() >= 5:
+        fecha += timedelta(days=1)
+    return fecha.isoformat()
+
+
+def sintetizar(forma):
+    """Genera un valor con la forma registrada por app.core.captura.forma_json"""
+    if isinstance(forma, dict):
+        if "_lista" in forma:
+            return [sintetizar(forma["_item"]) for _ in range(forma["_lista"])] if forma["_item"] is not None else []
+        return {clave: sintetizar(valor) for clave, valor in forma.items()}
+    if forma == "int":
+        return 1
+    if forma == "float":
+        return 1.0
+    if forma == "bool":
+        return True
+    if forma == "null":
+        return None
+    if forma == "date":
+        return _fecha_sintetica()
+    if forma == "time":
+        return "10:00"
+    if isinstance(forma, str) and forma.startswith("texto:"):
+        return "x" * max(int(forma.split(":", 1)[1]), 1)
+    # Valores categóricos conservados en la captura (ej: estado)
+    return forma
+
+
+def armar_request(evento: dict):
+    """
+    Returns:
+        (metodo, url, params, json) o None si faltan datos para completar la ruta
+    """
+    try:
+        url = evento["ruta"].format(**evento["path_params"])
+    except KeyError:
+        return None
+    params = {
+        clave: sintetizar(valor.strip("<>")) if valor.startswith("<texto:") else valor
+        for clave, valor in evento["query"].items()
+    }
+    cuerpo = evento.get("body")
+    if isinstance(cuerpo, dict) and "_bytes" in cuerpo:
+        # Bodies no JSON (ej: archivos) no se reproducen
+        return None
+    return evento["metodo"], url, params, sintetizar(cuerpo) if cuerpo is not None else None
+
+
+# ══════════════════════════════════════════════════════════════════════════
+# REPRODUCCIÓN Y COMPARACIÓN
+# ══════════════════════════════════════════════════════════════════════════
+
+def concurrencia_maxima(intervalos: list) -> int:
+    """Máximo de requests en vuelo a la vez, dados (inicio, fin)"""
+    marcas = sorted([(inicio, 1) for inicio, _ in intervalos] + [(fin, -1) for _, fin in intervalos])
+    actual = maximo = 0
+    for _, delta in marcas:
+        actual += delta
+        maximo = max(maximo, actual)
+    return maximo
+
+
+def percentiles(valores: list) -> dict:
+    if not valores:
+        return {}
+    p50, p95, p99 = np.percentile(valores, [50, 95, 99])
+    return {"n": len(valores), "p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2)}
+
+
+async def reproducir(eventos: list, url: str, headers: dict, velocidad: float, max_conexiones: int) -> list:
+    """Lanza cada request en su instante relativo / velocidad; devuelve una medición por evento"""
+    mediciones = []
+    inicio_original = eventos[0]["ts"]
+    limites = httpx.Limits(max_connections=max_conexiones, max_keepalive_connections=max_conexiones)
+
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limites, timeout=60) as http:
+        inicio = time.perf_counter()
+
+        async def una(evento: dict, request: tuple):
+            espera = (evento["ts"] - inicio_original) / velocidad - (time.perf_counter() - inicio)
+            if espera > 0:
+                await asyncio.sleep(espera)
+            metodo, ruta, params, cuerpo = request
+            t0 = time.perf_counter()
+            try:
+                respuesta = await http.request(metodo, ruta, params=params, json=cuerpo)
+                codigo = respuesta.status_code
+            except httpx.HTTPError:
+                codigo = "error_red"
+            t1 = time.perf_counter()
+            mediciones.append({
+                "clave": f"{evento['metodo']} {evento['ruta']}", "codigo": codigo,
+                "inicio": t0 - inicio, "fin": t1 - inicio, "duracion_ms": (t1 - t0) * 1000,
+            })
+
+        tareas = []
+        for evento in eventos:
+            request = armar_request(evento)
+            if request is not None:
+                tareas.append(una(evento, request))
+        await asyncio.gather(*tareas)
+    return mediciones
+
+
+def comparar(eventos: list, mediciones: list, velocidad: float) -> dict:
+    originales, reproducidas = defaultdict(list), defaultdict(list)
+    codigos_originales, codigos_reproducidos = defaultdict(Counter), defaultdict(Counter)
+    for evento in eventos:
+        clave = f"{evento['metodo']} {evento['ruta']}"
+        originales[clave].append(evento["duracion_ms"])
+        codigos_originales[clave][str(evento["codigo"])] += 1
+    for medicion in mediciones:
+        reproducidas[medicion["clave"]].append(medicion["duracion_ms"])
+        codigos_reproducidos[medicion["clave"]][str(medicion["codigo"])] += 1
+
+    rutas = {}
+    for clave in sorted(reproducidas):
+        original, reproducida = percentiles(originales[clave]), percentiles(reproducidas[clave])
+        rutas[clave] = {
+            "original": original,
+            "reproducido": reproducida,
+            "ratio_p95": round(reproducida["p95_ms"] / original["p95_ms"], 2) if original.get("p95_ms") else None,
+            "codigos_original": dict(codigos_originales[clave]),
+            "codigos_reproducido": dict(codigos_reproducidos[clave]),
+        }
+
+    duracion_original = (eventos[-1]["ts"] - eventos[0]["ts"]) or 1e-9
+    duracion_reproducida = max(m["fin"] for m in mediciones) if mediciones else 1e-9
+    return {
+        "velocidad": velocidad,
+        "requests": {"capturados": len(eventos), "reproducidos": len(mediciones)},
+        "rps": {
+            "original": round(len(eventos) / duracion_original, 2),
+            "objetivo": round(len(eventos) / duracion_original * velocidad, 2),
+            "alcanzado": round(len(mediciones) / duracion_reproducida, 2),
+        },
+        "concurrencia_maxima": {
+            "original": concurrencia_maxima([(e["ts"], e["ts"] + e["duracion_ms"] / 1000) for e in eventos]),
+            "reproducida": concurrencia_maxima([(m["inicio"], m["fin"]) for m in mediciones]),
+        },
+        "rutas": rutas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo", help="Captura NDJSON")
+    parser.add_argument("--url", required=True, help="Instancia de staging")
+    parser.add_argument("--velocidad", type=float, default=1.0, help="Aceleración de los tiempos entre llegadas (1 a 10)")
+    parser.add_argument("--token", help="Bearer token para las requests autenticadas")
+    parser.add_argument("--email", help="Login para obtener el token (alternativa a --token)")
+    parser.add_argument("--password")
+    parser.add_argument("--incluir-escrituras", action="store_true", help="Reproducir también POST / PUT / PATCH / DELETE")
+    parser.add_argument("--limite", type=int, help="Máximo de requests a reproducir")
+    parser.add_argument("--max-conexiones", type=int, default=500)
+    parser.add_argument("--salida", help="Archivo JSON con la comparación")
+    args = parser.parse_args()
+
+    if not 1 <= args.velocidad <= 10:
+        parser.error("--velocidad debe estar entre 1 y 10")
+
+    eventos = leer_captura(args.archivo, args.incluir_escrituras, args.limite)
+    if not eventos:
+        raise SystemExit("La captura no tiene requests reproducibles")
+
+    token = args.token
+    if not token and args.email:
+        respuesta = httpx.post(f"{args.url}/auth/login", json={"email": args.email, "password": args.password})
+        respuesta.raise_for_status()
+        token = respuesta.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    duracion = (eventos[-1]["ts"] - eventos[0]["ts"]) / args.velocidad
+    print(f"Reproduciendo {len(eventos)} requests en ~{duracion:.0f}s (x{args.velocidad})", file=sys.stderr)
+    mediciones = asyncio.run(reproducir(eventos, args.url, headers, args.velocidad, args.max_conexiones))
+
+    comparacion = comparar(eventos, mediciones, args.velocidad)
+    salida = json.dumps(comparacion, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida)
+    print(salida)
+
+
+if __name__ == "__main__":
+    main()
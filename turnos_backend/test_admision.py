@@ -0,0 +1,70 @@
+"""
+Control de admisión: ante saturación se rechazan primero las rutas de baja
+prioridad, después las normales, y nunca las críticas. La espera por un hilo
+se mide en el limitador del threadpool.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import admision
+from app.core.admision import BAJA, CRITICA, NORMAL, AdmisionMiddleware, ControlAdmision, prioridad_ruta
+from app.core.metricas import metricas
+
+
+@pytest.mark.parametrize("metodo, ruta, prioridad", [
+    ("POST", "/auth/login", CRITICA),
+    ("GET", "/recepcion/agenda-hoy", CRITICA),
+    ("POST", "/turnos/", CRITICA),
+    ("GET", "/exportar/turnos", BAJA),
+    ("GET", "/historias-clinicas/paciente/1/estadisticas", BAJA),
+    ("GET", "/turnos/calendario/", BAJA),
+    ("GET", "/pacientes/", BAJA),
+    ("GET", "/pacientes/1", NORMAL),
+    ("PUT", "/pacientes/1", NORMAL),
+])
+def test_prioridad_ruta(metodo, ruta, prioridad):
+    assert prioridad_ruta(metodo, ruta) == prioridad
+
+
+def test_por_cola_se_rechaza_baja_antes_que_normal():
+    control = ControlAdmision(cola_maxima=10, p95_objetivo_ms=1e9)
+    assert [control.motivo_rechazo(p, 10) for p in (BAJA, NORMAL, CRITICA)] == ["cola", None, None]
+    assert [control.motivo_rechazo(p, 20) for p in (BAJA, NORMAL, CRITICA)] == ["cola", "cola", None]
+
+
+def test_por_p95_se_rechaza_baja_antes_que_normal():
+    control = ControlAdmision(cola_maxima=1000, p95_objetivo_ms=100)
+    for _ in range(50):
+        control.registrar_espera(150)
+    assert [control.motivo_rechazo(p, 0) for p in (BAJA, NORMAL, CRITICA)] == ["p95", None, None]
+
+
+@pytest.fixture
+def cliente_con_admision(bd, monkeypatch):
+    from app.main import app
+
+    control = ControlAdmision(cola_maxima=1000, p95_objetivo_ms=100)
+    for _ in range(50):
+        control.registrar_espera(150)
+    monkeypatch.setattr(admision, "control", control)
+    return TestClient(AdmisionMiddleware(app))
+
+
+def test_middleware_rechaza_solo_baja_prioridad(cliente_con_admision, encabezados):
+    rechazada = cliente_con_admision.get("/pacientes/")
+    assert rechazada.status_code == 503
+    assert rechazada.headers["retry-after"]
+
+    assert cliente_con_admision.get("/pacientes/1", headers=encabezados("admin@example.com")).status_code == 200
+    assert cliente_con_admision.post("/auth/login", data={"username": "x", "password": "y"}).status_code != 503
+
+
+def test_espera_se_mide_en_el_limitador(bd):
+    from app.main import app
+
+    cliente = TestClient(AdmisionMiddleware(app))
+    antes = metricas.snapshot()["observaciones"].get("admision.espera_hilo_ms", {}).get("cantidad", 0)
+    # GET / es un handler sync sin sesión de base: igual espera un hilo
+    assert cliente.get("/").status_code == 200
+    despues = metricas.snapshot()["observaciones"]["admision.espera_hilo_ms"]["cantidad"]
+    assert despues == antes + 1
@@ -0,0 +1,103 @@
+"""
+POST /batch: referencias {{i.campo}} entre sub-requests, modo atómico (todo o
+nada, rutas sync rechazadas) y recuperación de la sesión compartida después de
+una sub-request que falla con un error de base.
+"""
+import pytest
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def paciente_en_primario(paciente_id: int):
+    """Lee del primario: un GET podría ir a la réplica si el token cambió de segundo (exp)"""
+    from app.database import SessionLocal
+    from app.models.paciente import Paciente
+
+    with SessionLocal() as db:
+        return db.get(Paciente, paciente_id)
+
+
+def crear_con_usuario(sufijo: str, dni: str) -> dict:
+    return {"metodo": "POST", "ruta": "/pacientes/con-usuario", "body": {
+        "nombre": f"batch {sufijo}", "email": f"batch-{sufijo}@example.com", "password": "Clave123", "dni": dni,
+    }}
+
+
+def ejecutar(cliente, encabezados, requests: list, atomico: bool = False) -> dict:
+    respuesta = cliente.post(
+        "/batch", json={"requests": requests, "atomico": atomico}, headers=encabezados("admin@example.com")
+    )
+    assert respuesta.status_code == 200
+    return respuesta.json()
+
+
+def test_referencias_entre_sub_requests(cliente, encabezados):
+    resultado = ejecutar(cliente, encabezados, [
+        crear_con_usuario("ref", "46000001"),
+        {"metodo": "PUT", "ruta": "/pacientes/{{0.id}}", "body": {"telefono": "1144556677"}},
+        {"metodo": "GET", "ruta": "/pacientes/{{0.id}}?fields=id,user.email"},
+        {"metodo": "GET", "ruta": "/pacientes/{{7.id}}"},
+    ])
+    codigos = [r["codigo"] for r in resultado["resultados"]]
+    assert codigos == [201, 200, 200, 400]
+    creado = resultado["resultados"][0]["body"]
+    assert resultado["resultados"][1]["body"]["telefono"] == "1144556677"
+    assert resultado["resultados"][2]["body"] == {"id": creado["id"], "user": {"email": "batch-ref@example.com"}}
+
+
+def test_atomico_revierte_todo_si_falla_un_paso(cliente, encabezados):
+    # El segundo paso repite el DNI del primero: 400 y se revierte también el primero
+    resultado = ejecutar(cliente, encabezados, [
+        crear_con_usuario("atomico-1", "46000002"),
+        crear_con_usuario("atomico-2", "46000002"),
+    ], atomico=True)
+    assert [r["codigo"] for r in resultado["resultados"]] == [201, 400]
+    assert resultado["confirmado"] is False
+    paciente_id = resultado["resultados"][0]["body"]["id"]
+    assert paciente_en_primario(paciente_id) is None
+
+
+def test_atomico_confirma_si_todo_sale_bien(cliente, encabezados):
+    resultado = ejecutar(cliente, encabezados, [
+        crear_con_usuario("atomico-3", "46000003"),
+        {"metodo": "PUT", "ruta": "/pacientes/{{0.id}}", "body": {"telefono": "1155667788"}},
+    ], atomico=True)
+    assert resultado["confirmado"] is True
+    paciente_id = resultado["resultados"][0]["body"]["id"]
+    assert paciente_en_primario(paciente_id).telefono == "1155667788"
+
+
+def test_atomico_rechaza_rutas_sync(cliente, encabezados):
+    resultado = ejecutar(cliente, encabezados, [{"metodo": "GET", "ruta": "/salas/"}], atomico=True)
+    assert resultado["resultados"][0]["codigo"] == 400
+    assert "sesión sync" in resultado["resultados"][0]["body"]["error"]
+    assert resultado["confirmado"] is False
+
+
+@pytest.fixture
+def ruta_que_falla_en_el_flush(cliente):
+    """Ruta de prueba que hace fallar el flush de la sesión (DNI duplicado sin validar antes)"""
+    from app.database import get_async_db
+    from app.main import app
+    from app.models.paciente import Paciente
+
+    router = APIRouter()
+
+    @router.post("/pruebas/flush-fallido")
+    async def flush_fallido(db: AsyncSession = Depends(get_async_db)):
+        db.add(Paciente(user_id=1, dni="30000000"))
+        await db.commit()
+
+    cantidad = len(app.router.routes)
+    app.include_router(router)
+    yield "/pruebas/flush-fallido"
+    del app.router.routes[cantidad:]
+
+
+def test_sin_atomico_la_sesion_se_recupera_de_un_error(cliente, encabezados, ruta_que_falla_en_el_flush):
+    resultado = ejecutar(cliente, encabezados, [
+        {"metodo": "POST", "ruta": ruta_que_falla_en_el_flush},
+        {"metodo": "GET", "ruta": "/pacientes/1"},
+        {"metodo": "GET", "ruta": "/salas/"},
+    ])
+    assert [r["codigo"] for r in resultado["resultados"]] == [500, 200, 200]
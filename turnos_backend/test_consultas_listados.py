@@ -0,0 +1,50 @@
+"""
+Detector de N+1 en los listados de perfiles
+PacienteOut / KinesiologoOut embeben UserOut, que embebe roles: sin las loader
+options de app/core/crud.py cada fila dispara lazy loads. Se cuenta cuántas
+sentencias ejecuta cada listado con 10 y con 100 filas: tiene que ser igual.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def contar_sentencias():
+    """Cuenta las sentencias de cualquier engine (primario, réplica, pools por carga)"""
+    sentencias = []
+
+    def registrar(conn, cursor, sentencia, parametros, contexto, executemany):
+        sentencias.append(sentencia)
+
+    event.listen(Engine, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(Engine, "before_cursor_execute", registrar)
+
+
+def sentencias_listado(cliente, ruta: str, limite: int) -> int:
+    with contar_sentencias() as sentencias:
+        respuesta = cliente.get(ruta, params={"limit": limite})
+    assert respuesta.status_code == 200
+    assert len(respuesta.json()) == limite
+    return len(sentencias)
+
+
+@pytest.mark.parametrize("ruta", ["/pacientes/", "/kinesiologos/", "/usuarios/"])
+def test_listado_cantidad_constante_de_consultas(cliente, ruta):
+    con_10 = sentencias_listado(cliente, ruta, 10)
+    con_100 = sentencias_listado(cliente, ruta, 100)
+    assert con_10 == con_100, f"{ruta}: {con_10} sentencias con 10 filas y {con_100} con 100 (N+1)"
+    # Perfil + usuario en un JOIN y roles en un selectin: nunca una consulta por fila
+    assert con_100 <= 3
+
+
+@pytest.mark.parametrize("ruta", ["/pacientes/", "/kinesiologos/", "/usuarios/"])
+def test_listado_incluye_roles(cliente, ruta):
+    fila = cliente.get(ruta, params={"limit": 1}).json()[0]
+    roles = fila["roles"] if ruta == "/usuarios/" else fila["user"]["roles"]
+    assert roles
@@ -0,0 +1,23 @@
+"""
+preparar_esquema sobre una base existente: las tablas ya están, así que
+create_all no agrega los índices nuevos; crear_indices_agregados sí.
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.esquema import INDICES_AGREGADOS, crear_indices_agregados
+from app.database import Base
+
+
+def test_crea_indices_nuevos_en_tablas_existentes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'existente.db'}")
+    Base.metadata.create_all(engine)
+    # Base anterior: la tabla existe pero sin el índice compuesto
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_historias_paciente_fecha"))
+
+    crear_indices_agregados(engine)
+    crear_indices_agregados(engine)  # checkfirst: la segunda vez no falla
+
+    nombres = {indice["name"] for indice in inspect(engine).get_indexes("historias_clinicas")}
+    assert {indice.name for indice in INDICES_AGREGADOS} <= nombres
+    assert "ix_historias_paciente_fecha" in nombres
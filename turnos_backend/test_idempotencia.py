@@ -0,0 +1,29 @@
+"""
+Idempotency-Key detrás de CORS: las repeticiones y los errores que arma el
+middleware de idempotencia tienen que llevar los headers CORS, si no el front
+(que es quien reintenta) no puede leerlos.
+"""
+ORIGEN = "http://localhost:5173"
+
+
+def test_repeticion_lleva_headers_cors(cliente, encabezados):
+    headers = encabezados("admin@example.com", Origin=ORIGEN, **{"Idempotency-Key": "cors-repeticion"})
+
+    original = cliente.patch("/turnos/999999/estado", params={"estado": "confirmado"}, headers=headers)
+    repetida = cliente.patch("/turnos/999999/estado", params={"estado": "confirmado"}, headers=headers)
+
+    assert original.status_code == repetida.status_code == 404
+    assert original.headers.get("access-control-allow-origin") == ORIGEN
+    assert repetida.headers.get("idempotent-replayed") == "true"
+    assert repetida.headers.get("access-control-allow-origin") == ORIGEN
+    assert "Idempotent-Replayed" in repetida.headers.get("access-control-expose-headers", "")
+
+
+def test_error_de_idempotencia_lleva_headers_cors(cliente, encabezados):
+    headers = encabezados("admin@example.com", Origin=ORIGEN, **{"Idempotency-Key": "cors-otra-request"})
+
+    cliente.patch("/turnos/999999/estado", params={"estado": "confirmado"}, headers=headers)
+    otra = cliente.patch("/turnos/999999/estado", params={"estado": "cancelado"}, headers=headers)
+
+    assert otra.status_code == 422
+    assert otra.headers.get("access-control-allow-origin") == ORIGEN
@@ -0,0 +1,58 @@
+"""
+Réplica de lectura (DATABASE_URL_LECTURA): la sesión de la réplica no escribe,
+un cliente lee sus propias escrituras del primario y los demás de la réplica,
+y la autorización de un GET se resuelve contra el primario.
+"""
+import pytest
+
+
+def test_sesion_de_replica_no_escribe(bd):
+    from app.database import SessionLectura
+    from app.models.role import Role
+
+    with SessionLectura() as db:
+        db.add(Role(name="no-deberia-guardarse"))
+        with pytest.raises(RuntimeError):
+            db.flush()
+
+
+def test_cliente_lee_sus_escrituras(cliente, encabezados):
+    escritor, otro = encabezados("admin@example.com"), encabezados("k0@example.com")
+    creado = cliente.post("/pacientes/con-usuario", headers=escritor, json={
+        "nombre": "recien creado", "email": "nuevo@example.com", "password": "Clave123", "dni": "45000000",
+    })
+    assert creado.status_code == 201
+    ruta = f"/pacientes/{creado.json()['id']}"
+
+    # Quien escribió lee del primario durante la ventana; el resto, de la réplica (sin el paciente)
+    assert cliente.get(ruta, headers=escritor).status_code == 200
+    assert cliente.get(ruta, headers=otro).status_code == 404
+
+
+def test_autorizacion_de_un_get_lee_del_primario(cliente, encabezados):
+    from app.database import SessionLocal
+    from app.models.user import User
+
+    # Baja en el primario; la réplica (copia vieja) todavía lo tiene activo
+    with SessionLocal() as db:
+        db.query(User).filter(User.email == "k5@example.com").update({"activo": False})
+        db.commit()
+
+    respuesta = cliente.get("/historias-clinicas/paciente/1", headers=encabezados("k5@example.com"))
+    assert respuesta.status_code == 400
+    assert respuesta.json() == {"error": "Usuario inactivo"}
+
+
+def test_lecturas_pesadas_usan_el_pool_de_reportes_de_la_replica(cliente, encabezados):
+    from app.core.metricas import metricas
+
+    def checkouts(pool: str) -> float:
+        return metricas.snapshot()["contadores"].get(f"pool.{pool}.checkouts", 0)
+
+    antes = {pool: checkouts(pool) for pool in ("lectura_async", "lectura_reportes_async")}
+    respuesta = cliente.get(
+        "/historias-clinicas/paciente/1/estadisticas", headers=encabezados("k2@example.com")
+    )
+    assert respuesta.status_code == 200
+    assert checkouts("lectura_reportes_async") > antes["lectura_reportes_async"]
+    assert checkouts("lectura_async") == antes["lectura_async"]
@@ -0,0 +1,49 @@
+"""
+POST /usuarios/lote: las contraseñas se hashean en el pool propio antes del INSERT
+y el lote de usuarios tiene su propio tope (LOTE_MAX_USUARIOS).
+"""
+from app.core.config import LOTE_MAX_USUARIOS
+from app.core.security import verify_password
+from app.database import SessionLocal
+from app.models.user import User
+
+
+def _items(prefijo: str, cantidad: int) -> list:
+    return [
+        {"nombre": f"Lote {i}", "email": f"{prefijo}{i}@example.com", "password": f"Clave{i}segura"}
+        for i in range(cantidad)
+    ]
+
+
+def test_crea_usuarios_con_password_hasheada(cliente, encabezados):
+    respuesta = cliente.post(
+        "/usuarios/lote", json={"items": _items("lote", 3)}, headers=encabezados("admin@example.com")
+    )
+    assert respuesta.status_code == 201
+    assert respuesta.json() == {"cantidad": 3}
+
+    with SessionLocal() as db:
+        creados = db.query(User).filter(User.email.like("lote%@example.com")).order_by(User.email).all()
+    assert [u.email for u in creados] == [f"lote{i}@example.com" for i in range(3)]
+    # Cada hash corresponde a la password de su propio item (el orden se conserva)
+    for i, usuario in enumerate(creados):
+        assert verify_password(f"Clave{i}segura", usuario.password_hash)
+
+
+def test_rechaza_lote_de_usuarios_mayor_al_tope(cliente, encabezados):
+    respuesta = cliente.post(
+        "/usuarios/lote",
+        json={"items": _items("tope", LOTE_MAX_USUARIOS + 1)},
+        headers=encabezados("admin@example.com"),
+    )
+    assert respuesta.status_code == 422
+    with SessionLocal() as db:
+        assert db.query(User).filter(User.email.like("tope%@example.com")).count() == 0
+
+
+def test_email_duplicado_revierte_el_lote(cliente, encabezados):
+    items = _items("dup", 2) + [{"nombre": "Repetido", "email": "p1@example.com", "password": "Clave9segura"}]
+    respuesta = cliente.post("/usuarios/lote", json={"items": items}, headers=encabezados("admin@example.com"))
+    assert respuesta.status_code == 409
+    with SessionLocal() as db:
+        assert db.query(User).filter(User.email.like("dup%@example.com")).count() == 0